@@ -0,0 +1,70 @@
+"""
+Measures client-side RSS and open file descriptors with many databases on one embedded server.
+
+'stores' mode gets a DocumentStore per database (get_document_store), 'handles' mode gets
+lightweight handles sharing one DocumentStore and connection pool (get_database_handle).
+Every database gets one session round trip, so connections are actually opened.
+Each mode runs in its own process, so the numbers don't influence each other.
+
+Requires the real server binaries and a dotnet runtime. Linux only (/proc).
+
+Usage: python -m benchmarks.many_databases [databases]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from ravendb_embedded import DatabaseOptions, EmbeddedServer, ServerOptions
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def run(mode: str, databases: int) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir, EmbeddedServer() as embedded:
+        server_options = ServerOptions()
+        server_options.data_directory = str(Path(temp_dir, "RavenDB"))
+        server_options.logs_path = str(Path(temp_dir, "Logs"))
+        embedded.start_server(server_options)
+
+        names = [f"Tenant{i}" for i in range(databases)]
+        embedded.ensure_databases([DatabaseOptions.from_database_name(name) for name in names])
+
+        before_rss, before_fds = rss_mb(), open_fds()
+        for name in names:
+            if mode == "stores":
+                session = embedded.get_document_store(name).open_session()
+            else:
+                session = embedded.get_database_handle(name).open_session()
+            with session:
+                session.load("missing/1")
+
+        print(
+            f"{mode:<8} databases={databases}  rss=+{rss_mb() - before_rss:8.1f} MB  "
+            f"fds=+{open_fds() - before_fds:6d}  threads={len(os.listdir('/proc/self/task')):6d}"
+        )
+
+
+def main(databases: int) -> None:
+    for mode in ("stores", "handles"):
+        subprocess.run([sys.executable, "-m", "benchmarks.many_databases", str(databases), mode], check=True)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    if len(sys.argv) > 2:
+        run(sys.argv[2], count)
+    else:
+        main(count)
@@ -0,0 +1,56 @@
+"""
+Measures start_server() time and the steady RSS of the server process for each performance profile.
+
+Every profile starts a fresh server in its own directory, stores a batch of documents, then waits
+for the server to settle before reading its RSS. 'default' runs without a profile as the baseline.
+
+Requires the real server binaries and a dotnet runtime. Linux only (/proc).
+
+Usage: python -m benchmarks.performance_profiles [documents]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from ravendb_embedded import EmbeddedServer, ServerOptions
+from ravendb_embedded.performance_profile import PERFORMANCE_PROFILES
+from ravendb_embedded.resource_sampler import read_process_sample
+
+
+def run(profile: Optional[str], documents: int) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir, EmbeddedServer() as embedded:
+        server_options = ServerOptions()
+        server_options.data_directory = str(Path(temp_dir, "RavenDB"))
+        server_options.logs_path = str(Path(temp_dir, "Logs"))
+        server_options.performance_profile = profile
+
+        start = time.perf_counter()
+        embedded.start_server(server_options)
+        startup = time.perf_counter() - start
+
+        store = embedded.get_document_store("Benchmark")
+        for batch in range(0, documents, 1000):
+            with store.open_session() as session:
+                for i in range(batch, min(batch + 1000, documents)):
+                    session.store({"name": f"item {i}", "value": i}, f"items/{i}")
+                session.save_changes()
+
+        time.sleep(5)
+        sample = read_process_sample(embedded.server_task.get_value()[1].pid)
+
+        print(
+            f"{profile or 'default':<14} startup={startup * 1000:8.1f} ms  "
+            f"rss={sample.rss_bytes / 1024 / 1024:8.1f} MB  threads={sample.threads:4d}"
+        )
+
+
+def main(documents: int) -> None:
+    for profile in [None] + sorted(PERFORMANCE_PROFILES):
+        run(profile, documents)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
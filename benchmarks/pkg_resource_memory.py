@@ -0,0 +1,72 @@
+"""
+Compares peak memory of ExtractFromPkgResourceServerProvider against the previous approach,
+which loaded the whole archive with pkgutil.get_data() and copied it once more through BytesIO.
+
+Each variant runs in its own interpreter, so the reported peak RSS isn't affected by the other one.
+
+Usage: python -m benchmarks.pkg_resource_memory [archive_size_mb]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+PACKAGE = "benchmark_server_package"
+
+
+def create_package(directory: str, archive_size_mb: int) -> None:
+    package_directory = os.path.join(directory, PACKAGE)
+    os.makedirs(package_directory)
+    Path(package_directory, "__init__.py").touch()
+
+    with zipfile.ZipFile(os.path.join(package_directory, "ravendb_server.zip"), "w") as zipped:
+        zipped.writestr("Raven.Server.dll", b"server")
+        for i in range(archive_size_mb // 16):
+            zipped.writestr(f"runtimes/payload-{i}.bin", os.urandom(16 * 1024 * 1024))
+
+
+def run_variant(variant: str, directory: str) -> None:
+    import pkgutil
+
+    from ravendb_embedded.provide import ExtractFromPkgResourceServerProvider
+
+    sys.path.insert(0, directory)
+    target = os.path.join(directory, f"target-{variant}")
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    if variant == "get_data":
+        resource_data = pkgutil.get_data(PACKAGE, "ravendb_server.zip")
+        with BytesIO(resource_data) as bytes_buffer:
+            with zipfile.ZipFile(BytesIO(bytes_buffer.read())) as zipped:
+                zipped.extractall(target)
+    else:
+        ExtractFromPkgResourceServerProvider(PACKAGE).provide(target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    print(f"{variant:<12} python peak={peak / 2**20:8.1f} MB  peak RSS growth={rss_growth / 1024:8.1f} MB")
+
+
+def main(archive_size_mb: int) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        create_package(temp_dir, archive_size_mb)
+        print(f"archive size: {archive_size_mb} MB")
+        for variant in ("get_data", "streaming"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.pkg_resource_memory", "--variant", variant, temp_dir], check=True
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--variant":
+        run_variant(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 128)
@@ -0,0 +1,64 @@
+"""
+Measures EmbeddedServer.start_server() latency against a fake 'dotnet' stub.
+
+The stub prints the "Server available on: " line immediately, so the time it takes
+to spawn the stub and read that line directly is the lower bound for start_server().
+Everything above that is overhead added by the embedded server itself.
+
+Usage: python -m benchmarks.startup_latency [iterations]
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ravendb_embedded import EmbeddedServer
+from tests.fake_server import FakeServer
+
+
+def measure_raw_spawn(dotnet_path: str) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen([dotnet_path], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    for line in iter(process.stdout.readline, b""):
+        if line.startswith(b"Server available on: "):
+            break
+    elapsed = time.perf_counter() - start
+    process.stdin.close()
+    process.wait()
+    process.stdout.close()
+    return elapsed
+
+
+def measure_start_server(temp_dir: str) -> float:
+    server_options = FakeServer.configure(temp_dir)
+    with EmbeddedServer() as embedded:
+        start = time.perf_counter()
+        embedded.start_server(server_options)
+        return time.perf_counter() - start
+
+
+def report(name: str, samples) -> None:
+    samples_ms = [s * 1000 for s in samples]
+    print(
+        f"{name:<20} mean={statistics.mean(samples_ms):8.1f} ms  "
+        f"median={statistics.median(samples_ms):8.1f} ms  max={max(samples_ms):8.1f} ms"
+    )
+
+
+def main(iterations: int) -> None:
+    raw, embedded = [], []
+    for _ in range(iterations):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            raw.append(measure_raw_spawn(FakeServer.create(temp_dir)))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            embedded.append(measure_start_server(temp_dir))
+
+    report("raw stub spawn", raw)
+    report("start_server()", embedded)
+    print(f"{'overhead':<20} mean={(statistics.mean(embedded) - statistics.mean(raw)) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,58 @@
+"""
+Compares ZipFile.extractall() with ParallelZipExtractor on a generated archive with thousands of files.
+
+Usage: python -m benchmarks.zip_extraction [file_count] [max_workers]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+from ravendb_embedded.zip_extractor import ParallelZipExtractor
+
+
+def create_archive(path: str, file_count: int) -> None:
+    rng = random.Random(42)
+    words = [bytes(rng.choices(range(97, 123), k=rng.randint(3, 12))) for _ in range(2000)]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zipped:
+        for i in range(file_count):
+            # compressible content of varied size, similar to the assemblies in the server package
+            content = b" ".join(rng.choices(words, k=rng.randint(500, 40000)))
+            zipped.writestr(f"lib/{i % 40}/assembly-{i}.dll", content)
+
+
+def timed(action) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main(file_count: int, max_workers: int) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive = os.path.join(temp_dir, "server.zip")
+        create_archive(archive, file_count)
+        print(f"archive: {file_count} files, {os.path.getsize(archive) / 2**20:.1f} MB compressed")
+
+        def extractall() -> None:
+            with zipfile.ZipFile(archive) as zipped:
+                zipped.extractall(os.path.join(temp_dir, "extractall"))
+
+        def parallel() -> None:
+            ParallelZipExtractor(max_workers).extract(archive, os.path.join(temp_dir, "parallel"))
+
+        print(f"{'extractall':<28} {timed(extractall):7.2f} s")
+        print(f"{f'parallel ({max_workers} workers)':<28} {timed(parallel):7.2f} s")
+        print(f"{'parallel, already extracted':<28} {timed(parallel):7.2f} s")
+
+        shutil.rmtree(os.path.join(temp_dir, "parallel"))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else min(32, os.cpu_count() or 1),
+    )
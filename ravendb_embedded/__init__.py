@@ -1,6 +1,10 @@
+from ravendb_embedded.async_embedded_server import AsyncEmbeddedServer
+from ravendb_embedded.embedded_cluster import EmbeddedCluster
 from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.embedded_server_pool import EmbeddedServerPool
 from ravendb_embedded.options import DatabaseOptions, ServerOptions, SecurityOptions
 from ravendb_embedded.provide import (
+    CachedServerProvider,
     CopyServerFromNugetProvider,
     CopyServerProvider,
     ExternalServerProvider,
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import os
+from collections import deque
+from datetime import timedelta
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from ravendb import DocumentStore
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.exceptions import create_startup_error, match_fatal_startup_message
+from ravendb_embedded.options import DatabaseOptions, ServerOptions
+from ravendb_embedded.preflight import PreflightStepError
+from ravendb_embedded.process_limits import ProcessLimits
+from ravendb_embedded.process_output import ProcessOutputDrainer
+from ravendb_embedded.raven_server_runner import RavenServerRunner
+from ravendb_embedded.store_utils import create_document_store, try_create_database
+
+# the server prints long stack traces on a single line now and then, the asyncio default of 64 KiB is too small
+_STREAM_LIMIT = 1024 * 1024
+
+
+class AsyncEmbeddedServer:
+    # same as EmbeddedServer, but nothing blocks the event loop - blocking client calls run in the default executor
+    def __init__(self):
+        self.server_url: Optional[str] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.document_stores: Dict[str, asyncio.Future] = {}
+        self.client_pem_certificate_path: Optional[str] = None
+        self.trust_store_path: Optional[str] = None
+        self._server_options: Optional[ServerOptions] = None
+        self._output: Dict[str, Deque[str]] = {}
+        self._output_callback: Optional[Callable[[str, str], None]] = None
+        self._drain_tasks: List[asyncio.Future] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._fatal_startup_line: Optional[asyncio.Future] = None
+        self._process_limits: Optional[ProcessLimits] = None
+        self.logger = logging.Logger(self.__class__.__name__, logging.DEBUG)
+
+    async def __aenter__(self) -> AsyncEmbeddedServer:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def _log_debug(self, message: str) -> None:
+        if not self.logger.disabled and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.log(logging.DEBUG, message)
+
+    @property
+    def stdout_lines(self) -> List[str]:
+        return list(self._output.get(ProcessOutputDrainer.STDOUT, ()))
+
+    @property
+    def stderr_lines(self) -> List[str]:
+        return list(self._output.get(ProcessOutputDrainer.STDERR, ()))
+
+    async def start_server(self, options_param: ServerOptions = None) -> None:
+        options = options_param or ServerOptions()
+
+        if self._start_lock is None:
+            # created here, python < 3.10 binds the lock to the loop which is current at construction time
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self.process is not None:
+                raise RuntimeError("The server was already started")
+
+            self._server_options = options
+            if options.security is not None:
+                self.client_pem_certificate_path = options.security.client_pem_certificate_path
+                self.trust_store_path = options.security.ca_certificate_path
+
+            self.server_url, self.process = await self._run_server(options)
+
+    def get_server_uri(self) -> str:
+        if self.server_url is None:
+            raise RuntimeError("Please run start_server() before trying to use the server.")
+
+        return self.server_url
+
+    async def _run_server(self, options: ServerOptions) -> Tuple[str, asyncio.subprocess.Process]:
+        RavenServerRunner.validate_options(options)
+
+        def prepare_command_line() -> List[str]:
+            try:
+                preflight = EmbeddedServer.create_preflight_pipeline(options).run()
+            except PreflightStepError as e:
+                self._log_debug(str(e))
+                raise
+
+            return RavenServerRunner.build_command_line(
+                options,
+                RavenServerRunner.find_server_dll(options),
+                preflight.get("match_runtime"),
+                preflight.get("certificate_thumbprint"),
+            )
+
+        command_line_args = await asyncio.get_running_loop().run_in_executor(None, prepare_command_line)
+
+        limits = self._process_limits = ProcessLimits.from_options(options)
+        if limits is not None:
+            limits.prepare()
+
+        process = await asyncio.create_subprocess_exec(
+            *command_line_args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=_STREAM_LIMIT,
+            env=RavenServerRunner.build_environment(options),
+            preexec_fn=limits.apply_in_child if limits is not None else None,
+        )
+
+        self._log_debug("Starting server")
+
+        atexit.register(self._kill_at_exit, process)
+
+        self._output = {
+            ProcessOutputDrainer.STDOUT: deque(maxlen=options.server_output_buffer_size),
+            ProcessOutputDrainer.STDERR: deque(maxlen=options.server_output_buffer_size),
+        }
+        self._output_callback = options.server_output_callback
+        stderr_task = asyncio.ensure_future(self._drain(ProcessOutputDrainer.STDERR, process.stderr))
+        self._drain_tasks = [stderr_task]
+
+        builder: List[str] = []
+        self._fatal_startup_line = asyncio.get_running_loop().create_future()
+        online_task = asyncio.ensure_future(self._wait_until_online(process.stdout, builder))
+        try:
+            done, _ = await asyncio.wait(
+                {online_task, self._fatal_startup_line},
+                timeout=options.max_server_startup_time_duration.total_seconds(),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            self._fatal_startup_line.cancel()
+            self._fatal_startup_line = None
+            if not online_task.done():
+                online_task.cancel()
+
+        url = online_task.result() if online_task in done else None
+
+        if url is None:
+            exit_code = process.returncode
+            # the server never came online, so there's nothing to shut down gracefully
+            await self._terminate_process(process, options.graceful_shutdown_timeout)
+            if limits is not None:
+                limits.release()
+            try:
+                # the process is gone at this point, so stderr reaches its end quickly
+                await asyncio.wait_for(asyncio.shield(stderr_task), 1)
+            except asyncio.TimeoutError:
+                pass
+            error_string = "".join(line + os.linesep for line in self.stderr_lines)
+            raise create_startup_error(
+                EmbeddedServer.build_startup_exception_message("".join(builder), error_string),
+                self.stdout_lines,
+                self.stderr_lines,
+                exit_code,
+                timed_out=not done,
+            )
+
+        self._drain_tasks.append(asyncio.ensure_future(self._drain(ProcessOutputDrainer.STDOUT, process.stdout)))
+        return url, process
+
+    async def _wait_until_online(self, stream: asyncio.StreamReader, builder: List[str]) -> Optional[str]:
+        prefix = "Server available on: "
+        while True:
+            line = await self._read_line(stream)
+            if line is None:
+                return None
+
+            self._publish(ProcessOutputDrainer.STDOUT, line)
+            builder.append(line)
+            builder.append(os.linesep)
+
+            if line.startswith(prefix):
+                return line[len(prefix) :]
+
+            if match_fatal_startup_message(line) is not None:
+                return None
+
+    async def _drain(self, stream_name: str, stream: asyncio.StreamReader) -> None:
+        # keeps reading, otherwise the server blocks once the pipe buffer is full
+        while True:
+            line = await self._read_line(stream)
+            if line is None:
+                return
+            self._publish(stream_name, line)
+
+    @staticmethod
+    async def _read_line(stream: asyncio.StreamReader) -> Optional[str]:
+        while True:
+            try:
+                raw_line = await stream.readline()
+            except ValueError:
+                # the line exceeded the stream limit and was discarded
+                continue
+            except (ConnectionError, OSError):
+                return None
+
+            if not raw_line:
+                return None
+            return raw_line.decode("utf-8", errors="replace").strip()
+
+    def _publish(self, stream_name: str, line: str) -> None:
+        self._output[stream_name].append(line)
+
+        fatal_startup_line = self._fatal_startup_line
+        if fatal_startup_line is not None and not fatal_startup_line.done() and match_fatal_startup_message(line):
+            # no point in waiting for the online line or the deadline
+            fatal_startup_line.set_result(line)
+
+        if self._output_callback is not None:
+            try:
+                self._output_callback(stream_name, line)
+            except Exception:
+                pass
+
+    async def get_document_store(self, database: str) -> DocumentStore:
+        return await self.get_document_store_from_options(DatabaseOptions.from_database_name(database))
+
+    async def get_document_store_from_options(self, options: DatabaseOptions) -> DocumentStore:
+        database_name = options.database_record.database_name
+
+        if not database_name or database_name.isspace():
+            raise ValueError("DatabaseName cannot be null or whitespace")
+
+        future = self.document_stores.get(database_name)
+        if future is None:
+            self._log_debug(f"Creating document store for '{database_name}'.")
+            future = asyncio.get_running_loop().run_in_executor(
+                None, self._initialize_document_store, database_name, options
+            )
+            self.document_stores[database_name] = future
+
+        try:
+            # concurrent callers share the same store, cancelling one of them must not cancel it for the others
+            return await asyncio.shield(future)
+        except Exception:
+            if self.document_stores.get(database_name) is future:
+                del self.document_stores[database_name]
+            raise
+
+    def _initialize_document_store(self, database_name: str, options: DatabaseOptions) -> DocumentStore:
+        store = create_document_store(
+            self.get_server_uri(),
+            database_name,
+            self.client_pem_certificate_path,
+            self.trust_store_path,
+            options.conventions,
+        )
+
+        store.add_after_close(lambda: self.document_stores.pop(database_name, None))
+
+        store.initialize()
+
+        if not options.skip_creating_database:
+            try_create_database(store, options, self._log_debug)
+
+        return store
+
+    async def close(self) -> None:
+        process, self.process = self.process, None
+        self.server_url = None
+        stores = list(self.document_stores.values())
+        self.document_stores.clear()
+
+        async def close_stores() -> None:
+            # a store which is still being created would be left open once it's done, so it's waited for
+            await asyncio.gather(*stores, return_exceptions=True)
+            loop = asyncio.get_running_loop()
+            closing = [
+                loop.run_in_executor(None, future.result().close)
+                for future in stores
+                if not future.cancelled() and future.exception() is None
+            ]
+            await asyncio.gather(*closing, return_exceptions=True)
+
+        # the stores don't need the server to close, so both happen at the same time
+        await asyncio.gather(close_stores(), self._shutdown_process(process))
+
+        limits, self._process_limits = self._process_limits, None
+        if limits is not None:
+            limits.release()
+
+        drain_tasks, self._drain_tasks = self._drain_tasks, []
+        for task in drain_tasks:
+            task.cancel()
+        await asyncio.gather(*drain_tasks, return_exceptions=True)
+
+    async def _shutdown_process(self, process: Optional[asyncio.subprocess.Process]) -> None:
+        if process is None or process.returncode is not None:
+            return
+
+        timeout = self._server_options.graceful_shutdown_timeout
+        try:
+            self._log_debug("Try shutdown server gracefully.")
+            process.stdin.write("shutdown no-confirmation\n".encode("utf-8"))
+            await process.stdin.drain()
+            process.stdin.close()
+
+            if await asyncio.wait_for(process.wait(), timeout.total_seconds()) == 0:
+                return
+        except Exception as e:
+            self._log_debug(f"Failed to gracefully shutdown server in {timeout}. Error: {e}")
+
+        self._log_debug("Killing server")
+        await self._terminate_process(process, timeout)
+
+    @staticmethod
+    async def _terminate_process(process: asyncio.subprocess.Process, timeout: timedelta) -> None:
+        if process.returncode is not None:
+            return
+
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), timeout.total_seconds())
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def _kill_at_exit(process: asyncio.subprocess.Process) -> None:
+        # the event loop is usually gone at this point, so there's no way to wait for a graceful shutdown
+        if process.returncode is None:
+            try:
+                process.terminate()
+            except Exception:
+                pass
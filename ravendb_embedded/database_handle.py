@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from ravendb import DocumentStore
+from ravendb.documents.operations.executor import MaintenanceOperationExecutor, OperationExecutor
+from ravendb.documents.session.document_session import DocumentSession
+from ravendb.documents.session.misc import SessionOptions
+from ravendb.http.request_executor import RequestExecutor
+
+
+class DatabaseHandle:
+    # lightweight view of one database on a DocumentStore shared by every database of the server
+    def __init__(self, store: DocumentStore, database: str):
+        self.store = store
+        self.database = database
+
+    def open_session(self, session_options: Optional[SessionOptions] = None) -> DocumentSession:
+        if session_options is None:
+            return self.store.open_session(database=self.database)
+
+        session_options.database = self.database
+        return self.store.open_session(session_options=session_options)
+
+    @property
+    def maintenance(self) -> MaintenanceOperationExecutor:
+        # for_database() can't be used, it compares against the database of the store which is None here
+        return MaintenanceOperationExecutor(self.store, self.database)
+
+    @property
+    def operations(self) -> OperationExecutor:
+        return OperationExecutor(self.store, self.database)
+
+    def get_request_executor(self) -> RequestExecutor:
+        return self.store.get_request_executor(self.database)
+
+    def execute_index(self, task) -> None:
+        self.store.execute_index(task, self.database)
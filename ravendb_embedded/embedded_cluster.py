@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+import requests
+from ravendb import DocumentStore
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.exceptions import ServerPortInUseError
+from ravendb_embedded.options import DatabaseOptions, ServerOptions
+from ravendb_embedded.provide import ProvideRavenDBServer
+from ravendb_embedded.store_utils import create_document_store, try_create_database
+
+
+class _ProvidedServerFiles(ProvideRavenDBServer):
+    # the cluster provides the server files once, the nodes run from that copy
+    def provide(self, target_directory: str) -> None:
+        pass
+
+
+def _find_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class EmbeddedCluster:
+    # N embedded servers on localhost joined into one cluster, for testing replication and failover
+    # every node gets its own port, data directory, logs and trace file, the server files are shared
+    # only unsecured clusters are supported, the nodes talk to each other over plain http on 127.0.0.1
+    PORT_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        n_nodes: int = 3,
+        server_options: Optional[ServerOptions] = None,
+        base_directory: Optional[str] = None,
+        join_timeout: timedelta = timedelta(minutes=1),
+    ):
+        if n_nodes <= 0:
+            raise ValueError("n_nodes must be positive")
+        if n_nodes > 26:
+            raise ValueError("A cluster can have at most 26 nodes, one per node tag")
+
+        self.n_nodes = n_nodes
+        self.join_timeout = join_timeout
+        self.nodes: List[EmbeddedServer] = []
+        self.urls: List[str] = []
+        self.document_stores: Dict[str, DocumentStore] = {}
+        self.logger = logging.Logger(self.__class__.__name__, logging.DEBUG)
+
+        self._server_options = server_options or ServerOptions()
+        if self._server_options.security is not None:
+            raise ValueError("EmbeddedCluster doesn't support secured servers")
+        if self._server_options.daemon_mode:
+            raise ValueError("EmbeddedCluster doesn't support daemon mode")
+        if self._server_options.idle_timeout is not None:
+            # a suspended node would drop out of the cluster
+            raise ValueError("EmbeddedCluster doesn't support idle_timeout")
+
+        self._owns_base_directory = base_directory is None
+        self._base_directory = base_directory or tempfile.mkdtemp(prefix="ravendb-cluster-")
+        self._stores_lock = Lock()
+
+    def __enter__(self) -> EmbeddedCluster:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _log_debug(self, message: str) -> None:
+        if not self.logger.disabled and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.log(logging.DEBUG, message)
+
+    @staticmethod
+    def node_tag(index: int) -> str:
+        return chr(ord("A") + index)
+
+    @property
+    def leader_url(self) -> str:
+        topology = self.get_topology()
+        leader = topology.get("Leader")
+        members = topology.get("Topology", {}).get("Members", {})
+        return members.get(leader, self.urls[0])
+
+    def start(self) -> None:
+        if self.nodes:
+            raise RuntimeError("The cluster was already started")
+
+        target_server_location = self._provide_server_files()
+        options_list = [self._create_node_options(index, target_server_location) for index in range(self.n_nodes)]
+        self.urls = [options.server_url for options in options_list]
+        self.nodes = [EmbeddedServer() for _ in range(self.n_nodes)]
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.n_nodes, thread_name_prefix="ravendb-cluster") as executor:
+                # list() re-raises the first startup failure
+                list(executor.map(self._start_node, range(self.n_nodes), options_list))
+            self._join_nodes()
+        except BaseException:
+            self.close()
+            raise
+
+    def _provide_server_files(self) -> str:
+        options = self._server_options
+        target_server_location = os.path.join(self._base_directory, "RavenDBServer")
+        if options.clear_target_server_location:
+            shutil.rmtree(target_server_location, ignore_errors=True)
+        try:
+            options.provider.provide(target_server_location)
+        except Exception as e:
+            raise RuntimeError(f"Failed to spawn server files. {e}") from e
+        return target_server_location
+
+    def _start_node(self, index: int, options: ServerOptions) -> None:
+        # the port was free when it was picked, but another process may have taken it before the node bound it
+        for attempt in range(1, self.PORT_ATTEMPTS + 1):
+            try:
+                self.nodes[index].start_server(options)
+                return
+            except ServerPortInUseError:
+                if attempt == self.PORT_ATTEMPTS:
+                    raise
+                self._log_debug(f"Port of {options.server_url} was taken, node {self.node_tag(index)} tries another")
+                options.server_url = f"http://127.0.0.1:{_find_free_port()}"
+                self.urls[index] = options.server_url
+
+    def _create_node_options(self, index: int, target_server_location: str) -> ServerOptions:
+        directory = os.path.join(self._base_directory, f"node-{self.node_tag(index)}")
+        options = self._server_options.copy()
+        options.provider = _ProvidedServerFiles()
+        options.clear_target_server_location = False
+        options.target_server_location = target_server_location
+        options.data_directory = os.path.join(directory, "RavenDB")
+        options.logs_path = os.path.join(directory, "Logs")
+        if options.trace_file:
+            root, extension = os.path.splitext(options.trace_file)
+            options.trace_file = f"{root}-{self.node_tag(index)}{extension}"
+        # known up front, the nodes are added to the cluster by url
+        options.server_url = f"http://127.0.0.1:{_find_free_port()}"
+        return options
+
+    def _join_nodes(self) -> None:
+        leader_url = self.urls[0]
+        self._admin_request("POST", f"{leader_url}/admin/cluster/bootstrap")
+
+        # raft adds one node at a time
+        for index in range(1, self.n_nodes):
+            self._admin_request(
+                "PUT",
+                f"{leader_url}/admin/cluster/node",
+                params={"url": self.urls[index], "tag": self.node_tag(index)},
+            )
+
+        deadline = time.monotonic() + self.join_timeout.total_seconds()
+        while True:
+            members = self.get_topology(leader_url).get("Topology", {}).get("Members", {})
+            if len(members) == self.n_nodes:
+                self._log_debug(f"Cluster is up: {members}")
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Only {sorted(members)} joined the cluster within {self.join_timeout}")
+            time.sleep(0.1)
+
+    def _admin_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        response = requests.request(method, url, timeout=self.join_timeout.total_seconds(), **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} failed with {response.status_code}: {response.text}")
+        return response
+
+    def get_topology(self, url: Optional[str] = None) -> Dict[str, Any]:
+        return self._admin_request("GET", f"{url or self.urls[0]}/cluster/topology").json()
+
+    def get_document_store(self, database: str, replication_factor: Optional[int] = None) -> DocumentStore:
+        return self.get_document_store_from_options(DatabaseOptions.from_database_name(database), replication_factor)
+
+    def get_document_store_from_options(
+        self, options: DatabaseOptions, replication_factor: Optional[int] = None
+    ) -> DocumentStore:
+        # the store knows every node and follows the database topology, so it fails over to the other nodes
+        database_name = options.database_record.database_name
+        if not database_name or database_name.isspace():
+            raise ValueError("DatabaseName cannot be null or whitespace")
+        if not self.nodes:
+            raise RuntimeError("Please run start() before trying to use the cluster.")
+
+        with self._stores_lock:
+            store = self.document_stores.get(database_name)
+            if store is not None:
+                return store
+
+            store = create_document_store(list(self.urls), database_name, conventions=options.conventions)
+            store.add_after_close(lambda: self.document_stores.pop(database_name, None))
+            store.initialize()
+
+            if not options.skip_creating_database:
+                try_create_database(store, options, self._log_debug, replication_factor or self.n_nodes)
+
+            self.document_stores[database_name] = store
+            return store
+
+    def kill_node(self, index: int) -> None:
+        # no graceful shutdown, like a crash or an OOM kill
+        process = self.nodes[index].server_task.get_value()[1]
+        process.kill()
+        process.wait()
+
+    def restart_node(self, index: int) -> None:
+        # on the same url and data directory, the node rejoins the cluster by itself
+        self.nodes[index].restart()
+
+    def close(self) -> None:
+        with self._stores_lock:
+            stores = list(self.document_stores.values())
+            self.document_stores.clear()
+        for store in stores:
+            store.close()
+
+        nodes, self.nodes = self.nodes, []
+        if nodes:
+            with ThreadPoolExecutor(max_workers=len(nodes), thread_name_prefix="ravendb-cluster") as executor:
+                list(executor.map(lambda node: node.close(), nodes))
+
+        if self._owns_base_directory:
+            shutil.rmtree(self._base_directory, ignore_errors=True)
@@ -7,30 +7,71 @@ import shutil
 import subprocess
 import time
 from datetime import timedelta
-from typing import Optional, List, Callable, Tuple, Generic, TypeVar, Dict, IO
-from threading import Thread
+from typing import Optional, List, Callable, Tuple, Generic, TypeVar, Dict
 from queue import Queue
 import webbrowser
+from threading import Event, Lock, RLock, Thread
 
-from ravendb import DocumentStore, CreateDatabaseOperation
-from ravendb.exceptions.raven_exceptions import RavenException
+from concurrent.futures import ThreadPoolExecutor
+
+from ravendb import DocumentStore, CreateDatabaseOperation, GetDatabaseNamesOperation
+from ravendb.documents.session.event_args import BeforeRequestEventArgs
+from ravendb.http.request_executor import RequestExecutor
 from ravendb.tools.utils import Stopwatch
+from requests.adapters import HTTPAdapter
+
+from ravendb_embedded.database_handle import DatabaseHandle
+from ravendb_embedded.exceptions import ServerStartupError, create_startup_error, match_fatal_startup_message
+from ravendb_embedded.file_utils import clone_tree
 from ravendb_embedded.options import ServerOptions, DatabaseOptions
+from ravendb_embedded.preflight import PreflightPipeline, PreflightStepError
+from ravendb_embedded.process_limits import ProcessLimits
+from ravendb_embedded.process_output import ProcessOutputDrainer
 from ravendb_embedded.raven_server_runner import RavenServerRunner
+from ravendb_embedded.runtime_framework_version_matcher import RuntimeFrameworkVersionMatcher
+from ravendb_embedded.request_metrics import RequestMetrics
+from ravendb_embedded.resource_sampler import ResourceSampler
+from ravendb_embedded.server_daemon import ServerDaemon
+from ravendb_embedded.startup_report import StartupReport
+from ravendb_embedded.store_utils import create_document_store, try_create_database
+from ravendb_embedded.watchdog import ServerWatchdog
 
 _T = TypeVar("_T")
 
 
 class EmbeddedServer:
     END_OF_STREAM_MARKER = "$$END_OF_STREAM$$"
+    SHARED_CONNECTION_POOL_SIZE = 32
 
     # singleton
     def __init__(self):
         self.server_task: Optional[Lazy[Tuple[str, subprocess.Popen]]] = None
         self.document_stores = {}
+        self.database_handles: Dict[str, Lazy[DatabaseHandle]] = {}
+        self._shared_store: Lazy[DocumentStore] = Lazy(self._initialize_shared_store)
+        self._shared_http_adapter: Optional[HTTPAdapter] = None
         self.client_pem_certificate_path: Optional[str] = None
         self.trust_store_path: Optional[str] = None
         self._graceful_shutdown_timeout: Optional[timedelta] = None
+        self._server_options: Optional[ServerOptions] = None
+        self.server_output: Optional[ProcessOutputDrainer] = None
+        self.daemon: Optional[ServerDaemon] = None
+        self._command_line_args: Optional[List[str]] = None
+        self._available = Event()
+        self._available.set()
+        self._lifecycle_lock = RLock()
+        self._last_activity = time.monotonic()
+        self._stop_idle_monitor = Event()
+        self._stop_idle_monitor.set()
+        self._suspended = False
+        self.idle_metrics = IdleMetrics()
+        self.startup_report = StartupReport()
+        self.resource_sampler: Optional[ResourceSampler] = None
+        self.request_metrics = RequestMetrics()
+        self._process_limits: Optional[ProcessLimits] = None
+        self.watchdog: Optional[ServerWatchdog] = None
+        self._current_process: Optional[subprocess.Popen] = None
+        self._atexit_registered = False
         self.logger = logging.Logger(self.__class__.__name__, logging.DEBUG)
 
     def __enter__(self):
@@ -46,43 +87,86 @@ class EmbeddedServer:
     def start_server(self, options_param: ServerOptions = None) -> None:
         options = options_param or ServerOptions()
 
-        self._graceful_shutdown_timeout = options.graceful_shutdown_timeout
-
         start_server = Lazy(lambda: self._run_server(options))
 
         if self.server_task and self.server_task.created and self.server_task != start_server:
             raise RuntimeError("The server was already started")
 
+        # only after the check, a rejected call must leave the running server alone
+        self._graceful_shutdown_timeout = options.graceful_shutdown_timeout
+        self._server_options = options
+        self._command_line_args = None
         self.server_task = start_server
 
         if options.security is not None:
             self.client_pem_certificate_path = options.security.client_pem_certificate_path
             self.trust_store_path = options.security.ca_certificate_path
 
-        start_server.get_value()
+        self.startup_report = StartupReport(options.phase_hooks)
+        try:
+            with self.startup_report.phase("start_server"):
+                start_server.get_value()
+        except Exception:
+            # the server process is gone, close() won't get to it
+            limits, self._process_limits = self._process_limits, None
+            if limits is not None:
+                limits.release()
+            raise
+        finally:
+            self._write_trace()
+
+        self._last_activity = time.monotonic()
+        if options.idle_timeout is not None and self._command_line_args is not None:
+            self._start_idle_monitor(options.idle_timeout)
+
+        # a server shared in daemon mode isn't a child of this process
+        if options.watchdog is not None and self._command_line_args is not None:
+            self.watchdog = ServerWatchdog(self, options.watchdog)
+            self.watchdog.start()
+
+        if options.resource_sampling_interval is not None:
+            self.resource_sampler = ResourceSampler(
+                self._server_pid, options.resource_sampling_interval, options.resource_history_size
+            )
+            self.resource_sampler.start()
 
     def get_document_store(self, database: str) -> DocumentStore:
         return self.get_document_store_from_options(DatabaseOptions.from_database_name(database))
 
-    def _initialize_document_store(self, database_name, options):
-        server_url = self.get_server_uri()
+    def _create_document_store(self, database_name: Optional[str], options: DatabaseOptions = None) -> DocumentStore:
+        store = create_document_store(
+            self.get_server_uri(),
+            database_name,
+            self.client_pem_certificate_path,
+            self.trust_store_path,
+            options.conventions if options is not None else None,
+        )
+        # registered on the request executors of server-wide operations, the other ones are registered explicitly
+        store.add_on_before_request(self._before_request)
+        return store
 
-        store = DocumentStore(server_url, database_name)
-        if self.client_pem_certificate_path:
-            store.certificate_pem_path = self.client_pem_certificate_path
-        store.trust_store_path = self.trust_store_path
-        store.conventions = options.conventions
+    def _initialize_document_store(self, database_name, options, create_database: bool = True):
+        store = self._create_document_store(database_name, options)
 
-        store.add_after_close(lambda: self.document_stores.pop(database_name))
+        store.add_after_close(lambda: self.document_stores.pop(database_name, None))
 
         store.initialize()
 
-        if not options.skip_creating_database:
+        if create_database and not options.skip_creating_database:
             self._try_create_database(options, store)
 
+        # the request executor is created once the database exists, its first topology update targets the database
+        request_executor = store.get_request_executor()
+        request_executor.add_on_before_request(self._before_request)
+        self.request_metrics.attach(request_executor)
+
         return store
 
     def get_document_store_from_options(self, options: DatabaseOptions) -> DocumentStore:
+        return self._get_document_store(options, create_database=True)
+
+    def _get_document_store(self, options: DatabaseOptions, create_database: bool) -> DocumentStore:
+        self._last_activity = time.monotonic()
         database_name = options.database_record.database_name
 
         if not database_name or database_name.isspace():
@@ -90,34 +174,113 @@ class EmbeddedServer:
 
         self._log_debug(f"Creating document store for '{database_name}'.")
 
-        lazy = Lazy(lambda: self._initialize_document_store(database_name, options))
+        lazy = Lazy(lambda: self._initialize_document_store(database_name, options, create_database))
 
+        # setdefault is atomic, so every caller ends up with the same Lazy and only one of them initializes the store
+        # each database has its own Lazy, so different databases still initialize in parallel
         return self.document_stores.setdefault(database_name, lazy).get_value()
 
+    def ensure_databases(
+        self, options_list: List[DatabaseOptions], max_parallelism: int = 8
+    ) -> Dict[str, DocumentStore]:
+        for options in options_list:
+            database_name = options.database_record.database_name
+            if not database_name or database_name.isspace():
+                raise ValueError("DatabaseName cannot be null or whitespace")
+
+        shared_store = self._get_shared_store()
+
+        # one round trip instead of a CreateDatabaseOperation per database, database names are case insensitive
+        existing = {
+            name.lower() for name in shared_store.maintenance.server.send(GetDatabaseNamesOperation(0, 2**31 - 1))
+        }
+        missing = [
+            options
+            for options in options_list
+            if not options.skip_creating_database and options.database_record.database_name.lower() not in existing
+        ]
+        self._log_debug(f"Creating {len(missing)} of {len(options_list)} databases.")
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_parallelism), thread_name_prefix="ravendb-provision"
+        ) as executor:
+            for _ in executor.map(lambda o: self._try_create_database(o, shared_store), missing):
+                pass
+
+            # the databases exist now, so the stores don't send their own CreateDatabaseOperation
+            stores = executor.map(lambda o: self._get_document_store(o, create_database=False), options_list)
+            return {options.database_record.database_name: store for options, store in zip(options_list, stores)}
+
+    def get_database_handle(self, database: str) -> DatabaseHandle:
+        return self.get_database_handle_from_options(DatabaseOptions.from_database_name(database))
+
+    def get_database_handle_from_options(self, options: DatabaseOptions) -> DatabaseHandle:
+        # unlike get_document_store, all the handles share a single DocumentStore and connection pool
+        # DatabaseOptions.conventions are ignored, the shared store uses the default conventions
+        self._last_activity = time.monotonic()
+        database_name = options.database_record.database_name
+
+        if not database_name or database_name.isspace():
+            raise ValueError("DatabaseName cannot be null or whitespace")
+
+        lazy = Lazy(lambda: self._initialize_database_handle(options))
+
+        return self.database_handles.setdefault(database_name, lazy).get_value()
+
+    def _initialize_database_handle(self, options: DatabaseOptions) -> DatabaseHandle:
+        store = self._get_shared_store()
+        database_name = options.database_record.database_name
+
+        if not options.skip_creating_database:
+            self._try_create_database(options, store)
+
+        request_executor = store.get_request_executor(database_name)
+        request_executor.add_on_before_request(self._before_request)
+        self.request_metrics.attach(request_executor)
+        self._share_connection_pool(request_executor)
+
+        return DatabaseHandle(store, database_name)
+
+    def _share_connection_pool(self, request_executor: RequestExecutor) -> None:
+        # every database still gets its own request executor, but they all send requests through one pool of sockets
+        session = request_executor.http_session
+        session.mount("http://", self._shared_http_adapter)
+        session.mount("https://", self._shared_http_adapter)
+
+    def _get_shared_store(self) -> DocumentStore:
+        return self._shared_store.get_value()
+
+    def _initialize_shared_store(self) -> DocumentStore:
+        # a store without a database, used by server-wide operations and by the database handles
+        store = self._create_document_store(None)
+        self._shared_http_adapter = HTTPAdapter(pool_maxsize=self.SHARED_CONNECTION_POOL_SIZE)
+        return store.initialize()
+
     def _try_create_database(self, options: DatabaseOptions, store: DocumentStore) -> None:
-        try:
-            store.maintenance.server.send(CreateDatabaseOperation(options.database_record))
-        except Exception as e:
-            # Expected behavior when the database already exists
-            if (
-                "conflict" in e.args[0] or "already exists" in e.args[0]
-            ):  # todo: change exc type when python client will implement conflict handling
-                self._log_debug(f"{options.database_record.database_name} already exists.")
-            else:
-                raise e
+        with self.startup_report.phase("create_database", database=options.database_record.database_name) as details:
+            details["created"] = try_create_database(store, options, self._log_debug)
 
     def get_server_uri(self) -> str:
+        return self._get_server()[0]
+
+    def _get_server(self) -> Tuple[str, Optional[subprocess.Popen]]:
+        # lock order is _lifecycle_lock, then the lock of the Lazy
+        # resuming a suspended server runs inside the Lazy, so it must never wait for _lifecycle_lock from there
         server = self.server_task
-        if server is None:
-            raise RuntimeError("Please run start_server() before trying to use the server.")
+        if server is not None and server.created:
+            return server.get_value()
 
-        return server.get_value()[0]
+        with self._lifecycle_lock:
+            server = self.server_task
+            if server is None:
+                raise RuntimeError("Please run start_server() before trying to use the server.")
+            return server.get_value()
 
     def _shutdown_server_process(self, process: subprocess.Popen) -> None:
         if not process or process.poll() is not None:
             return
 
-        with process:
+        with process, self.startup_report.phase("shutdown", pid=process.pid, mode="already_exited") as details:
             if process.poll() is not None:  # Check if the process has already terminated
                 return
 
@@ -127,6 +290,7 @@ class EmbeddedServer:
                     process.stdin.write("shutdown no-confirmation\n".encode("utf-8"))
 
                 if process.wait(self._graceful_shutdown_timeout.total_seconds()) == 0:
+                    details["mode"] = "graceful"
                     return
 
             except Exception as e:
@@ -134,45 +298,278 @@ class EmbeddedServer:
                     f"Failed to gracefully shutdown server in {self._graceful_shutdown_timeout}. Error: {e}"
                 )
 
+            details["mode"] = "forced"
+            self._log_debug("Killing global server")
+            self._terminate_server_process(process)
+
+    @staticmethod
+    def create_preflight_pipeline(options: ServerOptions) -> PreflightPipeline:
+        pipeline = PreflightPipeline()
+
+        provide_dependencies = []
+        if options.clear_target_server_location:
+            pipeline.add_step(
+                "clear_target_server_location",
+                lambda: shutil.rmtree(options.target_server_location, ignore_errors=True),
+            )
+            provide_dependencies.append("clear_target_server_location")
+
+        def provide_server_files() -> None:
             try:
-                self._log_debug("Killing global server")
-                process.terminate()  # Use terminate() instead of kill()
-                process.wait()
+                options.provider.provide(options.target_server_location)
             except Exception as e:
-                self._log_debug(f"Failed to terminate server process. Error: {e}")
+                raise RuntimeError(f"Failed to spawn server files. {e}") from e
 
-    def _run_server(self, options: ServerOptions) -> Tuple[str, subprocess.Popen]:
+        pipeline.add_step("provide", provide_server_files, provide_dependencies)
+
+        if options.data_directory_template:
+            pipeline.add_step(
+                "clone_data_directory_template",
+                lambda: EmbeddedServer._clone_data_directory(options.data_directory_template, options.data_directory),
+            )
+
+        if options.framework_version:
+            pipeline.add_step("match_runtime", lambda: RuntimeFrameworkVersionMatcher.match(options))
+
+        if options.security and options.security.client_pem_certificate_path:
+            pipeline.add_step(
+                "certificate_thumbprint",
+                lambda: RavenServerRunner.get_certificate_thumbprint(options.security.client_pem_certificate_path),
+            )
+
+        return pipeline
+
+    @staticmethod
+    def _clone_data_directory(source: str, destination: str) -> None:
+        if not os.path.isdir(source):
+            raise RuntimeError(f"Data directory template '{source}' doesn't exist")
+
+        shutil.rmtree(destination, ignore_errors=True)
+        # the server writes to its files in place, so hardlinks would corrupt the source - reflink or copy only
+        clone_tree(source, destination, allow_hardlink=False)
+
+    def capture_data_directory_template(self, template_directory: str) -> None:
+        lazy = self.server_task
+        if lazy is None or not lazy.created or self._server_options is None:
+            raise RuntimeError("Please run start_server() before trying to use the server.")
+
+        process = lazy.get_value()[1]
+        if process is None:
+            raise RuntimeError("Unable to capture a template from a server shared in daemon mode")
+        data_directory = self._server_options.data_directory
+
+        # the data files are only consistent once the server has flushed and released them
+        self.close()
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"The server wasn't shut down cleanly (exit code {process.returncode}), "
+                f"unable to capture '{data_directory}' as a template"
+            )
+
+        staging_directory = f"{template_directory}.{os.getpid()}.tmp"
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        try:
+            clone_tree(data_directory, staging_directory, allow_hardlink=False)
+            shutil.rmtree(template_directory, ignore_errors=True)
+            os.replace(staging_directory, template_directory)
+        except BaseException:
+            shutil.rmtree(staging_directory, ignore_errors=True)
+            raise
+
+    def _run_server(self, options: ServerOptions) -> Tuple[str, Optional[subprocess.Popen]]:
+        RavenServerRunner.validate_options(options)
+        # restarts and resumes start the server in the same cgroup
+        self._process_limits = ProcessLimits.from_options(options)
+
+        if options.daemon_mode:
+            return self._attach_or_spawn_daemon(options), None
+
+        # the steps are independent of each other, so cold start takes as long as the slowest one
         try:
-            if options.clear_target_server_location:
-                shutil.rmtree(options.target_server_location, ignore_errors=True)
+            preflight = self.create_preflight_pipeline(options).run(phase=self.startup_report.phase)
+        except PreflightStepError as e:
+            self._log_debug(str(e))
+            raise
 
-            options.provider.provide(options.target_server_location)
-        except Exception as e:
-            self._log_debug(f"Failed to spawn server files. {e}")
-            raise RuntimeError(f"Failed to spawn server files. {e}") from e
+        command_line_args = RavenServerRunner.build_command_line(
+            options,
+            RavenServerRunner.find_server_dll(options),
+            preflight.get("match_runtime"),
+            preflight.get("certificate_thumbprint"),
+        )
+        self._command_line_args = command_line_args
+
+        return self._launch_server_process(options, command_line_args)
 
-        process = RavenServerRunner.run(options)
+    def _launch_server_process(
+        self, options: ServerOptions, command_line_args: List[str]
+    ) -> Tuple[str, subprocess.Popen]:
+        with self.startup_report.phase("spawn") as phase_details:
+            process = RavenServerRunner.start_process(
+                command_line_args, RavenServerRunner.build_environment(options), self._process_limits
+            )
+            phase_details["pid"] = process.pid
+        spawned_at = time.perf_counter()
 
         self._log_debug("Starting global server")
 
-        atexit.register(lambda: self._shutdown_server_process(process))
+        # one handler per server, it shuts down whichever process is the current one at exit
+        self._current_process = process
+        if not self._atexit_registered:
+            self._atexit_registered = True
+            atexit.register(self._shutdown_at_exit)
+
+        output_queue: Queue[str] = Queue()
+        stdout_closed = Event()
+        first_line_seen = Event()
+
+        def startup_listener(stream_name: str, line: Optional[str]) -> None:
+            if line is not None and not first_line_seen.is_set():
+                first_line_seen.set()
+                self.startup_report.add("first_output_line", spawned_at, stream=stream_name)
+
+            if line is None:
+                if stream_name == ProcessOutputDrainer.STDOUT:
+                    # the process is gone, there's no point in waiting for the deadline
+                    stdout_closed.set()
+                    output_queue.put(self.END_OF_STREAM_MARKER)
+                return
+
+            if stream_name == ProcessOutputDrainer.STDOUT:
+                output_queue.put(line)
+
+            if match_fatal_startup_message(line) is not None:
+                output_queue.put(self.END_OF_STREAM_MARKER)
+
+        self.server_output = ProcessOutputDrainer(
+            process, options.server_output_buffer_size, options.server_output_callback
+        )
+        self.server_output.add_listener(startup_listener)
+        self.server_output.start()
 
         url_ref: Dict[str, Optional[str]] = {"value": None}
         startup_duration = Stopwatch.create_started()
 
-        output_string = self.read_output(
-            process.stdout,
-            startup_duration,
-            options,
-            lambda line, builder: self.online(line, builder, url_ref, process, startup_duration, options),
-        )
+        try:
+            output_string = self.read_output(
+                output_queue,
+                startup_duration,
+                options,
+                lambda line, builder: self.online(line, builder, url_ref, process, startup_duration, options),
+            )
+        finally:
+            # from now on the drainer only keeps the last lines, so memory stays bounded
+            self.server_output.remove_listener(startup_listener)
 
         if url_ref["value"] is None:
-            error_string = self.read_output(process.stderr, startup_duration, options, None)
+            timed_out = startup_duration.elapsed() >= options.max_server_startup_time_duration
+            exit_code = process.poll()
+            if exit_code is None and stdout_closed.is_set():
+                try:
+                    # stdout closes right before the process exits
+                    exit_code = process.wait(1)
+                except subprocess.TimeoutExpired:
+                    pass
+            # the server never came online, so there's nothing to shut down gracefully
+            self._terminate_server_process(process)
+
+            error_output = self._read_error_output()
+            output_lines = self.server_output.stdout_lines
+            raise create_startup_error(
+                self.build_startup_exception_message(
+                    output_string or "".join(line + os.linesep for line in output_lines), error_output
+                ),
+                output_lines,
+                self.server_output.stderr_lines,
+                exit_code,
+                timed_out,
+            )
+
+        self.startup_report.add("online", spawned_at, url=url_ref["value"])
+        return url_ref["value"], process
+
+    def _shutdown_at_exit(self) -> None:
+        process = self._current_process
+        if process is not None:
             self._shutdown_server_process(process)
-            raise RuntimeError(self.build_startup_exception_message(output_string, error_string))
 
-        return url_ref["value"], process
+    def _terminate_server_process(self, process: subprocess.Popen) -> None:
+        if process.poll() is not None:
+            return
+
+        timeout = self._graceful_shutdown_timeout.total_seconds()
+        try:
+            process.terminate()
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self._log_debug(f"Server process {process.pid} didn't exit within {timeout} s after being killed.")
+        except Exception as e:
+            self._log_debug(f"Failed to terminate server process. Error: {e}")
+
+    def _attach_or_spawn_daemon(self, options: ServerOptions) -> str:
+        # the hash is taken before build_command_line fills in the default server_url
+        daemon = ServerDaemon(
+            options.data_directory,
+            ServerDaemon.hash_options(options),
+            options.daemon_idle_timeout,
+            options.graceful_shutdown_timeout,
+        )
+
+        def spawn() -> Tuple[str, subprocess.Popen]:
+            try:
+                preflight = self.create_preflight_pipeline(options).run(phase=self.startup_report.phase)
+            except PreflightStepError as e:
+                self._log_debug(str(e))
+                raise
+
+            command_line_args = RavenServerRunner.build_command_line(
+                options,
+                RavenServerRunner.find_server_dll(options),
+                preflight.get("match_runtime"),
+                preflight.get("certificate_thumbprint"),
+                detached=True,
+            )
+            output_path = os.path.join(options.logs_path, ServerDaemon.OUTPUT_FILE_NAME)
+            process = RavenServerRunner.start_detached_process(
+                command_line_args, output_path, RavenServerRunner.build_environment(options), self._process_limits
+            )
+
+            self._log_debug("Starting shared server")
+
+            url = ServerDaemon.wait_until_online(process, output_path, options.max_server_startup_time_duration)
+            if url is None:
+                exit_code = process.poll()
+                self._terminate_server_process(process)
+                with open(output_path, "r", errors="replace") as f:
+                    output_string = f.read()
+                raise create_startup_error(
+                    self.build_startup_exception_message(output_string, ""),
+                    output_string.splitlines(),
+                    [],
+                    exit_code,
+                    timed_out=exit_code is None,
+                )
+
+            return url, process
+
+        url = daemon.attach_or_spawn(spawn)
+        self._log_debug(f"{'Started' if daemon.spawned else 'Attached to'} shared server {url} (pid {daemon.pid})")
+
+        self.daemon = daemon
+        atexit.register(daemon.detach)
+        return url
+
+    def _read_error_output(self) -> str:
+        if self.server_output is None:
+            return ""
+
+        # the process is gone at this point, so the drainer reaches the end of stderr quickly
+        self.server_output.join(timeout=1)
+        return "".join(line + os.linesep for line in self.server_output.stderr_lines)
 
     @staticmethod
     def build_startup_exception_message(output_string: str, error_string: str) -> str:
@@ -202,9 +599,8 @@ class EmbeddedServer:
         options: ServerOptions,
     ):
         if line is None:
-            error_string = self.read_output(process.stderr, startup_duration, options, None)
             self._shutdown_server_process(process)
-            raise RuntimeError(self.build_startup_exception_message("".join(builder), error_string))
+            raise RuntimeError(self.build_startup_exception_message("".join(builder), self._read_error_output()))
 
         prefix = "Server available on: "
         if line.startswith(prefix):
@@ -215,32 +611,21 @@ class EmbeddedServer:
 
     def read_output(
         self,
-        output: IO,
+        output_queue: Queue[str],
         startup_duration: Stopwatch,
         options: ServerOptions,
         online: Optional[Callable[[str, List[str]], bool]],
     ):
         def read_output_line() -> Optional[str]:
-            while True:
-                try:
-                    line_ = output_queue.get_nowait()
-                    return line_
-                except queue.Empty:
-                    if options.max_server_startup_time_duration - startup_duration.elapsed() <= timedelta(seconds=0):
-                        return None
-                    time.sleep(1)
-
-        def output_reader():
+            # block until the next line arrives or the startup deadline passes
+            remaining = options.max_server_startup_time_duration - startup_duration.elapsed()
+            if remaining <= timedelta(seconds=0):
+                return None
             try:
-                for line_ in iter(output.readline, b""):
-                    output_queue.put(line_.decode("utf-8").strip())
-                output_queue.put(self.END_OF_STREAM_MARKER)
-            except Exception as e:
-                raise RavenException("Unable to read server output") from e
-
-        output_queue: Queue[str] = Queue()
-        output_thread = Thread(target=output_reader, daemon=True)
-        output_thread.start()
+                line = output_queue.get(timeout=remaining.total_seconds())
+            except queue.Empty:
+                return None
+            return None if line == self.END_OF_STREAM_MARKER else line
 
         sb = []
 
@@ -265,6 +650,15 @@ class EmbeddedServer:
 
         return "".join(sb)
 
+    def stats(self) -> Dict[str, object]:
+        # a snapshot, later requests don't change the returned dicts
+        sample = self.resource_sampler.latest if self.resource_sampler is not None else None
+        return {
+            "requests": self.request_metrics.snapshot(),
+            "idle": self.idle_metrics.snapshot(),
+            "resources": dict(vars(sample)) if sample is not None else None,
+        }
+
     def open_studio_in_browser(self):
         server_url = self.get_server_uri()
 
@@ -273,32 +667,247 @@ class EmbeddedServer:
         except Exception as e:
             raise RuntimeError(e)
 
+    def restart(self) -> None:
+        with self._lifecycle_lock:
+            lazy = self.server_task
+            if lazy is None or self._server_options is None:
+                raise RuntimeError("Please run start_server() before trying to use the server.")
+
+            if self._command_line_args is None:
+                raise RuntimeError("A server shared in daemon mode can't be restarted")
+
+            # a suspended server is resumed by get_value(), restarting it right after would be pointless
+            was_created = lazy.created
+            url, process = lazy.get_value()
+            if not was_created:
+                return
+
+            self._relaunch(url, process, self._shutdown_server_process)
+
+    def _relaunch(
+        self, url: str, process: subprocess.Popen, stop_process: Callable[[subprocess.Popen], None]
+    ) -> Tuple[str, subprocess.Popen]:
+        # callers hold _lifecycle_lock
+        self._available.clear()
+        try:
+            stop_process(process)
+            try:
+                restarted = self._launch_server_process(self._server_options, self._pin_server_url(url))
+            except Exception as e:
+                # server_task still holds the old process, which is shut down already
+                message = (
+                    f"Failed to restart the server, it stays stopped until restart() succeeds or close() is called. {e}"
+                )
+                if isinstance(e, ServerStartupError):
+                    raise type(e)(message, e.output, e.error_output, e.exit_code, e.fatal_line) from e
+                raise ServerStartupError(message) from e
+            self.server_task = Lazy(lambda: restarted)
+            return self.server_task.get_value()
+        finally:
+            self._available.set()
+
+    def _server_pid(self) -> Optional[int]:
+        # None while the server is suspended or stopped
+        server = self.server_task
+        if server is None or not server.created:
+            return None
+        process = server.get_value()[1]
+        if process is not None:
+            return process.pid
+        daemon = self.daemon
+        return daemon.pid if daemon is not None else None
+
+    def _restart_process(self, process: subprocess.Popen) -> Optional[Tuple[str, subprocess.Popen]]:
+        # restarts the server unless it was restarted, suspended or closed since process was its process
+        # the process exited or hangs, so it's terminated instead of being asked to shut down
+        with self._lifecycle_lock:
+            server = self.server_task
+            if server is None or not server.created:
+                return None
+            url, current = server.get_value()
+            if current is not process:
+                return None
+            return self._relaunch(url, process, self._terminate_server_process)
+
+    def _pin_server_url(self, url: str) -> List[str]:
+        # same port as before, so the existing document stores keep working
+        return [f"--ServerUrl={url}" if arg.startswith("--ServerUrl=") else arg for arg in self._command_line_args]
+
+    def _before_request(self, event_args: BeforeRequestEventArgs = None) -> None:
+        self._last_activity = time.monotonic()
+
+        # requests sent while the server restarts wait for it instead of failing
+        if not self._available.is_set():
+            self._available.wait(self._server_options.max_server_startup_time_duration.total_seconds())
+
+        server = self.server_task
+        if server is not None and not server.created:
+            # the server was suspended while idle
+            self._get_server()
+
+    def _start_idle_monitor(self, idle_timeout: timedelta) -> None:
+        self._stop_idle_monitor.set()
+        stop = self._stop_idle_monitor = Event()
+        interval = max(0.01, min(idle_timeout.total_seconds() / 4, 5))
+
+        def monitor() -> None:
+            while not stop.wait(interval):
+                if time.monotonic() - self._last_activity >= idle_timeout.total_seconds():
+                    self._suspend(idle_timeout)
+
+        Thread(target=monitor, name="ravendb-embedded-idle-monitor", daemon=True).start()
+
+    def _suspend(self, idle_timeout: timedelta) -> None:
+        with self._lifecycle_lock:
+            lazy = self.server_task
+            if lazy is None or not lazy.created or self._command_line_args is None:
+                return
+
+            # activity might have happened while waiting for the lock
+            if time.monotonic() - self._last_activity < idle_timeout.total_seconds():
+                return
+
+            url, process = lazy.get_value()
+            self._log_debug(f"Suspending server after {idle_timeout} without activity.")
+            self.server_task = Lazy(lambda: self._resume(url))
+            self._suspended = True
+            self._shutdown_server_process(process)
+            self.idle_metrics.add_suspend()
+
+    def _resume(self, url: str) -> Tuple[str, subprocess.Popen]:
+        # callers hold _lifecycle_lock (see _get_server), so a suspend which is still shutting down finished already
+        self._log_debug("Resuming suspended server.")
+        resume_duration = Stopwatch.create_started()
+        resumed = self._launch_server_process(self._server_options, self._pin_server_url(url))
+        self._last_activity = time.monotonic()
+        self._suspended = False
+        self.idle_metrics.add_resume(resume_duration.elapsed())
+        return resumed
+
     def close(self):
+        with self._lifecycle_lock:
+            self._close()
+
+    def _close(self):
         lazy = self.server_task
-        if lazy is None or not lazy.created:
+        if lazy is None or (not lazy.created and not self._suspended):
             return
 
-        process = lazy.get_value()[1]
-        self._shutdown_server_process(process)
+        self._stop_idle_monitor.set()
+        watchdog, self.watchdog = self.watchdog, None
+        if watchdog is not None:
+            watchdog.stop()
+        if self.resource_sampler is not None:
+            self.resource_sampler.stop()
+
+        # a suspended server has no process, but its stores still have to be closed
+        if lazy.created:
+            self._shutdown_server_process(lazy.get_value()[1])
 
-        for key, value in self.document_stores.items():
+        # a server shared in daemon mode keeps running in its cgroup
+        limits, self._process_limits = self._process_limits, None
+        if limits is not None and self.daemon is None:
+            limits.release()
+
+        # closing a store removes it from document_stores
+        for value in list(self.document_stores.values()):
             if value.created:
                 value.get_value().close()
 
         self.document_stores.clear()
+
+        self.database_handles.clear()
+        shared_store, self._shared_store = self._shared_store, Lazy(self._initialize_shared_store)
+        if shared_store.created:
+            shared_store.get_value().close()
+        self._shared_http_adapter = None
+
+        # the last process to detach stops a server shared in daemon mode
+        daemon, self.daemon = self.daemon, None
+        if daemon is not None:
+            daemon.detach()
+
         self.server_task = None
+        self._suspended = False
+        self._write_trace()
+
+    def _write_trace(self) -> None:
+        options = self._server_options
+        if options is None or not options.trace_file:
+            return
+        try:
+            self.startup_report.write_chrome_trace(options.trace_file)
+        except OSError as e:
+            self._log_debug(f"Failed to write trace file {options.trace_file}. Error: {e}")
+
+
+class IdleMetrics:
+    # updated by the idle monitor and by request threads
+    def __init__(self):
+        self.suspend_count = 0
+        self.resume_count = 0
+        self.last_resume_duration: Optional[timedelta] = None
+        self.total_resume_duration = timedelta(0)
+        self._lock = Lock()
+
+    def add_suspend(self) -> None:
+        with self._lock:
+            self.suspend_count += 1
+
+    def add_resume(self, duration: timedelta) -> None:
+        with self._lock:
+            self.resume_count += 1
+            self.last_resume_duration = duration
+            self.total_resume_duration += duration
+
+    @property
+    def average_resume_duration(self) -> Optional[timedelta]:
+        with self._lock:
+            return self.total_resume_duration / self.resume_count if self.resume_count else None
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "suspend_count": self.suspend_count,
+                "resume_count": self.resume_count,
+                "last_resume_duration": self.last_resume_duration,
+                "total_resume_duration": self.total_resume_duration,
+            }
 
 
 class Lazy(Generic[_T]):
-    def __init__(self, func: Callable[[], _T]):
+    # once-cell: concurrent callers wait for the single thread which runs func
+    # a failure is raised to every waiting caller and retried by the next call, unless cache_failures is set
+    def __init__(self, func: Callable[[], _T], cache_failures: bool = False):
         self.func = func
+        self.cache_failures = cache_failures
         self._value = None
+        self._error: Optional[BaseException] = None
         self._created = False
+        # finished attempts, a caller which sees it change while waiting for the lock gets that attempt's error
+        self._attempts = 0
+        self._lock = Lock()
 
     def get_value(self) -> _T:
-        if not self._created:
-            self._value = self.func()
-            self._created = True
+        if self._created:
+            return self._value
+
+        attempts = self._attempts
+        with self._lock:
+            if not self._created:
+                if self._error is not None and (self.cache_failures or self._attempts != attempts):
+                    raise self._error
+
+                try:
+                    self._value = self.func()
+                except BaseException as e:
+                    self._error = e
+                    raise
+                finally:
+                    self._attempts += 1
+                self._error = None
+                self._created = True
+
         return self._value
 
     @property
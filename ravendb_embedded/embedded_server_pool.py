@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from threading import Condition, Event, Thread
+from typing import Callable, Deque, Dict, Iterator, Optional, Set, Tuple
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.options import ServerOptions
+
+
+class EmbeddedServerPool:
+    # keeps already started servers around, so tests which need an isolated server don't wait for it to boot
+    def __init__(
+        self,
+        server_options: Optional[ServerOptions] = None,
+        max_size: int = 4,
+        min_idle: int = 1,
+        idle_timeout: Optional[timedelta] = None,
+        reset_server: Optional[Callable[[EmbeddedServer], None]] = None,
+        options_factory: Optional[Callable[[int], ServerOptions]] = None,
+        base_directory: Optional[str] = None,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        if min_idle < 0 or min_idle > max_size:
+            raise ValueError("min_idle must be between 0 and max_size")
+
+        self.max_size = max_size
+        self.min_idle = min_idle
+        self.idle_timeout = idle_timeout
+        self.reset_server = reset_server
+        self.logger = logging.Logger(self.__class__.__name__, logging.DEBUG)
+
+        self._server_options = server_options or ServerOptions()
+        self._options_factory = options_factory
+        self._owns_base_directory = options_factory is None and base_directory is None
+        self._base_directory = base_directory or (None if options_factory else tempfile.mkdtemp(prefix="ravendb-pool-"))
+        self._server_directories: Dict[EmbeddedServer, str] = {}
+
+        self._indexes = itertools.count()
+        self._condition = Condition()
+        self._idle: Deque[Tuple[EmbeddedServer, float]] = deque()
+        self._in_use: Set[EmbeddedServer] = set()
+        self._starting = 0
+        self._waiting = 0
+        self._last_start_error: Optional[BaseException] = None
+        self._closed = False
+
+        self._executor = ThreadPoolExecutor(max_workers=max_size, thread_name_prefix="ravendb-pool")
+        self._stop_eviction = Event()
+        self._eviction_thread: Optional[Thread] = None
+        if idle_timeout is not None:
+            self._eviction_thread = Thread(target=self._evict_idle_servers, name="ravendb-pool-eviction", daemon=True)
+            self._eviction_thread.start()
+
+        with self._condition:
+            self._refill()
+
+    def __enter__(self) -> EmbeddedServerPool:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        with self._condition:
+            return len(self._idle) + len(self._in_use) + self._starting
+
+    @property
+    def idle_count(self) -> int:
+        with self._condition:
+            return len(self._idle)
+
+    @property
+    def in_use_count(self) -> int:
+        with self._condition:
+            return len(self._in_use)
+
+    def acquire(self, timeout: Optional[timedelta] = None) -> EmbeddedServer:
+        deadline = None if timeout is None else time.monotonic() + timeout.total_seconds()
+
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("The pool was closed")
+
+                    if self._idle:
+                        # the most recently released server is the warmest one
+                        server, _ = self._idle.pop()
+                        self._in_use.add(server)
+                        self._refill()
+                        return server
+
+                    if self._last_start_error is not None and self._starting == 0:
+                        error, self._last_start_error = self._last_start_error, None
+                        raise RuntimeError(f"Unable to start a pooled server. {error}") from error
+
+                    if self._starting < self._waiting and len(self._in_use) + self._starting < self.max_size:
+                        self._start_one()
+                        continue
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No pooled server became available within {timeout}")
+
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def release(self, server: EmbeddedServer, recycle: bool = False) -> None:
+        with self._condition:
+            if server not in self._in_use:
+                raise ValueError("The server wasn't acquired from this pool")
+            self._in_use.remove(server)
+
+        if not recycle and not self._closed and self.reset_server is not None:
+            try:
+                self.reset_server(server)
+            except Exception as e:
+                self.logger.log(logging.DEBUG, f"Failed to reset pooled server, recycling it. {e}")
+                recycle = True
+        else:
+            # without a way to reset it, a used server can't be handed out again
+            recycle = True
+
+        with self._condition:
+            if not recycle and not self._closed:
+                self._idle.append((server, time.monotonic()))
+                self._condition.notify_all()
+                return
+
+            closed = self._closed
+            self._refill()
+            self._condition.notify_all()
+
+        if closed:
+            self._dispose(server)
+            return
+
+        try:
+            # shutting down takes a while, don't make the caller wait for it
+            self._executor.submit(self._dispose, server)
+        except RuntimeError:
+            self._dispose(server)
+
+    @contextmanager
+    def lease(self, timeout: Optional[timedelta] = None, recycle: bool = False) -> Iterator[EmbeddedServer]:
+        server = self.acquire(timeout)
+        try:
+            yield server
+        finally:
+            self.release(server, recycle)
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        self._stop_eviction.set()
+        # let servers which are still booting finish, so they can be shut down properly
+        self._executor.shutdown(wait=True)
+
+        with self._condition:
+            servers = [server for server, _ in self._idle] + list(self._in_use)
+            self._idle.clear()
+            self._in_use.clear()
+
+        for server in servers:
+            self._dispose(server)
+
+        if self._owns_base_directory:
+            shutil.rmtree(self._base_directory, ignore_errors=True)
+
+    def _refill(self) -> None:
+        # refill-ahead: keep min_idle servers booted or booting, without exceeding max_size
+        while (
+            not self._closed
+            and len(self._idle) + self._starting < self.min_idle
+            and len(self._idle) + len(self._in_use) + self._starting < self.max_size
+        ):
+            self._start_one()
+
+    def _start_one(self) -> None:
+        self._starting += 1
+        try:
+            self._executor.submit(self._start_server, next(self._indexes))
+        except RuntimeError:
+            # the executor is already shut down
+            self._starting -= 1
+
+    def _create_options(self, index: int) -> Tuple[ServerOptions, Optional[str]]:
+        if self._options_factory is not None:
+            return self._options_factory(index), None
+
+        directory = os.path.join(self._base_directory, f"server-{index}")
+        options = self._server_options.copy()
+        options.target_server_location = os.path.join(directory, "RavenDBServer")
+        options.data_directory = os.path.join(directory, "RavenDB")
+        options.logs_path = os.path.join(directory, "Logs")
+        return options, directory
+
+    def _start_server(self, index: int) -> None:
+        server = EmbeddedServer()
+        try:
+            options, directory = self._create_options(index)
+            if directory is not None:
+                self._server_directories[server] = directory
+            server.start_server(options)
+        except BaseException as e:
+            self._dispose(server)
+            with self._condition:
+                self._starting -= 1
+                self._last_start_error = e
+                self._condition.notify_all()
+            return
+
+        with self._condition:
+            self._starting -= 1
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._idle.append((server, time.monotonic()))
+                self._condition.notify_all()
+
+        if closed:
+            self._dispose(server)
+
+    def _dispose(self, server: EmbeddedServer) -> None:
+        try:
+            server.close()
+        except Exception as e:
+            self.logger.log(logging.DEBUG, f"Failed to close pooled server. {e}")
+
+        directory = self._server_directories.pop(server, None)
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _evict_idle_servers(self) -> None:
+        interval = max(0.05, min(self.idle_timeout.total_seconds() / 2, 5))
+        while not self._stop_eviction.wait(interval):
+            expired = []
+            now = time.monotonic()
+            with self._condition:
+                # the oldest idle servers are at the left end
+                while len(self._idle) > self.min_idle and now - self._idle[0][1] >= self.idle_timeout.total_seconds():
+                    expired.append(self._idle.popleft()[0])
+
+            for server in expired:
+                self._dispose(server)
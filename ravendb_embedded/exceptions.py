@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Pattern, Sequence, Tuple, Type
+
+
+class ServerStartupError(RuntimeError):
+    def __init__(
+        self,
+        message: str,
+        output: str = "",
+        error_output: str = "",
+        exit_code: Optional[int] = None,
+        fatal_line: Optional[str] = None,
+    ):
+        super().__init__(message)
+        self.output = output
+        self.error_output = error_output
+        self.exit_code = exit_code
+        self.fatal_line = fatal_line
+
+
+class ServerStartupTimeoutError(ServerStartupError):
+    pass
+
+
+class ServerPortInUseError(ServerStartupError):
+    pass
+
+
+class ServerCertificateError(ServerStartupError):
+    pass
+
+
+class ServerDataDirectoryLockedError(ServerStartupError):
+    pass
+
+
+class DotNetRuntimeNotFoundError(ServerStartupError):
+    pass
+
+
+# messages after which the server never comes online, checked against both stdout and stderr while starting
+FATAL_STARTUP_MESSAGES: List[Tuple[Pattern[str], Type[ServerStartupError]]] = [
+    (re.compile(r"address already in use|failed to bind to address|EADDRINUSE", re.IGNORECASE), ServerPortInUseError),
+    (
+        re.compile(
+            r"unable to (load|read) (the )?(server )?certificate|CryptographicException|"
+            r"certificate .*password is incorrect",
+            re.IGNORECASE,
+        ),
+        ServerCertificateError,
+    ),
+    (
+        re.compile(
+            r"could not (lock|open) .*(data|journal|voron)|is being used by another process|"
+            r"storage .*already in use|another RavenDB instance",
+            re.IGNORECASE,
+        ),
+        ServerDataDirectoryLockedError,
+    ),
+    (
+        re.compile(
+            r"framework 'Microsoft\.NETCore\.App'.* was not found|"
+            r"It was not possible to find any (compatible framework version|installed \.NET)|"
+            r"You must install or update \.NET",
+            re.IGNORECASE,
+        ),
+        DotNetRuntimeNotFoundError,
+    ),
+]
+
+
+def match_fatal_startup_message(line: str) -> Optional[Type[ServerStartupError]]:
+    for pattern, error_type in FATAL_STARTUP_MESSAGES:
+        if pattern.search(line):
+            return error_type
+    return None
+
+
+def create_startup_error(
+    message: str,
+    output_lines: Sequence[str],
+    error_lines: Sequence[str],
+    exit_code: Optional[int] = None,
+    timed_out: bool = False,
+) -> ServerStartupError:
+    # stderr first, it usually holds the actual reason while stdout only has the banner
+    for line in list(error_lines) + list(output_lines):
+        error_type = match_fatal_startup_message(line)
+        if error_type is not None:
+            return error_type(message, "\n".join(output_lines), "\n".join(error_lines), exit_code, line)
+
+    error_type = ServerStartupTimeoutError if timed_out else ServerStartupError
+    return error_type(message, "\n".join(output_lines), "\n".join(error_lines), exit_code)
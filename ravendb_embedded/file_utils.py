@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = "RAVENDB_EMBEDDED_CACHE_DIR"
+
+# ioctl request which asks the filesystem to share extents between two files (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# (source device, destination device) pairs on which a method already failed once
+_reflink_unsupported_devices: Set[Tuple[int, int]] = set()
+_hardlink_unsupported_devices: Set[Tuple[int, int]] = set()
+
+
+def default_cache_directory() -> str:
+    configured = os.environ.get(CACHE_DIRECTORY_ENVIRONMENT_VARIABLE)
+    if configured:
+        return configured
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(str(Path.home()), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(str(Path.home()), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(str(Path.home()), ".cache")
+
+    return os.path.join(base, "ravendb_embedded")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomically(path: str, data: Any) -> None:
+    # readers see either the previous or the new content, never a partially written file
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary_path, path)
+
+
+def read_json(path: str) -> Optional[Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class FileLock:
+    # exclusive lock shared between processes, backed by flock() on POSIX and msvcrt.locking() on Windows
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                self._file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10 seconds, keep waiting
+                        continue
+        except BaseException:
+            self._file.close()
+            self._file = None
+            raise
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+def _try_reflink(source: str, destination: str, devices: Tuple[int, int]) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux") or devices in _reflink_unsupported_devices:
+        return False
+
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    except OSError:
+        _reflink_unsupported_devices.add(devices)
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        return False
+
+    shutil.copystat(source, destination)
+    return True
+
+
+def _try_hardlink(source: str, destination: str, devices: Tuple[int, int]) -> bool:
+    if devices in _hardlink_unsupported_devices:
+        return False
+
+    try:
+        os.link(source, destination)
+        return True
+    except OSError:
+        _hardlink_unsupported_devices.add(devices)
+        return False
+
+
+def clone_file(source: str, destination: str, allow_hardlink: bool = False) -> str:
+    # returns the method used: 'reflink', 'hardlink' or 'copy'
+    # hardlinks share the data with the source, so they are only used when explicitly allowed
+    if os.path.lexists(destination):
+        os.remove(destination)
+
+    devices = (os.stat(source).st_dev, os.stat(os.path.dirname(destination) or ".").st_dev)
+
+    if _try_reflink(source, destination, devices):
+        return "reflink"
+
+    if allow_hardlink and _try_hardlink(source, destination, devices):
+        return "hardlink"
+
+    shutil.copy2(source, destination)
+    return "copy"
+
+
+def list_tree(root: str, exclude: Tuple[str, ...] = ()) -> Tuple[List[str], List[str]]:
+    # returns (directories, files) relative to root, parents always listed before children
+    directories, files = [], []
+    for current, dir_names, file_names in os.walk(root):
+        relative = os.path.relpath(current, root)
+        dir_names.sort()
+        for name in dir_names:
+            directories.append(os.path.normpath(os.path.join(relative, name)))
+        for name in sorted(file_names):
+            if name not in exclude:
+                files.append(os.path.normpath(os.path.join(relative, name)))
+    return directories, files
+
+
+def clone_tree(
+    source: str,
+    destination: str,
+    allow_hardlink: bool = False,
+    max_workers: Optional[int] = None,
+    exclude: Tuple[str, ...] = (),
+) -> None:
+    directories, files = list_tree(source, exclude)
+
+    os.makedirs(destination, exist_ok=True)
+    for directory in directories:
+        os.makedirs(os.path.join(destination, directory), exist_ok=True)
+
+    def clone(relative_path: str) -> str:
+        return clone_file(os.path.join(source, relative_path), os.path.join(destination, relative_path), allow_hardlink)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # consume the results so the first failure is raised here
+        for _ in executor.map(clone, files):
+            pass
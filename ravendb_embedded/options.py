@@ -1,18 +1,23 @@
 from __future__ import annotations
 
+import copy
 import os
 from datetime import timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Callable, List, Dict, Union, Iterable
 
 from ravendb.documents.conventions import DocumentConventions
 from ravendb.exceptions.raven_exceptions import RavenException
 from ravendb.serverwide.database_record import DatabaseRecord
 
+from ravendb_embedded.performance_profile import PerformanceProfile
+from ravendb_embedded.startup_report import PhaseTiming
+from ravendb_embedded.watchdog import WatchdogOptions
 from ravendb_embedded.provide import (
     ProvideRavenDBServer,
     ExternalServerProvider,
     CopyServerFromNugetProvider,
+    CachedServerProvider,
 )
 
 
@@ -45,6 +50,7 @@ class ServerOptions:
         self.framework_version: str = "7.0.15+"
         self.logs_path: str = self.BASE_MODULE_DIRECTORY + "/RavenDB/Logs"
         self.data_directory: str = self.BASE_MODULE_DIRECTORY + "/RavenDB"
+        self.data_directory_template: Optional[str] = None
         self.provider: ProvideRavenDBServer = CopyServerFromNugetProvider()
         self.target_server_location: str = self.DEFAULT_SERVER_LOCATION
         self.dot_net_path: str = "dotnet"
@@ -54,12 +60,39 @@ class ServerOptions:
         self.graceful_shutdown_timeout: timedelta = timedelta(seconds=30)
         self.max_server_startup_time_duration: timedelta = timedelta(minutes=1)
         self.command_line_args: list[str] = list()
+        self.performance_profile: Union[str, PerformanceProfile, None] = None
+        # applied on top of the performance profile, None removes a variable inherited from this process
+        self.environment_variables: Dict[str, Optional[str]] = dict()
+        # Linux only, see ProcessLimits
+        self.cpu_affinity: Optional[Iterable[int]] = None
+        self.nice: Optional[int] = None
+        self.io_priority: Optional[int] = None
+        self.memory_limit_mb: Optional[int] = None
         self.security: Optional[SecurityOptions] = None
+        self.server_output_buffer_size: int = 1000
+        self.server_output_callback: Optional[Callable[[str, str], None]] = None
+        self.idle_timeout: Optional[timedelta] = None
+        self.watchdog: Optional[WatchdogOptions] = None
+        self.phase_hooks: List[Callable[[PhaseTiming], None]] = list()
+        self.trace_file: Optional[str] = None
+        self.resource_sampling_interval: Optional[timedelta] = None
+        self.resource_history_size = 720
+        self.daemon_mode: bool = False
+        self.daemon_idle_timeout: timedelta = timedelta(minutes=5)
 
     @classmethod
     def INSTANCE(cls):
         return cls()
 
+    def copy(self) -> ServerOptions:
+        # the lists, the dictionary and the security options are copied, so changing them leaves this one alone
+        result = copy.copy(self)
+        result.command_line_args = list(self.command_line_args)
+        result.environment_variables = dict(self.environment_variables)
+        result.phase_hooks = list(self.phase_hooks)
+        result.security = copy.copy(self.security)
+        return result
+
     @classmethod
     def from_external_server(cls, server_location: str) -> ServerOptions:
         instance = cls()
@@ -94,5 +127,39 @@ class ServerOptions:
 
     # todo: secured by cert exec and args
 
-    def with_external_server(self, server_location: str) -> None:
-        self.provider = ExternalServerProvider(server_location)
+    def with_external_server(self, server_location: str, sync: bool = False) -> None:
+        self.provider = ExternalServerProvider(server_location, sync)
+
+    def with_server_cache(self, cache_directory: Optional[str] = None, use_hardlinks: bool = True) -> ServerOptions:
+        self.provider = CachedServerProvider(self.provider, cache_directory, use_hardlinks)
+        return self
+
+    def with_data_directory_template(self, template_directory: str) -> ServerOptions:
+        self.data_directory_template = template_directory
+        return self
+
+    def with_performance_profile(self, profile: Union[str, PerformanceProfile]) -> ServerOptions:
+        self.performance_profile = profile
+        return self
+
+    def with_process_limits(
+        self,
+        cpu_affinity: Optional[Iterable[int]] = None,
+        nice: Optional[int] = None,
+        io_priority: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None,
+    ) -> ServerOptions:
+        self.cpu_affinity = cpu_affinity
+        self.nice = nice
+        self.io_priority = io_priority
+        self.memory_limit_mb = memory_limit_mb
+        return self
+
+    def with_watchdog(self, watchdog_options: Optional[WatchdogOptions] = None) -> ServerOptions:
+        self.watchdog = watchdog_options or WatchdogOptions()
+        return self
+
+    def with_daemon_mode(self, idle_timeout: timedelta = timedelta(minutes=5)) -> ServerOptions:
+        self.daemon_mode = True
+        self.daemon_idle_timeout = idle_timeout
+        return self
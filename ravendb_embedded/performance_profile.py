@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional
+
+
+class PerformanceProfile:
+    # runtime settings of the server process: DOTNET_* environment variables and RavenDB configuration keys
+    # numeric DOTNET_* values are hexadecimal, that's how the runtime reads them
+    def __init__(self, name: str, environment: Dict[str, str], configuration: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.environment = environment
+        self.configuration = configuration or {}
+
+    def __repr__(self) -> str:
+        return f"PerformanceProfile({self.name!r})"
+
+    def command_line_args(self, overridden: List[str]) -> List[str]:
+        # keys which are already in overridden (the user's command_line_args) are left out
+        keys = {arg.split("=", 1)[0] for arg in overridden}
+        return [f"--{key}={value}" for key, value in self.configuration.items() if f"--{key}" not in keys]
+
+    @classmethod
+    def fast_startup(cls) -> PerformanceProfile:
+        # precompiled (ReadyToRun) code and quick tier-0 JIT for the rest, no profile-guided recompilation
+        return cls(
+            "fast_startup",
+            {
+                "DOTNET_ReadyToRun": "1",
+                "DOTNET_TieredCompilation": "1",
+                "DOTNET_TC_QuickJit": "1",
+                "DOTNET_TC_QuickJitForLoops": "1",
+                "DOTNET_TieredPGO": "0",
+            },
+        )
+
+    @classmethod
+    def low_memory(cls, heap_hard_limit_mb: int = 512) -> PerformanceProfile:
+        # a single workstation heap with a hard limit, the GC compacts more eagerly to stay small
+        return cls(
+            "low_memory",
+            {
+                "DOTNET_gcServer": "0",
+                "DOTNET_gcConcurrent": "0",
+                "DOTNET_GCHeapHardLimit": format(heap_hard_limit_mb * 1024 * 1024, "x"),
+                "DOTNET_GCConserveMemory": "7",
+                "DOTNET_TieredPGO": "0",
+            },
+            {"Indexing.MaxNumberOfConcurrentlyRunningIndexes": "1"},
+        )
+
+    @classmethod
+    def throughput(cls, min_worker_threads: Optional[int] = None) -> PerformanceProfile:
+        # a heap per core with background collections and enough pool threads to absorb bursts without ramp-up
+        threads = min_worker_threads or 2 * (os.cpu_count() or 1)
+        return cls(
+            "throughput",
+            {
+                "DOTNET_gcServer": "1",
+                "DOTNET_gcConcurrent": "1",
+                "DOTNET_TieredPGO": "1",
+                "DOTNET_ThreadPool_ForceMinWorkerThreads": format(threads, "x"),
+            },
+        )
+
+    @classmethod
+    def from_name(cls, name: str) -> PerformanceProfile:
+        factory = PERFORMANCE_PROFILES.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown performance profile '{name}', expected one of {sorted(PERFORMANCE_PROFILES)}")
+        return factory()
+
+
+PERFORMANCE_PROFILES = {
+    "fast_startup": PerformanceProfile.fast_startup,
+    "low_memory": PerformanceProfile.low_memory,
+    "throughput": PerformanceProfile.throughput,
+}
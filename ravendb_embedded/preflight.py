@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+
+class PreflightStepError(RuntimeError):
+    def __init__(self, step_name: str, cause: BaseException):
+        super().__init__(f"Pre-flight step '{step_name}' failed. {cause}")
+        self.step_name = step_name
+        self.cause = cause
+
+
+class PreflightPipeline:
+    # runs independent startup steps concurrently, every step starts once all of its dependencies have finished
+    def __init__(self):
+        self._steps: Dict[str, Tuple[Callable[[], Any], Tuple[str, ...]]] = {}
+
+    def add_step(self, name: str, action: Callable[[], Any], depends_on: Sequence[str] = ()) -> PreflightPipeline:
+        if name in self._steps:
+            raise ValueError(f"Step '{name}' was already added")
+
+        for dependency in depends_on:
+            if dependency not in self._steps:
+                raise ValueError(f"Step '{name}' depends on unknown step '{dependency}'")
+
+        self._steps[name] = (action, tuple(depends_on))
+        return self
+
+    @property
+    def step_names(self) -> List[str]:
+        return list(self._steps)
+
+    def run(
+        self, max_workers: Optional[int] = None, phase: Optional[Callable[[str], ContextManager]] = None
+    ) -> Dict[str, Any]:
+        # phase(name) wraps every step, e.g. StartupReport.phase to time them
+        results: Dict[str, Any] = {}
+        if not self._steps:
+            return results
+
+        pending = dict(self._steps)
+        running: Dict[Future, str] = {}
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self._steps), thread_name_prefix="ravendb-preflight"
+        )
+        try:
+            while pending or running:
+                for name in [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]:
+                    action = pending.pop(name)[0]
+                    running[executor.submit(self._run_step, name, action, phase)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        # fail fast - steps which didn't start yet are dropped, running ones are waited for below,
+                        # so none of them still writes to the server directories once the error is raised
+                        for other in running:
+                            other.cancel()
+                        raise PreflightStepError(name, error) from error
+                    results[name] = future.result()
+        finally:
+            executor.shutdown(wait=True)
+
+        return results
+
+    @staticmethod
+    def _run_step(name: str, action: Callable[[], Any], phase: Optional[Callable[[str], ContextManager]]) -> Any:
+        if phase is None:
+            return action()
+        with phase(name):
+            return action()
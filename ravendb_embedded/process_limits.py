@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+import platform
+import sys
+import uuid
+from typing import Callable, Dict, Iterable, Optional, Set
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ioprio_set(2) has no wrapper in libc or in the os module
+_IOPRIO_SET_SYSCALLS = {"x86_64": 251, "aarch64": 30, "i386": 289, "i686": 289, "armv7l": 314, "ppc64le": 273}
+_IOPRIO_CLASS_BE = 2
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+
+# the GC gets this share of the memory limit, the rest is left for native allocations of the server (Voron, Lucene)
+GC_HEAP_SHARE_OF_MEMORY_LIMIT = 0.75
+
+
+def find_cgroup2_directory() -> Optional[str]:
+    # the cgroup v2 group of this process, None on cgroup v1 only hosts
+    mount_point = None
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                fields = line.split()
+                separator = fields.index("-")
+                if fields[separator + 1] == "cgroup2":
+                    mount_point = fields[4]
+                    break
+        with open("/proc/self/cgroup") as f:
+            own_path = next((line.strip()[3:] for line in f if line.startswith("0::")), None)
+    except (OSError, ValueError, IndexError):
+        return None
+
+    if mount_point is None or own_path is None:
+        return None
+    return os.path.join(mount_point, own_path.lstrip("/"))
+
+
+class ProcessLimits:
+    # cpu affinity, priority and memory ceiling of the server process, Linux only
+    # applied by the child itself between fork and exec, so the limits hold from the first instruction of dotnet
+    # the memory ceiling uses a cgroup v2 sub-group when one can be created, RLIMIT_AS otherwise
+    def __init__(
+        self,
+        cpu_affinity: Optional[Iterable[int]] = None,
+        nice: Optional[int] = None,
+        io_priority: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None,
+    ):
+        self.cpu_affinity: Optional[Set[int]] = set(cpu_affinity) if cpu_affinity is not None else None
+        self.nice = nice
+        self.io_priority = io_priority
+        self.memory_limit_mb = memory_limit_mb
+        self.cgroup_path: Optional[str] = None
+        self._prepared = False
+        self._ioprio_set: Optional[Callable[[], int]] = None
+        self._cgroup_procs_path: Optional[str] = None
+
+    @classmethod
+    def from_options(cls, options) -> Optional[ProcessLimits]:
+        limits = cls(options.cpu_affinity, options.nice, options.io_priority, options.memory_limit_mb)
+        return limits if limits.is_set else None
+
+    @property
+    def is_set(self) -> bool:
+        return any(
+            value is not None for value in (self.cpu_affinity, self.nice, self.io_priority, self.memory_limit_mb)
+        )
+
+    def validate(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise ValueError("cpu_affinity, nice, io_priority and memory_limit_mb are only supported on Linux")
+        if self.cpu_affinity is not None and not self.cpu_affinity:
+            raise ValueError("cpu_affinity cannot be empty")
+        if self.nice is not None and not -20 <= self.nice <= 19:
+            raise ValueError("nice must be between -20 and 19")
+        if self.io_priority is not None and not 0 <= self.io_priority <= 7:
+            raise ValueError("io_priority must be between 0 (highest) and 7 (lowest)")
+        if self.memory_limit_mb is not None and self.memory_limit_mb <= 0:
+            raise ValueError("memory_limit_mb must be positive")
+
+    def environment(self) -> Dict[str, str]:
+        # sizes the thread pools and the GC heaps of the runtime to the limits, otherwise it sees the whole machine
+        environment = {}
+        if self.cpu_affinity is not None:
+            environment["DOTNET_PROCESSOR_COUNT"] = str(len(self.cpu_affinity))
+        if self.memory_limit_mb is not None:
+            heap_limit = int(self.memory_limit_mb * 1024 * 1024 * GC_HEAP_SHARE_OF_MEMORY_LIMIT)
+            environment["DOTNET_GCHeapHardLimit"] = format(heap_limit, "x")
+        return environment
+
+    def prepare(self) -> None:
+        # everything which may allocate, import or fail runs here in the parent, the child only makes system calls
+        if self._prepared:
+            return
+        self._prepared = True
+
+        if self.io_priority is not None:
+            number = _IOPRIO_SET_SYSCALLS.get(platform.machine())
+            if number is not None:
+                import ctypes
+
+                syscall = ctypes.CDLL(None, use_errno=True).syscall
+                value = (_IOPRIO_CLASS_BE << _IOPRIO_CLASS_SHIFT) | self.io_priority
+                self._ioprio_set = lambda: syscall(number, _IOPRIO_WHO_PROCESS, 0, value)
+
+        if self.memory_limit_mb is not None:
+            self.cgroup_path = self._create_cgroup()
+            if self.cgroup_path is not None:
+                self._cgroup_procs_path = os.path.join(self.cgroup_path, "cgroup.procs")
+
+    def _create_cgroup(self) -> Optional[str]:
+        parent = find_cgroup2_directory()
+        if parent is None:
+            return None
+
+        path = os.path.join(parent, f"ravendb-embedded-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        try:
+            os.mkdir(path)
+        except OSError:
+            return None
+
+        try:
+            with open(os.path.join(path, "cgroup.controllers")) as f:
+                if "memory" not in f.read().split():
+                    raise OSError("the memory controller isn't enabled for sub-groups")
+            with open(os.path.join(path, "memory.max"), "w") as f:
+                f.write(str(self.memory_limit_mb * 1024 * 1024))
+        except OSError:
+            self._remove_cgroup(path)
+            return None
+        return path
+
+    def apply_in_child(self) -> None:
+        # runs in the forked child right before exec
+        if self.cgroup_path is not None:
+            fd = os.open(self._cgroup_procs_path, os.O_WRONLY)
+            try:
+                os.write(fd, b"0")
+            finally:
+                os.close(fd)
+        elif self.memory_limit_mb is not None:
+            limit = self.memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        if self.cpu_affinity is not None:
+            os.sched_setaffinity(0, self.cpu_affinity)
+        if self.nice is not None:
+            os.setpriority(os.PRIO_PROCESS, 0, self.nice)
+        if self._ioprio_set is not None:
+            self._ioprio_set()
+
+    def release(self) -> None:
+        # called once the server process has exited, a group with processes in it can't be removed
+        path, self.cgroup_path = self.cgroup_path, None
+        self._prepared = False
+        if path is not None:
+            self._remove_cgroup(path)
+
+    @staticmethod
+    def _remove_cgroup(path: str) -> None:
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import subprocess
+from collections import deque
+from threading import Lock, Thread
+from typing import Callable, Deque, Dict, IO, List, Optional
+
+OutputListener = Callable[[str, Optional[str]], None]
+
+
+class ProcessOutputDrainer:
+    STDOUT = "stdout"
+    STDERR = "stderr"
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        max_lines: int = 1000,
+        on_line: Optional[Callable[[str, str], None]] = None,
+    ):
+        if max_lines <= 0:
+            raise ValueError("max_lines must be positive")
+
+        self.process = process
+        self._on_line = on_line
+        self._buffers: Dict[str, Deque[str]] = {
+            self.STDOUT: deque(maxlen=max_lines),
+            self.STDERR: deque(maxlen=max_lines),
+        }
+        self._listeners: List[OutputListener] = []
+        self._lock = Lock()
+        self._threads: List[Thread] = []
+
+        for stream_name, stream in ((self.STDOUT, process.stdout), (self.STDERR, process.stderr)):
+            if stream is not None:
+                self._threads.append(
+                    Thread(
+                        target=self._drain,
+                        args=(stream_name, stream),
+                        name=f"ravendb-embedded-{stream_name}-{process.pid}",
+                        daemon=True,
+                    )
+                )
+
+    def start(self) -> ProcessOutputDrainer:
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def add_listener(self, listener: OutputListener) -> None:
+        # listener receives (stream_name, line) and (stream_name, None) once the stream ends
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: OutputListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    @property
+    def stdout_lines(self) -> List[str]:
+        return self.get_lines(self.STDOUT)
+
+    @property
+    def stderr_lines(self) -> List[str]:
+        return self.get_lines(self.STDERR)
+
+    def get_lines(self, stream_name: str) -> List[str]:
+        with self._lock:
+            return list(self._buffers[stream_name])
+
+    @property
+    def finished(self) -> bool:
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        for thread in self._threads:
+            if thread.ident is not None:
+                thread.join(timeout)
+
+    def _drain(self, stream_name: str, stream: IO) -> None:
+        try:
+            for raw_line in iter(stream.readline, b""):
+                self._publish(stream_name, raw_line.decode("utf-8", errors="replace").strip())
+        except (OSError, ValueError):
+            # the pipe was closed while the process was shutting down
+            pass
+        finally:
+            self._publish(stream_name, None)
+
+    def _publish(self, stream_name: str, line: Optional[str]) -> None:
+        with self._lock:
+            if line is not None:
+                self._buffers[stream_name].append(line)
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener(stream_name, line)
+
+        if line is not None and self._on_line is not None:
+            try:
+                self._on_line(stream_name, line)
+            except Exception:
+                # a misbehaving callback must never stop the drainer, otherwise the pipe fills up again
+                pass
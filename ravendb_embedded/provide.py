@@ -1,11 +1,31 @@
+import hashlib
+import importlib.util
 import os
 import pkgutil
 import shutil
-import zipfile
+import sys
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from io import BytesIO
 from pathlib import Path
-from typing import Union
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+
+from ravendb_embedded.file_utils import (
+    FileLock,
+    clone_tree,
+    default_cache_directory,
+    file_sha256,
+    list_tree,
+    read_json,
+    write_json_atomically,
+)
+from ravendb_embedded.zip_extractor import ParallelZipExtractor
+
+try:
+    from importlib.resources import as_file as resources_as_file, files as resources_files
+except ImportError:  # Python < 3.9
+    resources_as_file = resources_files = None
 
 
 class ProvideRavenDBServer(ABC):
@@ -13,27 +33,178 @@ class ProvideRavenDBServer(ABC):
     def provide(self, target_directory: str) -> None:
         pass
 
+    def get_source_fingerprint(self) -> Optional[str]:
+        # cheap identity of the source (location, sizes, modification times), None when it can't be cached
+        return None
+
+    def get_content_key(self) -> Optional[str]:
+        # hash of the source content, used to address the shared cache
+        return None
+
+
+def _file_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
 
 class CopyServerProvider(ProvideRavenDBServer):
-    def __init__(self, server_files: str):
+    MANIFEST_FILE_NAME = ".ravendb_embedded_manifest.json"
+    MANIFEST_VERSION = 1
+
+    def __init__(
+        self,
+        server_files: str,
+        sync: bool = False,
+        verify_hashes: bool = False,
+        max_workers: Optional[int] = None,
+    ):
         self.server_files = server_files
+        self.sync = sync
+        self.verify_hashes = verify_hashes
+        self.max_workers = max_workers
 
     def provide(self, target_directory: str) -> None:
+        if self.sync:
+            self.sync_to(target_directory)
+            return
+
         try:
             shutil.copytree(self.server_files, target_directory)
         except FileExistsError:
             pass
 
+    def sync_to(self, target_directory: str) -> None:
+        source_root = os.path.abspath(self.server_files)
+        if source_root == os.path.abspath(target_directory):
+            return
+
+        source_directories, source_file_list = list_tree(self.server_files)
+        source_files: Dict[str, List[int]] = {}
+        for relative_path in source_file_list:
+            stat = os.stat(os.path.join(self.server_files, relative_path))
+            source_files[relative_path] = [stat.st_size, stat.st_mtime_ns]
+
+        manifest_path = os.path.join(target_directory, self.MANIFEST_FILE_NAME)
+        manifest = read_json(manifest_path)
+        if (
+            not isinstance(manifest, dict)
+            or manifest.get("version") != self.MANIFEST_VERSION
+            or manifest.get("source") != source_root
+        ):
+            manifest = {"files": {}}
+        manifest_files: Dict[str, List] = manifest.get("files") or {}
+
+        if manifest_files.keys() == source_files.keys() and all(
+            manifest_files[path][:2] == metadata and self._has_metadata(os.path.join(target_directory, path), metadata)
+            for path, metadata in source_files.items()
+        ):
+            # nothing changed since the last sync on either side, no need to walk the target
+            return
+
+        target_directories, target_file_list = (
+            list_tree(target_directory, exclude=(self.MANIFEST_FILE_NAME,))
+            if os.path.isdir(target_directory)
+            else ([], [])
+        )
+
+        os.makedirs(target_directory, exist_ok=True)
+        for directory in source_directories:
+            os.makedirs(os.path.join(target_directory, directory), exist_ok=True)
+
+        def synchronize(relative_path: str) -> Tuple[str, List]:
+            source = os.path.join(self.server_files, relative_path)
+            target = os.path.join(target_directory, relative_path)
+            metadata = source_files[relative_path]
+
+            if not self._is_up_to_date(source, target, metadata, manifest_files.get(relative_path)):
+                # copy next to the target and rename, so a file hardlinked from a cache is never written in place
+                temporary_target = target + ".sync.tmp"
+                shutil.copy2(source, temporary_target)
+                os.replace(temporary_target, target)
+
+            if self.verify_hashes:
+                recorded = manifest_files.get(relative_path)
+                if recorded and recorded[:2] == metadata and len(recorded) > 2:
+                    return relative_path, recorded
+                return relative_path, metadata + [file_sha256(source)]
+            return relative_path, metadata
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            new_manifest_files = dict(executor.map(synchronize, source_files))
+
+        for relative_path in set(target_file_list) - source_files.keys():
+            os.remove(os.path.join(target_directory, relative_path))
+
+        for directory in sorted(set(target_directories) - set(source_directories), reverse=True):
+            try:
+                os.rmdir(os.path.join(target_directory, directory))
+            except OSError:
+                # not empty, e.g. it contains files created by the server itself
+                pass
+
+        write_json_atomically(
+            manifest_path,
+            {"version": self.MANIFEST_VERSION, "source": source_root, "files": new_manifest_files},
+        )
+
+    @staticmethod
+    def _has_metadata(path: str, metadata: List[int]) -> bool:
+        # copy2 keeps the modification time, so a synchronized file has the size and timestamp of its source
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        return [stat.st_size, stat.st_mtime_ns] == metadata
+
+    def _is_up_to_date(self, source: str, target: str, metadata: List[int], recorded: Optional[List]) -> bool:
+        try:
+            target_stat = os.stat(target)
+        except FileNotFoundError:
+            return False
+
+        target_metadata = [target_stat.st_size, target_stat.st_mtime_ns]
+        if target_metadata == metadata:
+            return True
+
+        if not self.verify_hashes or target_stat.st_size != metadata[0]:
+            return False
+
+        # same size, different timestamps: compare the content before copying
+        if recorded and len(recorded) > 2 and recorded[:2] == target_metadata:
+            target_hash = recorded[2]
+        else:
+            target_hash = file_sha256(target)
+
+        if file_sha256(source) != target_hash:
+            return False
+
+        shutil.copystat(source, target)
+        return True
+
+    def get_source_fingerprint(self) -> Optional[str]:
+        digest = hashlib.sha256(os.path.abspath(self.server_files).encode("utf-8"))
+        for relative_path in list_tree(self.server_files)[1]:
+            stat = os.stat(os.path.join(self.server_files, relative_path))
+            digest.update(f"|{relative_path}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_content_key(self) -> Optional[str]:
+        digest = hashlib.sha256()
+        for relative_path in list_tree(self.server_files)[1]:
+            file_hash = file_sha256(os.path.join(self.server_files, relative_path))
+            digest.update(f"{relative_path}|{file_hash}\n".encode("utf-8"))
+        return digest.hexdigest()
+
 
 class CopyServerFromNugetProvider(CopyServerProvider):
     SERVER_FILES = "target\\nuget\\contentFiles\\any\\any\\RavenDBServer"
 
-    def __init__(self):
+    def __init__(self, sync: bool = False):
         module_path = Path(__file__).parent
-        super().__init__(os.path.join(module_path, self.SERVER_FILES))
+        super().__init__(os.path.join(module_path, self.SERVER_FILES), sync=sync)
 
     def provide(self, target_directory: str) -> None:
-        if not os.path.exists(target_directory):
+        if not os.path.exists(self.server_files):
             raise RuntimeError(
                 f"Unable to find 'target' directory in the current working directory ({os.path.abspath('.')}). "
                 f"Please make sure you execute the test in the ravendb_embedded directory with the provide.py file."
@@ -43,41 +214,94 @@ class CopyServerFromNugetProvider(CopyServerProvider):
 
 
 class ExtractFromZipServerProvider(ProvideRavenDBServer):
-    def __init__(self, source_location: str):
+    def __init__(self, source_location: str, max_workers: Optional[int] = None, skip_existing: bool = True):
         self.source_location = source_location
+        self.max_workers = max_workers
+        self.skip_existing = skip_existing
 
     def provide(self, target_directory):
         # Ensure the target directory exists
         os.makedirs(target_directory, exist_ok=True)
-        with open(self.source_location, "rb") as zip_file:
-            self.unzip(zip_file, target_directory)
+        self.unzip(self.source_location, target_directory, self.max_workers, self.skip_existing)
 
     @staticmethod
-    def unzip(source: Union[str, bytes], out: str) -> None:
-        with zipfile.ZipFile(source, "r") as zipped:
-            zipped.extractall(out)
+    def unzip(
+        source: Union[str, IO[bytes]], out: str, max_workers: Optional[int] = None, skip_existing: bool = True
+    ) -> None:
+        ParallelZipExtractor(max_workers, skip_existing).extract(source, out)
+
+    def get_source_fingerprint(self) -> Optional[str]:
+        return _file_fingerprint(self.source_location)
+
+    def get_content_key(self) -> Optional[str]:
+        return file_sha256(self.source_location)
 
 
 class ExtractFromPkgResourceServerProvider(ProvideRavenDBServer):
-    def provide(self, target_directory):
-        resource_name = "ravendb_server.zip"
+    RESOURCE_NAME = "ravendb_server.zip"
+
+    def __init__(self, package: Optional[str] = None):
+        self.package = package or sys.modules[self.__class__.__module__].__package__
+
+    def _locate_resource(self) -> Optional[str]:
+        # path of the resource on disk, None when the package isn't installed as plain files
+        if resources_files is not None:
+            resource = resources_files(self.package).joinpath(self.RESOURCE_NAME)
+            return str(resource) if isinstance(resource, Path) and resource.is_file() else None
+
+        spec = importlib.util.find_spec(self.package)
+        if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+            return None
+
+        path = os.path.join(os.path.dirname(spec.origin), self.RESOURCE_NAME)
+        return path if os.path.isfile(path) else None
+
+    @contextmanager
+    def _open_resource(self) -> Iterator[Union[str, IO[bytes]]]:
+        path = self._locate_resource()
+        if path is not None:
+            yield path
+            return
+
+        if resources_files is not None:
+            # e.g. installed inside a zip archive - as_file() materializes it in a temporary file
+            resource = resources_files(self.package).joinpath(self.RESOURCE_NAME)
+            if resource.is_file():
+                with resources_as_file(resource) as resource_path:
+                    yield str(resource_path)
+                return
 
-        # Get binary data from the resource
-        resource_data = pkgutil.get_data(self.__class__.__module__, resource_name)
+        try:
+            resource_data = pkgutil.get_data(self.package, self.RESOURCE_NAME)
+        except OSError:
+            resource_data = None
 
         if resource_data is None:
-            raise RuntimeError(f"Unable to find resource: {resource_name}")
+            raise RuntimeError(f"Unable to find resource: {self.RESOURCE_NAME}")
 
-        # Create a bytes buffer from the binary data
         with BytesIO(resource_data) as bytes_buffer:
-            # Call the unzip method to extract contents to the target directory
-            ExtractFromZipServerProvider.unzip(bytes_buffer.read(), target_directory)
+            yield bytes_buffer
+
+    def get_source_fingerprint(self) -> Optional[str]:
+        path = self._locate_resource()
+        return _file_fingerprint(path) if path else None
+
+    def get_content_key(self) -> Optional[str]:
+        path = self._locate_resource()
+        return file_sha256(path) if path else None
+
+    def provide(self, target_directory):
+        os.makedirs(target_directory, exist_ok=True)
+
+        # members are streamed from the archive on disk, so the archive is never loaded into memory as a whole
+        with self._open_resource() as resource:
+            ExtractFromZipServerProvider.unzip(resource, target_directory)
 
 
 class ExternalServerProvider(ProvideRavenDBServer):
     SERVER_DLL_FILENAME = "Raven.Server.dll"
 
-    def __init__(self, server_location: str):
+    def __init__(self, server_location: str, sync: bool = False):
         self.server_location = server_location
 
         file_server_location = os.path.abspath(server_location)
@@ -94,7 +318,7 @@ class ExternalServerProvider(ProvideRavenDBServer):
         if os.path.isdir(file_server_location) and os.path.exists(
             os.path.join(file_server_location, self.SERVER_DLL_FILENAME)
         ):
-            self.inner_provider = CopyServerProvider(server_location)
+            self.inner_provider = CopyServerProvider(server_location, sync=sync)
             return
 
         raise ValueError(
@@ -104,3 +328,89 @@ class ExternalServerProvider(ProvideRavenDBServer):
 
     def provide(self, target_directory: str) -> None:
         self.inner_provider.provide(target_directory)
+
+    def get_source_fingerprint(self) -> Optional[str]:
+        return self.inner_provider.get_source_fingerprint()
+
+    def get_content_key(self) -> Optional[str]:
+        return self.inner_provider.get_content_key()
+
+
+class CachedServerProvider(ProvideRavenDBServer):
+    FINGERPRINTS_DIRECTORY = "fingerprints"
+    LOCK_FILE_NAME = ".lock"
+
+    def __init__(
+        self,
+        inner_provider: ProvideRavenDBServer,
+        cache_directory: Optional[str] = None,
+        use_hardlinks: bool = True,
+    ):
+        self.inner_provider = inner_provider
+        self.cache_directory = cache_directory or default_cache_directory()
+        self.use_hardlinks = use_hardlinks
+
+    def provide(self, target_directory: str) -> None:
+        fingerprint = self.inner_provider.get_source_fingerprint()
+        if fingerprint is None:
+            self.inner_provider.provide(target_directory)
+            return
+
+        cache_entry = self._get_cache_entry(fingerprint)
+
+        # files in the cache are never modified, so reflinks/hardlinks can safely point at them
+        clone_tree(cache_entry, target_directory, allow_hardlink=self.use_hardlinks)
+
+    def get_source_fingerprint(self) -> Optional[str]:
+        return self.inner_provider.get_source_fingerprint()
+
+    def get_content_key(self) -> Optional[str]:
+        return self.inner_provider.get_content_key()
+
+    def _get_cache_entry(self, fingerprint: str) -> str:
+        fingerprint_file = os.path.join(
+            self.cache_directory,
+            self.FINGERPRINTS_DIRECTORY,
+            hashlib.sha256(fingerprint.encode("utf-8")).hexdigest(),
+        )
+
+        cache_entry = self._read_cache_entry(fingerprint_file)
+        if cache_entry is not None:
+            return cache_entry
+
+        with FileLock(os.path.join(self.cache_directory, self.LOCK_FILE_NAME)):
+            # another process might have populated the cache while we were waiting for the lock
+            cache_entry = self._read_cache_entry(fingerprint_file)
+            if cache_entry is not None:
+                return cache_entry
+
+            content_key = self.inner_provider.get_content_key()
+            if content_key is None:
+                raise RuntimeError(f"{self.inner_provider.__class__.__name__} did not provide a content key")
+
+            cache_entry = os.path.join(self.cache_directory, content_key)
+            if not os.path.isdir(cache_entry):
+                staging_directory = f"{cache_entry}.{os.getpid()}.tmp"
+                shutil.rmtree(staging_directory, ignore_errors=True)
+                try:
+                    self.inner_provider.provide(staging_directory)
+                    os.replace(staging_directory, cache_entry)
+                finally:
+                    shutil.rmtree(staging_directory, ignore_errors=True)
+
+            os.makedirs(os.path.dirname(fingerprint_file), exist_ok=True)
+            with open(fingerprint_file + ".tmp", "w") as f:
+                f.write(content_key)
+            os.replace(fingerprint_file + ".tmp", fingerprint_file)
+
+            return cache_entry
+
+    def _read_cache_entry(self, fingerprint_file: str) -> Optional[str]:
+        try:
+            with open(fingerprint_file) as f:
+                content_key = f.read().strip()
+        except OSError:
+            return None
+
+        cache_entry = os.path.join(self.cache_directory, content_key)
+        return cache_entry if content_key and os.path.isdir(cache_entry) else None
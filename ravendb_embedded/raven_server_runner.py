@@ -1,12 +1,17 @@
 import os
 import subprocess
+import sys
+from typing import Dict, List, Optional
 
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.serialization import pkcs12
 from ravendb.exceptions.raven_exceptions import RavenException
 
 from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.performance_profile import PerformanceProfile
+from ravendb_embedded.process_limits import ProcessLimits
 from ravendb_embedded.runtime_framework_version_matcher import (
     RuntimeFrameworkVersionMatcher,
 )
@@ -19,8 +24,35 @@ class CommandLineArgumentEscaper:
 
 
 class RavenServerRunner:
+    SERVER_PATHS = [
+        "Raven.Server.dll",
+        "Server/Raven.Server.dll",
+        "contentFiles/any/any/RavenDBServer/Raven.Server.dll",
+    ]
+
     @staticmethod
     def run(options: ServerOptions) -> subprocess.Popen:
+        RavenServerRunner.validate_options(options)
+
+        server_dll_path = RavenServerRunner.find_server_dll(options)
+
+        admin_certificate_thumbprint = None
+        if options.security and options.security.client_pem_certificate_path:
+            admin_certificate_thumbprint = RavenServerRunner.get_certificate_thumbprint(
+                options.security.client_pem_certificate_path
+            )
+
+        framework_version = RuntimeFrameworkVersionMatcher.match(options) if options.framework_version else None
+
+        command_line_args = RavenServerRunner.build_command_line(
+            options, server_dll_path, framework_version, admin_certificate_thumbprint
+        )
+        return RavenServerRunner.start_process(
+            command_line_args, RavenServerRunner.build_environment(options), ProcessLimits.from_options(options)
+        )
+
+    @staticmethod
+    def validate_options(options: ServerOptions) -> None:
         if not options.target_server_location.strip():
             raise ValueError("target_server_location cannot be None or whitespace")
 
@@ -30,28 +62,79 @@ class RavenServerRunner:
         if not options.logs_path.strip():
             raise ValueError("logs_path cannot be None or whitespace")
 
-        server_paths = [
-            "Raven.Server.dll",
-            "Server/Raven.Server.dll",
-            "contentFiles/any/any/RavenDBServer/Raven.Server.dll",
-        ]
+        if not options.dot_net_path.strip():
+            raise ValueError("dot_net_path cannot be None or whitespace")
+
+        RavenServerRunner.get_performance_profile(options)
+
+        limits = ProcessLimits.from_options(options)
+        if limits is not None:
+            limits.validate()
 
-        server_dll_path = None
+    @staticmethod
+    def get_performance_profile(options: ServerOptions) -> Optional[PerformanceProfile]:
+        if isinstance(options.performance_profile, str):
+            return PerformanceProfile.from_name(options.performance_profile)
+        return options.performance_profile
+
+    @staticmethod
+    def build_environment(options: ServerOptions) -> Optional[Dict[str, str]]:
+        # None keeps the environment of this process as it is
+        profile = RavenServerRunner.get_performance_profile(options)
+        limits = ProcessLimits.from_options(options)
+        if profile is None and limits is None and not options.environment_variables:
+            return None
+
+        environment = dict(os.environ)
+        if profile is not None:
+            environment.update(profile.environment)
+        if limits is not None:
+            environment.update(limits.environment())
+        for name, value in options.environment_variables.items():
+            if value is None:
+                environment.pop(name, None)
+            else:
+                environment[name] = str(value)
+        return environment
 
-        for path in server_paths:
+    @staticmethod
+    def find_server_dll(options: ServerOptions) -> str:
+        for path in RavenServerRunner.SERVER_PATHS:
             full_path = os.path.join(options.target_server_location, path)
             if os.path.exists(full_path):
-                server_dll_path = full_path
-                break
+                return full_path
 
-        if server_dll_path is None:
-            raise RavenException("Server file was not found in any of the expected locations.")
+        raise RavenException("Server file was not found in any of the expected locations.")
 
-        if not options.dot_net_path.strip():
-            raise ValueError("dot_net_path cannot be None or whitespace")
+    @staticmethod
+    def get_certificate_thumbprint(client_pem_certificate_path: str) -> str:
+        with open(client_pem_certificate_path, "rb") as cert_file:
+            cert_data = cert_file.read()
+
+        cert = x509.load_pem_x509_certificate(cert_data, default_backend())
+        return cert.fingerprint(hashes.SHA256()).hex()
+
+    @staticmethod
+    def get_pfx_certificate_fingerprint(pfx_certificate_path: str, password: Optional[str] = None) -> str:
+        with open(pfx_certificate_path, "rb") as cert_file:
+            cert_data = cert_file.read()
+
+        _, cert, _ = pkcs12.load_key_and_certificates(
+            cert_data, password.encode("utf-8") if password else None, default_backend()
+        )
+        return cert.fingerprint(hashes.SHA256()).hex()
 
+    @staticmethod
+    def build_command_line(
+        options: ServerOptions,
+        server_dll_path: str,
+        framework_version: Optional[str],
+        admin_certificate_thumbprint: Optional[str],
+        detached: bool = False,
+    ) -> List[str]:
         command_line_args = [
-            f"--Embedded.ParentProcessId={RavenServerRunner.get_process_id('0')}",
+            # a detached server outlives this process and is stopped with a signal instead of the stdin command
+            "--non-interactive" if detached else f"--Embedded.ParentProcessId={RavenServerRunner.get_process_id('0')}",
             f"--License.Eula.Accepted={'true' if options.accept_eula else 'false'}",
             "--Setup.Mode=None",
             f"--DataDir={CommandLineArgumentEscaper.escape_single_arg(options.data_directory)}",
@@ -87,17 +170,11 @@ class RavenServerRunner:
                         f"{CommandLineArgumentEscaper.escape_single_arg(options.security.certificate_arguments)}",
                     ]
                 )
-            if options.security.client_pem_certificate_path:
-                with open(options.security.client_pem_certificate_path, "rb") as cert_file:
-                    cert_data = cert_file.read()
-
-                cert = x509.load_pem_x509_certificate(cert_data, default_backend())
-                thumbprint = cert.fingerprint(hashes.SHA256()).hex()
-
+            if admin_certificate_thumbprint:
                 command_line_args.extend(
                     [
                         f"--Security.WellKnownCertificates.Admin="
-                        f"{CommandLineArgumentEscaper.escape_single_arg(thumbprint)}"
+                        f"{CommandLineArgumentEscaper.escape_single_arg(admin_certificate_thumbprint)}"
                     ]
                 )
         else:
@@ -106,18 +183,62 @@ class RavenServerRunner:
         command_line_args.extend([f"--ServerUrl={options.server_url}"])
 
         command_line_args[:0] = options.command_line_args
+        profile = RavenServerRunner.get_performance_profile(options)
+        if profile is not None:
+            command_line_args[:0] = profile.command_line_args(options.command_line_args)
         command_line_args.insert(0, server_dll_path)
         command_line_args.insert(0, options.dot_net_path)
 
-        if options.framework_version:
-            framework_version = RuntimeFrameworkVersionMatcher.match(options)
+        if framework_version:
             command_line_args.insert(1, framework_version)
             command_line_args.insert(1, "--fx-version")
 
-        process_builder = subprocess.Popen(command_line_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        process = process_builder
+        return command_line_args
 
-        return process
+    @staticmethod
+    def start_process(
+        command_line_args: List[str], env: Optional[Dict[str, str]] = None, limits: Optional[ProcessLimits] = None
+    ) -> subprocess.Popen:
+        preexec_fn = None
+        if limits is not None:
+            limits.prepare()
+            preexec_fn = limits.apply_in_child
+        return subprocess.Popen(
+            command_line_args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            preexec_fn=preexec_fn,
+        )
+
+    @staticmethod
+    def start_detached_process(
+        command_line_args: List[str],
+        output_path: str,
+        env: Optional[Dict[str, str]] = None,
+        limits: Optional[ProcessLimits] = None,
+    ) -> subprocess.Popen:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if sys.platform == "win32":
+            platform_kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+        else:
+            # own session, so signals sent to the process group of this process (Ctrl+C, gunicorn) don't reach it
+            platform_kwargs = {"start_new_session": True}
+            if limits is not None:
+                limits.prepare()
+                platform_kwargs["preexec_fn"] = limits.apply_in_child
+
+        with open(output_path, "wb") as output:
+            return subprocess.Popen(
+                command_line_args,
+                stdin=subprocess.DEVNULL,
+                stdout=output,
+                stderr=subprocess.STDOUT,
+                close_fds=True,
+                env=env,
+                **platform_kwargs,
+            )
 
     @staticmethod
     def get_process_id(fallback: str) -> str:
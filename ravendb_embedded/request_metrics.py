@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ravendb.documents.session.event_args import (
+    BeforeRequestEventArgs,
+    FailedRequestEventArgs,
+    SucceedRequestEventArgs,
+)
+from ravendb.http.request_executor import RequestExecutor
+
+# upper bounds in milliseconds, the last bucket takes everything above 10 s
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * (len(LATENCY_BUCKETS_MS) + 1)))
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, milliseconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        # the upper bound of the bucket holding the percentile, the maximum for the last bucket
+        if self.count == 0:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms if self.count else None,
+            "buckets": dict(zip([str(bound) for bound in LATENCY_BUCKETS_MS] + ["+Inf"], self.counts.tolist())),
+        }
+
+
+class CommandStats:
+    def __init__(self):
+        self.client = LatencyHistogram()
+        # the Request-Time header, the time spent by the server itself
+        self.server = LatencyHistogram()
+        self.errors = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        requests = self.client.count + self.errors
+        overhead = None
+        if self.client.count and self.server.count:
+            overhead = self.client.total_ms / self.client.count - self.server.total_ms / self.server.count
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": self.errors / requests if requests else 0.0,
+            "client": self.client.snapshot(),
+            "server": self.server.snapshot(),
+            "mean_client_overhead_ms": overhead,
+        }
+
+
+class RequestMetrics:
+    # latency per database and command, from the request events of the request executors it is attached to
+    # commands are named after the HTTP method and the endpoint, e.g. "GET docs" or "POST queries"
+    # the client raises no event for error responses, so a request which started but didn't succeed counts as an
+    # error once execute() raises or another request of the same thread and database starts (a failover retry)
+    # requests answered with an error status which the client handles itself (e.g. 404 of a missing document)
+    # return without an exception and are not counted
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], CommandStats] = {}
+        self._pending: Dict[Tuple[int, str], Tuple[Any, float, str]] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, request_executor: RequestExecutor) -> None:
+        request_executor.add_on_before_request(self._on_before_request)
+        request_executor.add_on_succeed_request(self._on_succeed_request)
+        request_executor.add_on_failed_request(self._on_failed_request)
+
+        # retries and failovers call execute() again through the instance, so every attempt passes the wrapper
+        execute = request_executor.execute
+        database = request_executor._database_name
+
+        def execute_with_metrics(*args, **kwargs):
+            failed = True
+            try:
+                result = execute(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self._abandon(database, failed)
+
+        request_executor.execute = execute_with_metrics
+
+    @staticmethod
+    def command_name(method: Optional[str], url: str) -> str:
+        path = urlsplit(url).path.strip("/")
+        if path.startswith("databases/"):
+            # databases/<name>/<endpoint>
+            path = path.split("/", 2)[2] if path.count("/") >= 2 else ""
+        return f"{(method or 'GET').upper()} {path}"
+
+    def _on_before_request(self, event_args: BeforeRequestEventArgs) -> None:
+        request = event_args.request
+        command = self.command_name(getattr(request, "method", None), event_args.url)
+        # requests are synchronous, a thread has one request per database in flight at a time
+        key = (threading.get_ident(), event_args.database or "")
+        with self._lock:
+            previous = self._pending.get(key)
+            if previous is not None:
+                # the previous attempt never completed, it's retried on another node
+                self._count_error(event_args.database, previous[2])
+            self._pending[key] = (request, time.perf_counter(), command)
+
+    def _complete(self, database: Optional[str], request: Any) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            key = (threading.get_ident(), database or "")
+            pending = self._pending.get(key)
+            if pending is None or (request is not None and pending[0] is not request):
+                return None
+            del self._pending[key]
+        return (time.perf_counter() - pending[1]) * 1000, pending[2]
+
+    def _abandon(self, database: Optional[str], failed: bool) -> None:
+        # execute() returned or raised, a request which is still pending got no success event
+        with self._lock:
+            pending = self._pending.pop((threading.get_ident(), database or ""), None)
+            if pending is not None and failed:
+                self._count_error(database, pending[2])
+
+    def _count_error(self, database: Optional[str], command: str) -> None:
+        # callers hold _lock
+        self._stats.setdefault((database or "", command), CommandStats()).errors += 1
+
+    def _on_succeed_request(self, event_args: SucceedRequestEventArgs) -> None:
+        completed = self._complete(event_args.database, event_args.request)
+        if completed is None:
+            return
+        elapsed_ms, command = completed
+
+        server_ms = None
+        response = event_args.response
+        if response is not None:
+            try:
+                server_ms = float(response.headers.get("Request-Time"))
+            except (TypeError, ValueError):
+                pass
+
+        with self._lock:
+            stats = self._stats.setdefault((event_args.database or "", command), CommandStats())
+            stats.client.record(elapsed_ms)
+            if server_ms is not None:
+                stats.server.record(server_ms)
+
+    def _on_failed_request(self, event_args: FailedRequestEventArgs) -> None:
+        completed = self._complete(event_args.database, event_args.request)
+        if completed is None:
+            return
+        with self._lock:
+            self._count_error(event_args.database, completed[1])
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        # {database: {command: stats}}
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (database, command), stats in sorted(self._stats.items()):
+                result.setdefault(database, {})[command] = stats.snapshot()
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._pending.clear()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from array import array
+from datetime import timedelta
+from typing import Callable, List, Optional
+
+_FIELDS = ("timestamp", "rss_bytes", "cpu_seconds", "threads", "open_fds", "read_bytes", "write_bytes")
+
+
+class ResourceSample:
+    def __init__(
+        self,
+        timestamp: float,
+        rss_bytes: float,
+        cpu_seconds: float,
+        threads: float,
+        open_fds: float,
+        read_bytes: float,
+        write_bytes: float,
+    ):
+        # timestamp is time.time(), read_bytes and write_bytes are -1 when /proc/<pid>/io isn't readable
+        self.timestamp = timestamp
+        self.rss_bytes = int(rss_bytes)
+        self.cpu_seconds = cpu_seconds
+        self.threads = int(threads)
+        self.open_fds = int(open_fds)
+        self.read_bytes = int(read_bytes)
+        self.write_bytes = int(write_bytes)
+
+    def __repr__(self) -> str:
+        return (
+            f"ResourceSample(rss={self.rss_bytes / 1024 / 1024:.1f} MB, cpu={self.cpu_seconds:.2f} s, "
+            f"threads={self.threads}, fds={self.open_fds}, read={self.read_bytes}, written={self.write_bytes})"
+        )
+
+
+def read_process_sample(pid: int) -> Optional[ResourceSample]:
+    # None once the process is gone, or where there is no /proc
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            # the command name is in parentheses and may contain spaces, the fields after it are fixed
+            stat = f.read().rsplit(b")", 1)[1].split()
+        with open(f"/proc/{pid}/status", "rb") as f:
+            status = f.read()
+        open_fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except (OSError, IndexError):
+        return None
+
+    # stat fields 14 and 15 (utime and stime) and 20 (num_threads), counted from the state at index 0 == field 3
+    cpu_seconds = (int(stat[11]) + int(stat[12])) / os.sysconf("SC_CLK_TCK")
+    threads = int(stat[17])
+
+    rss_bytes = 0
+    for line in status.splitlines():
+        if line.startswith(b"VmRSS:"):
+            rss_bytes = int(line.split()[1]) * 1024
+            break
+
+    read_bytes = write_bytes = -1
+    try:
+        with open(f"/proc/{pid}/io", "rb") as f:
+            for line in f:
+                key, _, value = line.partition(b":")
+                if key == b"read_bytes":
+                    read_bytes = int(value)
+                elif key == b"write_bytes":
+                    write_bytes = int(value)
+    except OSError:
+        pass
+
+    return ResourceSample(time.time(), rss_bytes, cpu_seconds, threads, open_fds, read_bytes, write_bytes)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ResourceHistory:
+    # fixed-size ring of samples in one flat array of doubles, so a long history costs no per-sample objects
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._values = array("d", bytes(8 * len(_FIELDS) * capacity))
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, sample: ResourceSample) -> None:
+        with self._lock:
+            offset = self._next * len(_FIELDS)
+            for i, field in enumerate(_FIELDS):
+                self._values[offset + i] = getattr(sample, field)
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def _sample_at(self, slot: int) -> ResourceSample:
+        offset = slot * len(_FIELDS)
+        return ResourceSample(*self._values[offset : offset + len(_FIELDS)])
+
+    def latest(self) -> Optional[ResourceSample]:
+        with self._lock:
+            if self._count == 0:
+                return None
+            return self._sample_at((self._next - 1) % self.capacity)
+
+    def samples(self) -> List[ResourceSample]:
+        # oldest first
+        with self._lock:
+            first = (self._next - self._count) % self.capacity
+            return [self._sample_at((first + i) % self.capacity) for i in range(self._count)]
+
+
+class ResourceSampler:
+    # samples whichever process get_pid() returns, which changes on restart and is None while the server is suspended
+    def __init__(self, get_pid: Callable[[], Optional[int]], interval: timedelta, history_size: int = 720):
+        self.get_pid = get_pid
+        self.interval = interval
+        self.history = ResourceHistory(history_size)
+        self.pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._stop.set()
+
+    @property
+    def latest(self) -> Optional[ResourceSample]:
+        return self.history.latest()
+
+    def start(self) -> None:
+        if not self._stop.is_set():
+            return
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop,), name="ravendb-embedded-sampler", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def sample(self) -> Optional[ResourceSample]:
+        pid = self.get_pid()
+        if pid is None:
+            return None
+        sample = read_process_sample(pid)
+        if sample is not None:
+            self.pid = pid
+            self.history.append(sample)
+        return sample
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                # a sampler must never take the application down
+                pass
+            stop.wait(self.interval.total_seconds())
+
+    def to_prometheus(self, prefix: str = "ravendb_embedded_server", labels: Optional[dict] = None) -> str:
+        # Prometheus text exposition format, to be returned from the application's own /metrics endpoint
+        sample = self.latest
+        if sample is None:
+            return ""
+
+        label_values = dict(labels or {})
+        label_values.setdefault("pid", str(self.pid))
+        label_text = ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted(label_values.items()))
+
+        metrics = [
+            ("resident_memory_bytes", "gauge", "Resident set size of the server process.", sample.rss_bytes),
+            ("cpu_seconds_total", "counter", "User and system CPU time of the server process.", sample.cpu_seconds),
+            ("threads", "gauge", "Threads of the server process.", sample.threads),
+            ("open_fds", "gauge", "Open file descriptors of the server process.", sample.open_fds),
+        ]
+        if sample.read_bytes >= 0:
+            metrics.append(("read_bytes_total", "counter", "Bytes read from storage.", sample.read_bytes))
+            metrics.append(("write_bytes_total", "counter", "Bytes written to storage.", sample.write_bytes))
+
+        lines = []
+        timestamp_ms = int(sample.timestamp * 1000)
+        for name, metric_type, help_text, value in metrics:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            lines.append(f"{prefix}_{name}{{{label_text}}} {value} {timestamp_ms}")
+        return "\n".join(lines) + "\n"
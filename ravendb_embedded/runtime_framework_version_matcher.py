@@ -1,8 +1,12 @@
 from __future__ import annotations
+import os
+import shutil
 import subprocess
 from enum import Enum
-from typing import Optional, Tuple, List
+from threading import Lock
+from typing import Optional, Tuple, List, Dict, Callable
 
+from ravendb_embedded.file_utils import default_cache_directory, read_json, write_json_atomically
 from ravendb_embedded.options import ServerOptions
 
 
@@ -14,6 +18,12 @@ class MatchingType(Enum):
 class RuntimeFrameworkVersionMatcher:
     WILDCARD = "x"
     GREATER_OR_EQUAL = "+"
+    SHARED_RUNTIMES_DIRECTORY = os.path.join("shared", "Microsoft.NETCore.App")
+    CACHE_FILE_NAME = "dotnet_runtimes.json"
+
+    _runtimes_cache: Dict[str, Tuple[int, List[RuntimeFrameworkVersion]]] = {}
+    _dotnet_roots: Dict[Tuple[str, Optional[str], Optional[str]], Optional[str]] = {}
+    _cache_lock = Lock()
 
     @classmethod
     def match(cls, options: ServerOptions) -> str:
@@ -49,13 +59,128 @@ class RuntimeFrameworkVersionMatcher:
 
         return True
 
-    @staticmethod
-    def get_framework_versions(options: ServerOptions):
+    @classmethod
+    def get_framework_versions(cls, options: ServerOptions) -> List[RuntimeFrameworkVersion]:
         if not options.dot_net_path:
             raise RuntimeError("Dotnet path is not provided.")
 
-        process_command = [options.dot_net_path, "--info"]
+        dotnet_root = cls.get_dotnet_root(options.dot_net_path)
+        if dotnet_root is not None:
+            runtimes = cls._cached(os.path.join(dotnet_root, cls.SHARED_RUNTIMES_DIRECTORY), cls.scan_shared_runtimes)
+            if runtimes:
+                return runtimes
+
+        executable = shutil.which(options.dot_net_path)
+        if executable is None:
+            return cls.get_framework_versions_from_dotnet_info(options.dot_net_path)
+
+        # the executable directory changes whenever dotnet gets reinstalled or upgraded
+        executable = os.path.realpath(executable)
+        return cls._cached(
+            os.path.dirname(executable),
+            lambda _: cls.get_framework_versions_from_dotnet_info(executable),
+            cache_key=f"info:{executable}",
+        )
+
+    @classmethod
+    def get_dotnet_root(cls, dot_net_path: str) -> Optional[str]:
+        resolution_key = (dot_net_path, os.environ.get("PATH"), os.environ.get("DOTNET_ROOT"))
+        with cls._cache_lock:
+            if resolution_key in cls._dotnet_roots:
+                return cls._dotnet_roots[resolution_key]
+
+        dotnet_root = cls._find_dotnet_root(dot_net_path)
+        with cls._cache_lock:
+            cls._dotnet_roots[resolution_key] = dotnet_root
+        return dotnet_root
+
+    @classmethod
+    def _find_dotnet_root(cls, dot_net_path: str) -> Optional[str]:
+        candidates = []
+
+        executable = shutil.which(dot_net_path)
+        if executable is not None:
+            candidates.append(os.path.dirname(os.path.realpath(executable)))
+
+        if os.environ.get("DOTNET_ROOT"):
+            candidates.append(os.environ["DOTNET_ROOT"])
+
+        for candidate in candidates:
+            if os.path.isdir(os.path.join(candidate, cls.SHARED_RUNTIMES_DIRECTORY)):
+                return candidate
+
+        return None
+
+    @staticmethod
+    def scan_shared_runtimes(shared_runtimes_directory: str) -> List[RuntimeFrameworkVersion]:
+        # every installed runtime lives in <dotnet_root>/shared/Microsoft.NETCore.App/<version>
+        runtimes = []
+        for entry in os.scandir(shared_runtimes_directory):
+            if not entry.is_dir() or not os.path.isfile(os.path.join(entry.path, "Microsoft.NETCore.App.deps.json")):
+                continue
+            try:
+                runtimes.append(RuntimeFrameworkVersion(entry.name))
+            except (RuntimeError, ValueError):
+                continue
+        return runtimes
+
+    @classmethod
+    def _cached(
+        cls,
+        path: str,
+        discover: Callable[[str], List[RuntimeFrameworkVersion]],
+        cache_key: Optional[str] = None,
+    ) -> List[RuntimeFrameworkVersion]:
+        # results are memoized in-process and on disk, both invalidated by the modification time of path
+        cache_key = cache_key or path
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return discover(path)
+
+        with cls._cache_lock:
+            cached = cls._runtimes_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime_ns:
+            return list(cached[1])
+
+        cache_file = os.path.join(default_cache_directory(), cls.CACHE_FILE_NAME)
+        disk_cache = read_json(cache_file)
+        if not isinstance(disk_cache, dict):
+            disk_cache = {}
+
+        disk_entry = disk_cache.get(cache_key)
+        runtimes = None
+        if isinstance(disk_entry, dict) and disk_entry.get("mtime_ns") == mtime_ns:
+            try:
+                runtimes = [RuntimeFrameworkVersion(version) for version in disk_entry["runtimes"]]
+            except (KeyError, TypeError, RuntimeError, ValueError):
+                runtimes = None
+
+        if runtimes is None:
+            runtimes = discover(path)
+            disk_cache[cache_key] = {"mtime_ns": mtime_ns, "runtimes": [str(runtime) for runtime in runtimes]}
+            try:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                write_json_atomically(cache_file, disk_cache)
+            except OSError:
+                # the cache is an optimization only
+                pass
+
+        with cls._cache_lock:
+            cls._runtimes_cache[cache_key] = (mtime_ns, runtimes)
+        return list(runtimes)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._cache_lock:
+            cls._runtimes_cache.clear()
+            cls._dotnet_roots.clear()
+
+    @staticmethod
+    def get_framework_versions_from_dotnet_info(dot_net_path: str) -> List[RuntimeFrameworkVersion]:
+        process_command = [dot_net_path, "--info"]
         runtimes = []
+        process = None
 
         try:
             with subprocess.Popen(
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ravendb_embedded.exceptions import match_fatal_startup_message
+from ravendb_embedded.file_utils import FileLock, read_json, write_json_atomically
+from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.raven_server_runner import RavenServerRunner
+
+_STILL_ACTIVE = 259
+
+# servers started by this process, so whichever ServerDaemon stops one of them can also reap it
+_spawned_processes: Dict[int, subprocess.Popen] = {}
+
+
+def is_process_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        # os.kill() terminates the process on Windows, whatever the signal is
+        import ctypes
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == _STILL_ACTIVE
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    try:
+        # a zombie still answers signals, but it's dead for our purposes
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return f.read().rsplit(b")", 1)[1].split()[0] != b"Z"
+    except (OSError, IndexError):
+        return True
+
+
+def is_listening(url: str, timeout: float = 1) -> bool:
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        with socket.create_connection((parts.hostname, port), timeout):
+            return True
+    except OSError:
+        return False
+
+
+class ServerDaemon:
+    # one server shared by every process which uses the same data directory, started by the first of them
+    # processes register a lease file while attached; the last one to detach stops the server, right away or after
+    # idle_timeout (by a small watcher process, so the server outlives short-lived scripts)
+    DISCOVERY_FILE_NAME = ".ravendb_embedded_daemon.json"
+    LOCK_FILE_NAME = ".ravendb_embedded_daemon.lock"
+    LEASES_DIRECTORY_NAME = ".ravendb_embedded_daemon_leases"
+    OUTPUT_FILE_NAME = "ravendb_embedded_daemon_output.log"
+
+    def __init__(
+        self,
+        data_directory: str,
+        options_hash: str,
+        idle_timeout: timedelta = timedelta(0),
+        shutdown_timeout: timedelta = timedelta(seconds=30),
+    ):
+        self.data_directory = data_directory
+        self.options_hash = options_hash
+        self.idle_timeout = idle_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.url: Optional[str] = None
+        self.pid: Optional[int] = None
+        self.spawned = False
+        self._lease_path: Optional[str] = None
+
+    @property
+    def discovery_path(self) -> str:
+        return os.path.join(self.data_directory, self.DISCOVERY_FILE_NAME)
+
+    @property
+    def leases_directory(self) -> str:
+        return os.path.join(self.data_directory, self.LEASES_DIRECTORY_NAME)
+
+    def _lock(self) -> FileLock:
+        return FileLock(os.path.join(self.data_directory, self.LOCK_FILE_NAME))
+
+    @staticmethod
+    def hash_options(options: ServerOptions) -> str:
+        # everything which changes how the server runs, a process with other options must not attach
+        security = options.security
+        default_url = "https://127.0.0.1:0" if security else "http://127.0.0.1:0"
+        profile = RavenServerRunner.get_performance_profile(options)
+        relevant: Dict[str, Any] = {
+            "dot_net_path": options.dot_net_path,
+            "framework_version": options.framework_version,
+            "target_server_location": os.path.abspath(options.target_server_location),
+            "data_directory": os.path.abspath(options.data_directory),
+            "logs_path": os.path.abspath(options.logs_path),
+            "accept_eula": options.accept_eula,
+            "server_url": options.server_url or default_url,
+            "command_line_args": list(options.command_line_args),
+            "security": None if security is None else dict(vars(security)),
+            "performance_profile": None if profile is None else dict(vars(profile)),
+            "environment_variables": dict(options.environment_variables),
+            "process_limits": [
+                sorted(options.cpu_affinity) if options.cpu_affinity is not None else None,
+                options.nice,
+                options.io_priority,
+                options.memory_limit_mb,
+            ],
+        }
+        return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def attach_or_spawn(self, spawn: Callable[[], Tuple[str, subprocess.Popen]]) -> str:
+        os.makedirs(self.data_directory, exist_ok=True)
+
+        with self._lock():
+            discovery = read_json(self.discovery_path)
+            if discovery is not None and self._is_running(discovery):
+                if discovery.get("options_hash") != self.options_hash:
+                    raise RuntimeError(
+                        f"A server with different options is already running from '{self.data_directory}' "
+                        f"(pid {discovery.get('pid')})"
+                    )
+                self.url, self.pid = discovery["url"], discovery["pid"]
+                if discovery.pop("idle_since", None) is not None:
+                    # cancels the pending idle shutdown
+                    write_json_atomically(self.discovery_path, discovery)
+            else:
+                self.url, process = spawn()
+                self.pid = process.pid
+                _spawned_processes[process.pid] = process
+                self.spawned = True
+                write_json_atomically(
+                    self.discovery_path,
+                    {"url": self.url, "pid": self.pid, "options_hash": self.options_hash, "started_at": time.time()},
+                )
+
+            self._add_lease()
+
+        return self.url
+
+    def detach(self) -> None:
+        if self._lease_path is None:
+            return
+
+        with self._lock():
+            try:
+                os.remove(self._lease_path)
+            except OSError:
+                pass
+            self._lease_path = None
+
+            if self._live_leases():
+                return
+
+            discovery = read_json(self.discovery_path)
+            if discovery is None or discovery.get("pid") != self.pid:
+                return
+
+            if self.idle_timeout > timedelta(0):
+                discovery["idle_since"] = time.time()
+                write_json_atomically(self.discovery_path, discovery)
+                self._start_idle_watcher(discovery["idle_since"])
+            else:
+                self.stop()
+
+    def stop(self) -> None:
+        # callers hold the lock
+        if self.pid is not None:
+            self._terminate(self.pid)
+        try:
+            os.remove(self.discovery_path)
+        except OSError:
+            pass
+
+    def _is_running(self, discovery: Dict[str, Any]) -> bool:
+        pid, url = discovery.get("pid"), discovery.get("url")
+        return isinstance(pid, int) and bool(url) and is_process_alive(pid) and is_listening(url)
+
+    def _add_lease(self) -> None:
+        os.makedirs(self.leases_directory, exist_ok=True)
+        self._lease_path = os.path.join(self.leases_directory, f"{os.getpid()}-{uuid.uuid4().hex}")
+        with open(self._lease_path, "w"):
+            pass
+
+    def _live_leases(self) -> List[str]:
+        # leases of processes which died without detaching are dropped
+        try:
+            names = os.listdir(self.leases_directory)
+        except OSError:
+            return []
+
+        live = []
+        for name in names:
+            try:
+                pid = int(name.split("-", 1)[0])
+            except ValueError:
+                continue
+            if is_process_alive(pid):
+                live.append(name)
+            else:
+                try:
+                    os.remove(os.path.join(self.leases_directory, name))
+                except OSError:
+                    pass
+        return live
+
+    def _terminate(self, pid: int) -> None:
+        process = _spawned_processes.pop(pid, None)
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(self.shutdown_timeout.total_seconds())
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            return
+
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            return
+
+        deadline = time.monotonic() + self.shutdown_timeout.total_seconds()
+        while is_process_alive(pid):
+            if time.monotonic() > deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+                except OSError:
+                    pass
+                return
+            time.sleep(0.05)
+
+    def _start_idle_watcher(self, idle_since: float) -> None:
+        # the package might not be installed, make sure the watcher imports this copy of it
+        package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+
+        kwargs: Dict[str, Any] = {"start_new_session": True} if sys.platform != "win32" else {}
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                __name__,
+                self.data_directory,
+                str(self.pid),
+                repr(idle_since),
+                str(self.idle_timeout.total_seconds()),
+                str(self.shutdown_timeout.total_seconds()),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            close_fds=True,
+            **kwargs,
+        )
+
+    @staticmethod
+    def wait_until_online(process: subprocess.Popen, output_path: str, startup_timeout: timedelta) -> Optional[str]:
+        # the detached server writes its output to a file, since nobody would drain a pipe once the spawner exits
+        prefix = "Server available on: "
+        deadline = time.monotonic() + startup_timeout.total_seconds()
+        with open(output_path, "rb") as output:
+            pending = b""
+            while time.monotonic() < deadline:
+                chunk = output.read()
+                if chunk:
+                    pending += chunk
+                    *lines, pending = pending.split(b"\n")
+                    for raw_line in lines:
+                        line = raw_line.decode("utf-8", errors="replace").strip()
+                        if line.startswith(prefix):
+                            return line[len(prefix) :]
+                        if match_fatal_startup_message(line) is not None:
+                            return None
+                elif process.poll() is not None:
+                    return None
+                else:
+                    time.sleep(0.01)
+        return None
+
+
+def _watch(data_directory: str, pid: int, idle_since: float, idle_seconds: float, shutdown_seconds: float) -> None:
+    time.sleep(idle_seconds)
+
+    daemon = ServerDaemon(data_directory, "", shutdown_timeout=timedelta(seconds=shutdown_seconds))
+    with daemon._lock():
+        discovery = read_json(daemon.discovery_path)
+        if discovery is None or discovery.get("pid") != pid or discovery.get("idle_since") != idle_since:
+            # somebody attached in the meantime, the last one of them to detach started a new watcher
+            return
+
+        daemon.pid = pid
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    _watch(sys.argv[1], int(sys.argv[2]), float(sys.argv[3]), float(sys.argv[4]), float(sys.argv[5]))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+PhaseHook = Callable[["PhaseTiming"], None]
+
+
+class PhaseTiming:
+    def __init__(self, name: str, start: float, end: float, thread_id: int, details: Dict[str, Any]):
+        # start and end are time.perf_counter() values
+        self.name = name
+        self.start = start
+        self.end = end
+        self.thread_id = thread_id
+        self.details = details
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(seconds=self.end - self.start)
+
+    def __repr__(self) -> str:
+        return f"PhaseTiming({self.name!r}, {self.duration.total_seconds() * 1000:.1f} ms, {self.details})"
+
+
+class StartupReport:
+    # phases of start_server (and of shutdown), in the order they finished
+    # pre-flight steps run concurrently, so their durations overlap and don't add up to the total
+    # restarts and resumes keep adding phases to a long-running server, only the last max_phases are kept
+    def __init__(self, hooks: Optional[List[PhaseHook]] = None, max_phases: int = 1000):
+        self.origin = time.perf_counter()
+        self.hooks: List[PhaseHook] = list(hooks or [])
+        self._phases: Deque[PhaseTiming] = deque(maxlen=max_phases)
+        self._lock = threading.Lock()
+
+    @property
+    def phases(self) -> List[PhaseTiming]:
+        with self._lock:
+            return list(self._phases)
+
+    def get(self, name: str) -> Optional[PhaseTiming]:
+        # the last phase with that name
+        for phase in reversed(self.phases):
+            if phase.name == name:
+                return phase
+        return None
+
+    def duration(self, name: str) -> Optional[timedelta]:
+        phase = self.get(name)
+        return phase.duration if phase is not None else None
+
+    def add(self, name: str, start: float, end: Optional[float] = None, **details: Any) -> PhaseTiming:
+        phase = PhaseTiming(name, start, time.perf_counter() if end is None else end, threading.get_ident(), details)
+        with self._lock:
+            self._phases.append(phase)
+
+        for hook in self.hooks:
+            try:
+                hook(phase)
+            except Exception:
+                # instrumentation must never break the server
+                pass
+        return phase
+
+    @contextmanager
+    def phase(self, name: str, **details: Any) -> Iterator[Dict[str, Any]]:
+        # the yielded dict can be filled with details which are only known at the end of the phase
+        start = time.perf_counter()
+        try:
+            yield details
+        except BaseException as e:
+            details["error"] = repr(e)
+            raise
+        finally:
+            self.add(name, start, **details)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        events = [
+            {
+                "name": phase.name,
+                "cat": "ravendb_embedded",
+                "ph": "X",
+                "ts": round((phase.start - self.origin) * 1_000_000, 1),
+                "dur": round((phase.end - phase.start) * 1_000_000, 1),
+                "pid": pid,
+                "tid": phase.thread_id,
+                "args": {key: str(value) for key, value in phase.details.items()},
+            }
+            for phase in self.phases
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        # open in chrome://tracing or https://ui.perfetto.dev
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f, indent=1)
+
+    def __str__(self) -> str:
+        lines = ["Startup report:"]
+        for phase in sorted(self.phases, key=lambda p: p.start):
+            offset = (phase.start - self.origin) * 1000
+            details = " ".join(f"{key}={value}" for key, value in phase.details.items())
+            lines.append(
+                f"  +{offset:9.1f} ms  {phase.name:<32} {phase.duration.total_seconds() * 1000:9.1f} ms  {details}"
+            )
+        return os.linesep.join(lines)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Callable, List, Optional, Union
+
+from ravendb import CreateDatabaseOperation, DocumentStore
+from ravendb.documents.conventions import DocumentConventions
+
+from ravendb_embedded.options import DatabaseOptions
+
+
+def create_document_store(
+    urls: Union[str, List[str]],
+    database_name: Optional[str],
+    certificate_path: Optional[str] = None,
+    trust_store_path: Optional[str] = None,
+    conventions: Optional[DocumentConventions] = None,
+) -> DocumentStore:
+    # not initialized yet, so the caller can still register its events
+    store = DocumentStore(urls, database_name)
+    if certificate_path:
+        store.certificate_pem_path = certificate_path
+    store.trust_store_path = trust_store_path
+    if conventions is not None:
+        store.conventions = conventions
+    return store
+
+
+def is_database_exists_error(error: BaseException) -> bool:
+    # todo: change exc type when python client will implement conflict handling
+    message = error.args[0] if error.args else None
+    return isinstance(message, str) and ("conflict" in message or "already exists" in message)
+
+
+def try_create_database(
+    store: DocumentStore,
+    options: DatabaseOptions,
+    log_debug: Callable[[str], None],
+    replication_factor: int = 1,
+) -> bool:
+    # False when the database already exists
+    try:
+        store.maintenance.server.send(CreateDatabaseOperation(options.database_record, replication_factor))
+        return True
+    except Exception as e:
+        # Expected behavior when the database already exists
+        if not is_database_exists_error(e):
+            raise
+        log_debug(f"{options.database_record.database_name} already exists.")
+        return False
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Deque, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from ravendb_embedded.embedded_server import EmbeddedServer
+
+
+class WatchdogOptions:
+    def __init__(self):
+        self.check_interval: timedelta = timedelta(seconds=1)
+        # GET <server url><health_check_path>, None checks only that the process is alive
+        self.health_check_path: Optional[str] = "/setup/alive"
+        self.health_check_timeout: timedelta = timedelta(seconds=5)
+        # consecutive failed health checks after which the server counts as hung and is restarted
+        self.unhealthy_threshold: int = 3
+        self.initial_backoff: timedelta = timedelta(seconds=1)
+        self.max_backoff: timedelta = timedelta(seconds=30)
+        # more restarts than this within crash_loop_window and the watchdog gives up
+        self.max_restarts: int = 5
+        self.crash_loop_window: timedelta = timedelta(minutes=5)
+        self.listeners: List[Callable[[WatchdogEvent], None]] = list()
+
+
+class WatchdogEvent:
+    PROCESS_EXITED = "process_exited"
+    UNHEALTHY = "unhealthy"
+    RESTARTING = "restarting"
+    RESTARTED = "restarted"
+    RESTART_FAILED = "restart_failed"
+    GAVE_UP = "gave_up"
+
+    def __init__(self, kind: str, **details: Any):
+        self.kind = kind
+        self.timestamp = time.time()
+        self.details = details
+
+    def __repr__(self) -> str:
+        return f"WatchdogEvent({self.kind!r}, {self.details})"
+
+
+class _PinnedCertificateAdapter(HTTPAdapter):
+    # accepts exactly one certificate, the connection counts as verified so urllib3 doesn't warn about it
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        super().__init__()
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        kwargs["assert_fingerprint"] = self.fingerprint
+        super().init_poolmanager(*args, **kwargs)
+
+
+class ServerWatchdog:
+    # restarts a server process which exited or stopped answering, on the same url, so the stores keep working
+    def __init__(self, server: EmbeddedServer, options: WatchdogOptions):
+        self.server = server
+        self.options = options
+        self.events: Deque[WatchdogEvent] = deque(maxlen=100)
+        self.gave_up = False
+        self._restarts: Deque[float] = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[requests.Session] = None
+
+    def start(self) -> None:
+        self._session = self._create_session()
+        self._thread = threading.Thread(target=self._run, name="ravendb-embedded-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _create_session(self) -> requests.Session:
+        # the health checks only go to the server this process started, which may use a self-signed certificate
+        # without a CA certificate to verify it, the server certificate is pinned by its fingerprint
+        from ravendb_embedded.raven_server_runner import RavenServerRunner
+
+        session = requests.Session()
+        # a local server, the proxies and the CA bundle of the environment would override the settings below
+        session.trust_env = False
+        session.cert = self.server.client_pem_certificate_path
+        security = self.server._server_options.security if self.server._server_options is not None else None
+        if self.server.trust_store_path:
+            session.verify = self.server.trust_store_path
+        elif security is not None and security.server_pfx_certificate_path:
+            fingerprint = RavenServerRunner.get_pfx_certificate_fingerprint(
+                security.server_pfx_certificate_path, security.server_pfx_certificate_password
+            )
+            session.verify = False
+            session.mount("https://", _PinnedCertificateAdapter(fingerprint))
+        return session
+
+    def _emit(self, kind: str, **details: Any) -> None:
+        event = WatchdogEvent(kind, **details)
+        self.events.append(event)
+        self.server._log_debug(f"Watchdog: {event}")
+        for listener in self.options.listeners:
+            try:
+                listener(event)
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        with self._session:
+            self._watch()
+
+    def _watch(self) -> None:
+        failed_checks = 0
+        while not self._stop.wait(self.options.check_interval.total_seconds()):
+            server = self.server.server_task
+            if server is None or not server.created or not self.server._available.is_set():
+                # stopped, suspended or being restarted right now
+                failed_checks = 0
+                continue
+
+            url, process = server.get_value()
+            exit_code = process.poll()
+            if exit_code is not None:
+                self._emit(WatchdogEvent.PROCESS_EXITED, pid=process.pid, exit_code=exit_code)
+            elif self._is_healthy(url):
+                failed_checks = 0
+                continue
+            else:
+                failed_checks += 1
+                if failed_checks < self.options.unhealthy_threshold:
+                    continue
+                self._emit(WatchdogEvent.UNHEALTHY, pid=process.pid, failed_checks=failed_checks)
+
+            failed_checks = 0
+            if not self._recover(process):
+                return
+
+    def _is_healthy(self, url: str) -> bool:
+        path = self.options.health_check_path
+        if path is None:
+            return True
+        try:
+            response = self._session.get(
+                url.rstrip("/") + path, timeout=self.options.health_check_timeout.total_seconds()
+            )
+            return response.status_code < 500
+        except requests.RequestException:
+            return False
+
+    def _recover(self, process) -> bool:
+        # False once the watchdog gave up or was stopped
+        while not self._stop.is_set():
+            now = time.monotonic()
+            window = self.options.crash_loop_window.total_seconds()
+            while self._restarts and now - self._restarts[0] > window:
+                self._restarts.popleft()
+
+            if len(self._restarts) >= self.options.max_restarts:
+                self.gave_up = True
+                self._emit(WatchdogEvent.GAVE_UP, restarts=len(self._restarts), window=self.options.crash_loop_window)
+                return False
+
+            backoff = min(
+                self.options.initial_backoff.total_seconds() * 2 ** len(self._restarts),
+                self.options.max_backoff.total_seconds(),
+            )
+            attempt = len(self._restarts) + 1
+            self._emit(WatchdogEvent.RESTARTING, attempt=attempt, backoff=timedelta(seconds=backoff))
+            if self._stop.wait(backoff):
+                return False
+
+            self._restarts.append(time.monotonic())
+            start = time.perf_counter()
+            try:
+                server = self.server._restart_process(process)
+            except Exception as e:
+                self._emit(WatchdogEvent.RESTART_FAILED, attempt=attempt, error=repr(e))
+                continue
+            if server is None:
+                # somebody else restarted or closed the server in the meantime
+                return True
+
+            url, restarted = server
+            self._emit(
+                WatchdogEvent.RESTARTED,
+                attempt=attempt,
+                pid=restarted.pid,
+                url=url,
+                duration=timedelta(seconds=time.perf_counter() - start),
+            )
+            return True
+        return False
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Optional, Union
+
+# small per-worker buffers keep peak memory at a few MB even with many workers
+_COPY_BUFFER_SIZE = 64 * 1024
+
+
+class ParallelZipExtractor:
+    # zlib releases the GIL while inflating, so a thread pool scales with the number of cores
+    def __init__(self, max_workers: Optional[int] = None, skip_existing: bool = True):
+        self.max_workers = max_workers or min(32, os.cpu_count() or 1)
+        self.skip_existing = skip_existing
+
+    def extract(self, source: Union[str, os.PathLike, IO[bytes]], out: str) -> None:
+        with zipfile.ZipFile(source, "r") as zipped:
+            members = zipped.infolist()
+
+            os.makedirs(out, exist_ok=True)
+            directories = set()
+            files = []
+            for member in members:
+                target = self.get_target_path(out, member.filename)
+                if member.is_dir():
+                    directories.add(target)
+                else:
+                    directories.add(os.path.dirname(target))
+                    files.append(member)
+
+            for directory in sorted(directories):
+                os.makedirs(directory, exist_ok=True)
+
+            if not isinstance(source, (str, os.PathLike)) or self.max_workers == 1 or len(files) < 2:
+                # a file object can't be opened once per worker
+                for member in files:
+                    self._extract_member(zipped, member, out)
+                return
+
+        batches = self._split(files, self.max_workers)
+
+        def extract_batch(batch: List[zipfile.ZipInfo]) -> None:
+            with zipfile.ZipFile(source, "r") as worker_zipped:
+                for member_ in batch:
+                    self._extract_member(worker_zipped, member_, out)
+
+        with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+            for _ in executor.map(extract_batch, batches):
+                pass
+
+    @staticmethod
+    def _split(files: List[zipfile.ZipInfo], workers: int) -> List[List[zipfile.ZipInfo]]:
+        # largest members first, each one goes to the least loaded worker
+        batches: List[List[zipfile.ZipInfo]] = [[] for _ in range(min(workers, len(files)))]
+        loads = [0] * len(batches)
+        for member in sorted(files, key=lambda m: m.compress_size, reverse=True):
+            index = loads.index(min(loads))
+            batches[index].append(member)
+            loads[index] += member.compress_size + 1
+        return batches
+
+    @staticmethod
+    def get_target_path(out: str, member_name: str) -> str:
+        # same sanitization as ZipFile.extract - absolute paths and '..' can't escape the output directory
+        name = member_name.replace("/", os.path.sep)
+        if os.path.altsep:
+            name = name.replace(os.path.altsep, os.path.sep)
+        name = os.path.splitdrive(name)[1]
+        parts = [part for part in name.split(os.path.sep) if part not in ("", os.path.curdir, os.path.pardir)]
+        return os.path.join(out, *parts)
+
+    def _extract_member(self, zipped: zipfile.ZipFile, member: zipfile.ZipInfo, out: str) -> None:
+        target = self.get_target_path(out, member.filename)
+
+        if not (self.skip_existing and self._is_already_extracted(member, target)):
+            if os.path.lexists(target):
+                # never write through an existing file, it might be hardlinked from the server cache
+                os.remove(target)
+            try:
+                # ZipExtFile verifies the CRC once the member is read to the end
+                with zipped.open(member) as source, open(target, "wb") as destination:
+                    shutil.copyfileobj(source, destination, _COPY_BUFFER_SIZE)
+            except BaseException:
+                try:
+                    os.remove(target)
+                except OSError:
+                    pass
+                raise
+
+        mode = member.external_attr >> 16
+        if member.create_system == 3 and stat.S_IMODE(mode):
+            os.chmod(target, stat.S_IMODE(mode))
+
+    @staticmethod
+    def _is_already_extracted(member: zipfile.ZipInfo, target: str) -> bool:
+        try:
+            if os.path.getsize(target) != member.file_size:
+                return False
+        except OSError:
+            return False
+
+        crc = 0
+        with open(target, "rb") as f:
+            for chunk in iter(lambda: f.read(_COPY_BUFFER_SIZE), b""):
+                crc = zlib.crc32(chunk, crc)
+        return crc == member.CRC
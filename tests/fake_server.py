@@ -0,0 +1,149 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.provide import ExternalServerProvider
+
+FAKE_SERVER_SCRIPT = """
+import json
+import os
+import signal
+import socket
+import sys
+import time
+
+# behaviour is driven by '--Fake.<Name>=<value>' arguments passed through ServerOptions.command_line_args
+settings = dict(arg[len("--Fake.") :].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--Fake."))
+
+time.sleep(float(settings.get("StartupDelay", "0")))
+
+if "Error" in settings:
+    # a startup failure: the message goes to stderr, then the server either exits or hangs like a stuck startup
+    print("Fake RavenDB server", flush=True)
+    print(settings["Error"], file=sys.stderr, flush=True)
+    if "ExitCode" in settings:
+        sys.exit(int(settings["ExitCode"]))
+    time.sleep(60)
+elif "ExitCode" in settings:
+    sys.exit(int(settings["ExitCode"]))
+
+if os.path.exists(settings.get("CrashIfExists", "")):
+    print("Fake RavenDB server crashed", file=sys.stderr, flush=True)
+    sys.exit(134)
+
+url = "http://127.0.0.1:8080"
+# with HangIgnoresShutdown a hung server ignores the shutdown command and SIGTERM too, only SIGKILL stops it
+state = {"hung": False}
+if settings.get("HangIgnoresShutdown") == "true":
+    signal.signal(signal.SIGTERM, lambda signum, frame: None if state["hung"] else sys.exit(0))
+if settings.get("Listen") == "true":
+    server_url = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--ServerUrl=")), "")
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", int(server_url.rsplit(":", 1)[1]) if server_url else 0))
+    listener.listen(16)
+    url = f"http://127.0.0.1:{listener.getsockname()[1]}"
+
+    # the cluster topology as far as this node knows it, enough for EmbeddedCluster to join nodes
+    cluster = {"Leader": None, "Topology": {"Members": {}}}
+
+    def handle(method, target):
+        from urllib.parse import parse_qs, urlsplit
+
+        parts = urlsplit(target)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if method == "POST" and parts.path == "/admin/cluster/bootstrap":
+            cluster["Leader"] = "A"
+            cluster["Topology"]["Members"]["A"] = url
+        elif method == "PUT" and parts.path == "/admin/cluster/node":
+            cluster["Topology"]["Members"][query["tag"]] = query["url"]
+        elif parts.path == "/cluster/topology":
+            return 200, json.dumps(cluster).encode("utf-8")
+        elif parts.path.startswith("/databases/Failing/"):
+            error = {"Type": "System.InvalidOperationException", "Message": "Fake failure", "Error": "Fake failure"}
+            return 500, json.dumps(error).encode("utf-8")
+        return 200, b""
+
+    def serve_http():
+        # answers requests with 200 (500 for the 'Failing' database), or hangs like a deadlocked server once
+        # HangIfExists is there
+        while True:
+            connection, _ = listener.accept()
+            if os.path.exists(settings.get("HangIfExists", "")):
+                state["hung"] = True
+                continue
+            request_line = connection.recv(65536).split(b"\\r\\n", 1)[0].decode("latin-1").split()
+            status, body = handle(request_line[0], request_line[1]) if len(request_line) >= 2 else (200, b"")
+            headers = f"HTTP/1.1 {status} Fake\\r\\nContent-Type: application/json\\r\\n"
+            headers += f"Content-Length: {len(body)}\\r\\nConnection: close\\r\\n\\r\\n"
+            connection.sendall(headers.encode("latin-1") + body)
+            connection.close()
+
+    if settings.get("Http") == "true":
+        import threading
+
+        threading.Thread(target=serve_http, daemon=True).start()
+
+print("Fake RavenDB server", flush=True)
+for name in filter(None, settings.get("PrintEnv", "").split(",")):
+    print(f"env {name}={os.environ.get(name)}", flush=True)
+if settings.get("PrintLimits") == "true":
+    import resource
+
+    print(f"limits affinity={sorted(os.sched_getaffinity(0))}", flush=True)
+    print(f"limits nice={os.getpriority(os.PRIO_PROCESS, 0)}", flush=True)
+    print(f"limits address_space={resource.getrlimit(resource.RLIMIT_AS)[0]}", flush=True)
+    with open("/proc/self/cgroup") as f:
+        print(f"limits cgroup={f.read().strip().splitlines()[-1]}", flush=True)
+print(f"Server available on: {url}", flush=True)
+
+for i in range(int(settings.get("ChattyLines", "0"))):
+    print(f"stdout line {i}")
+    print(f"stderr line {i}", file=sys.stderr)
+sys.stdout.flush()
+
+if "--non-interactive" in sys.argv:
+    # like the real server, runs until it gets SIGTERM
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    while True:
+        time.sleep(1)
+
+ignores_shutdown = "HangIgnoresShutdown" in settings
+for line in sys.stdin:
+    if line.strip() == "shutdown no-confirmation" and not (state["hung"] and ignores_shutdown):
+        break
+# a hung server doesn't notice that stdin was closed either
+while state["hung"] and ignores_shutdown:
+    time.sleep(1)
+"""
+
+
+class FakeServer:
+    @staticmethod
+    def create(directory: str) -> str:
+        # writes an executable 'dotnet' stand-in that mimics the RavenDB startup output
+        os.makedirs(directory, exist_ok=True)
+        dotnet_path = os.path.join(directory, "dotnet")
+        with open(dotnet_path, "w") as f:
+            f.write(f"#!{sys.executable}\n")
+            f.write(FAKE_SERVER_SCRIPT)
+        os.chmod(dotnet_path, os.stat(dotnet_path).st_mode | stat.S_IEXEC)
+
+        server_files = os.path.join(directory, "ServerFiles")
+        os.makedirs(server_files, exist_ok=True)
+        Path(server_files, ExternalServerProvider.SERVER_DLL_FILENAME).touch()
+
+        return dotnet_path
+
+    @staticmethod
+    def configure(directory: str, server_options: ServerOptions = None) -> ServerOptions:
+        server_options = server_options or ServerOptions()
+        server_options.dot_net_path = FakeServer.create(directory)
+        server_options.framework_version = None
+        server_options.provider = ExternalServerProvider(os.path.join(directory, "ServerFiles"))
+        server_options.target_server_location = str(Path(directory, "RavenDBServer"))
+        server_options.data_directory = str(Path(directory, "RavenDB"))
+        server_options.logs_path = str(Path(directory, "Logs"))
+        return server_options
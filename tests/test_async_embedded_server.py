@@ -0,0 +1,181 @@
+import asyncio
+import sys
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from unittest import TestCase
+
+import requests
+
+from ravendb_embedded.async_embedded_server import AsyncEmbeddedServer
+from ravendb_embedded.options import DatabaseOptions
+from tests.fake_server import FakeServer
+
+
+class SlowStoreServer(AsyncEmbeddedServer):
+    def __init__(self):
+        super().__init__()
+        self.closed_stores = []
+
+    def _initialize_document_store(self, database_name, options):
+        store = super()._initialize_document_store(database_name, options)
+        # like creating the database
+        time.sleep(0.3)
+        store.add_after_close(lambda: self.closed_stores.append(database_name))
+        return store
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestAsyncEmbeddedServer(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_start_and_close_without_blocking_the_loop(self):
+        server_options = FakeServer.configure(self.temp_dir)
+        server_options.command_line_args.append("--Fake.StartupDelay=0.3")
+
+        async def scenario():
+            ticks = 0
+            starting = True
+
+            async def ticker():
+                nonlocal ticks
+                while starting:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker_task = asyncio.ensure_future(ticker())
+            async with AsyncEmbeddedServer() as server:
+                await server.start_server(server_options)
+                starting = False
+                await ticker_task
+
+                self.assertEqual("http://127.0.0.1:8080", server.get_server_uri())
+                process = server.process
+
+            self.assertEqual(0, process.returncode)
+            self.assertIsNone(server.process)
+            return ticks
+
+        self.assertGreater(asyncio.run(scenario()), 10)
+
+    def test_servers_start_concurrently(self):
+        options = []
+        for i in range(3):
+            server_options = FakeServer.configure(f"{self.temp_dir}/{i}")
+            server_options.command_line_args.append("--Fake.StartupDelay=0.5")
+            options.append(server_options)
+
+        async def scenario():
+            servers = [AsyncEmbeddedServer() for _ in options]
+            start = time.perf_counter()
+            await asyncio.gather(*(server.start_server(o) for server, o in zip(servers, options)))
+            elapsed = time.perf_counter() - start
+            await asyncio.gather(*(server.close() for server in servers))
+            return elapsed
+
+        self.assertLess(asyncio.run(scenario()), 1.4)
+
+    def test_startup_timeout_raises(self):
+        server_options = FakeServer.configure(self.temp_dir)
+        server_options.command_line_args.append("--Fake.StartupDelay=5")
+        server_options.max_server_startup_time_duration = timedelta(milliseconds=300)
+        server_options.graceful_shutdown_timeout = timedelta(milliseconds=100)
+
+        async def scenario():
+            server = AsyncEmbeddedServer()
+            with self.assertRaises(RuntimeError) as context:
+                await server.start_server(server_options)
+            self.assertIn("Unable to start the RavenDB Server", str(context.exception))
+
+        asyncio.run(scenario())
+
+    def test_output_is_drained_after_startup(self):
+        server_options = FakeServer.configure(self.temp_dir)
+        server_options.command_line_args.append("--Fake.ChattyLines=100")
+        server_options.server_output_buffer_size = 10
+        received = []
+        server_options.server_output_callback = lambda stream, line: received.append((stream, line))
+
+        async def scenario():
+            async with AsyncEmbeddedServer() as server:
+                await server.start_server(server_options)
+                for _ in range(200):
+                    if len(received) >= 202:
+                        break
+                    await asyncio.sleep(0.01)
+
+                self.assertEqual(10, len(server.stdout_lines))
+                self.assertEqual("stderr line 99", server.stderr_lines[-1])
+
+        asyncio.run(scenario())
+        self.assertEqual(202, len(received))
+
+    def test_concurrent_callers_share_document_store(self):
+        server_options = FakeServer.configure(self.temp_dir)
+
+        async def scenario():
+            async with AsyncEmbeddedServer() as server:
+                await server.start_server(server_options)
+                database_options = DatabaseOptions.from_database_name("Test")
+                database_options.skip_creating_database = True
+
+                first, second = await asyncio.gather(
+                    server.get_document_store_from_options(database_options),
+                    server.get_document_store_from_options(database_options),
+                )
+                self.assertIs(first, second)
+                self.assertEqual("http://127.0.0.1:8080", first.urls[0])
+
+        asyncio.run(scenario())
+
+    def test_close_waits_for_stores_being_created(self):
+        server_options = FakeServer.configure(self.temp_dir)
+
+        async def scenario():
+            server = SlowStoreServer()
+            await server.start_server(server_options)
+            database_options = DatabaseOptions.from_database_name("Test")
+            database_options.skip_creating_database = True
+
+            creating = asyncio.ensure_future(server.get_document_store_from_options(database_options))
+            await asyncio.sleep(0.05)
+            await server.close()
+            await asyncio.gather(creating, return_exceptions=True)
+            return server.closed_stores
+
+        self.assertEqual(["Test"], asyncio.run(scenario()))
+
+    def test_close_kills_server_which_ignores_shutdown(self):
+        hang_marker = Path(self.temp_dir, "hang")
+        server_options = FakeServer.configure(self.temp_dir)
+        server_options.graceful_shutdown_timeout = timedelta(milliseconds=200)
+        server_options.command_line_args += [
+            "--Fake.Listen=true",
+            "--Fake.Http=true",
+            f"--Fake.HangIfExists={hang_marker}",
+            "--Fake.HangIgnoresShutdown=true",
+        ]
+
+        async def scenario():
+            server = AsyncEmbeddedServer()
+            await server.start_server(server_options)
+            process = server.process
+
+            hang_marker.touch()
+            with self.assertRaises(requests.RequestException):
+                requests.get(server.server_url, timeout=0.2)
+
+            start = time.perf_counter()
+            await asyncio.wait_for(server.close(), 10)
+            return time.perf_counter() - start, process.returncode
+
+        elapsed, exit_code = asyncio.run(scenario())
+        self.assertLess(elapsed, 5)
+        self.assertEqual(-9, exit_code)
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from ravendb_embedded.provide import CopyServerProvider
+
+
+class TestCopyServerProviderSync(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_files = os.path.join(self._temp_dir.name, "ServerFiles")
+        self.target = os.path.join(self._temp_dir.name, "Target")
+
+        os.makedirs(os.path.join(self.server_files, "runtimes"))
+        Path(self.server_files, "Raven.Server.dll").write_bytes(b"server v1")
+        Path(self.server_files, "runtimes", "librvnpal.so").write_bytes(b"pal v1")
+        Path(self.server_files, "settings.json").write_bytes(b"{}")
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def read_target(self, *parts: str) -> bytes:
+        return Path(self.target, *parts).read_bytes()
+
+    def test_sync_copies_missing_files_and_writes_manifest(self):
+        os.makedirs(self.target)
+        Path(self.target, "settings.json").write_bytes(b"{}")
+
+        CopyServerProvider(self.server_files, sync=True).provide(self.target)
+
+        self.assertEqual(b"server v1", self.read_target("Raven.Server.dll"))
+        self.assertEqual(b"pal v1", self.read_target("runtimes", "librvnpal.so"))
+        self.assertTrue(os.path.exists(os.path.join(self.target, CopyServerProvider.MANIFEST_FILE_NAME)))
+
+    def test_sync_picks_up_upgrade_and_removes_stale_files(self):
+        provider = CopyServerProvider(self.server_files, sync=True)
+        provider.provide(self.target)
+
+        os.remove(os.path.join(self.server_files, "settings.json"))
+        Path(self.server_files, "Raven.Server.dll").write_bytes(b"server v2")
+        Path(self.server_files, "runtimes", "new.so").write_bytes(b"new")
+
+        provider.provide(self.target)
+
+        self.assertEqual(b"server v2", self.read_target("Raven.Server.dll"))
+        self.assertEqual(b"new", self.read_target("runtimes", "new.so"))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "settings.json")))
+
+    def test_sync_repairs_partial_target(self):
+        provider = CopyServerProvider(self.server_files, sync=True)
+        provider.provide(self.target)
+
+        os.remove(os.path.join(self.target, "runtimes", "librvnpal.so"))
+        os.remove(os.path.join(self.target, CopyServerProvider.MANIFEST_FILE_NAME))
+
+        provider.provide(self.target)
+
+        self.assertEqual(b"pal v1", self.read_target("runtimes", "librvnpal.so"))
+
+    def test_sync_repairs_target_changed_behind_the_manifest(self):
+        provider = CopyServerProvider(self.server_files, sync=True)
+        provider.provide(self.target)
+
+        os.remove(os.path.join(self.target, "runtimes", "librvnpal.so"))
+        Path(self.target, "Raven.Server.dll").write_bytes(b"truncated")
+
+        provider.provide(self.target)
+
+        self.assertEqual(b"pal v1", self.read_target("runtimes", "librvnpal.so"))
+        self.assertEqual(b"server v1", self.read_target("Raven.Server.dll"))
+
+    def test_up_to_date_target_is_not_walked(self):
+        provider = CopyServerProvider(self.server_files, sync=True)
+        provider.provide(self.target)
+
+        with patch("ravendb_embedded.provide.shutil.copy2") as copy2:
+            provider.provide(self.target)
+            copy2.assert_not_called()
+
+    def test_only_changed_files_are_copied(self):
+        provider = CopyServerProvider(self.server_files, sync=True)
+        provider.provide(self.target)
+
+        Path(self.server_files, "Raven.Server.dll").write_bytes(b"server v2")
+
+        with patch("ravendb_embedded.provide.shutil.copy2", wraps=__import__("shutil").copy2) as copy2:
+            provider.provide(self.target)
+
+        self.assertEqual(1, copy2.call_count)
+        self.assertEqual(os.path.join(self.server_files, "Raven.Server.dll"), copy2.call_args[0][0])
+
+    def test_verify_hashes_skips_touched_but_identical_files(self):
+        provider = CopyServerProvider(self.server_files, sync=True, verify_hashes=True)
+        provider.provide(self.target)
+
+        source = os.path.join(self.server_files, "Raven.Server.dll")
+        later = time.time() + 10
+        os.utime(source, (later, later))
+
+        with patch("ravendb_embedded.provide.shutil.copy2") as copy2:
+            provider.provide(self.target)
+            copy2.assert_not_called()
+
+        self.assertEqual(
+            os.stat(source).st_mtime_ns, os.stat(os.path.join(self.target, "Raven.Server.dll")).st_mtime_ns
+        )
+
+    def test_sync_into_source_is_no_op(self):
+        CopyServerProvider(self.server_files, sync=True).provide(self.server_files)
+
+        self.assertFalse(os.path.exists(os.path.join(self.server_files, CopyServerProvider.MANIFEST_FILE_NAME)))
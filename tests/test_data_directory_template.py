@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.preflight import PreflightStepError
+from tests.fake_server import FakeServer
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestDataDirectoryTemplate(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+        self.server_options = FakeServer.configure(self.temp_dir)
+        self.template = os.path.join(self.temp_dir, "Template")
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_data_directory_is_cloned_from_template(self):
+        os.makedirs(os.path.join(self.template, "Databases", "Seeded"))
+        Path(self.template, "Databases", "Seeded", "Raven.voron").write_bytes(b"seed" * 1024)
+        os.makedirs(self.server_options.data_directory)
+        Path(self.server_options.data_directory, "stale.txt").write_text("left over from a previous run")
+
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options.with_data_directory_template(self.template))
+
+            data_directory = self.server_options.data_directory
+            cloned = Path(data_directory, "Databases", "Seeded", "Raven.voron")
+            self.assertEqual(b"seed" * 1024, cloned.read_bytes())
+            self.assertFalse(os.path.exists(os.path.join(data_directory, "stale.txt")))
+            # the server must never write through to the template
+            self.assertFalse(
+                os.path.samefile(cloned, os.path.join(self.template, "Databases", "Seeded", "Raven.voron"))
+            )
+
+    def test_missing_template_fails_startup(self):
+        self.server_options.data_directory_template = os.path.join(self.temp_dir, "Missing")
+
+        with EmbeddedServer() as embedded:
+            with self.assertRaises(PreflightStepError) as context:
+                embedded.start_server(self.server_options)
+
+            self.assertEqual("clone_data_directory_template", context.exception.step_name)
+
+    def test_capture_template_from_server(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            os.makedirs(os.path.join(self.server_options.data_directory, "Databases"), exist_ok=True)
+            Path(self.server_options.data_directory, "Databases", "seed.bin").write_bytes(b"seeded")
+
+            embedded.capture_data_directory_template(self.template)
+
+            self.assertIsNone(embedded.server_task)
+
+        self.assertEqual(b"seeded", Path(self.template, "Databases", "seed.bin").read_bytes())
+        self.assertFalse(os.path.exists(f"{self.template}.{os.getpid()}.tmp"))
+
+    def test_capture_requires_started_server(self):
+        with self.assertRaises(RuntimeError):
+            EmbeddedServer().capture_data_directory_template(self.template)
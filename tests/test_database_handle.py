@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from ravendb_embedded.database_handle import DatabaseHandle
+from ravendb_embedded.embedded_server import EmbeddedServer, Lazy
+from ravendb_embedded.options import DatabaseOptions
+
+
+class TestDatabaseHandle(TestCase):
+    def setUp(self):
+        self.server = EmbeddedServer()
+        # nothing listens there, the handles never send a request in these tests
+        self.server.server_task = Lazy(lambda: ("http://127.0.0.1:1", None))
+        self.server.server_task.get_value()
+
+    def tearDown(self):
+        self.server.close()
+
+    def get_handle(self, database: str) -> DatabaseHandle:
+        options = DatabaseOptions.from_database_name(database)
+        options.skip_creating_database = True
+        return self.server.get_database_handle_from_options(options)
+
+    def test_handles_share_store_and_connection_pool(self):
+        first = self.get_handle("Tenant1")
+        second = self.get_handle("Tenant2")
+
+        self.assertIs(first.store, second.store)
+        self.assertIsNone(first.store.database)
+        self.assertIsNot(first.get_request_executor(), second.get_request_executor())
+
+        first_adapter = first.get_request_executor().http_session.get_adapter("http://127.0.0.1:1")
+        second_adapter = second.get_request_executor().http_session.get_adapter("http://127.0.0.1:1")
+        self.assertIs(first_adapter, second_adapter)
+
+    def test_handle_is_created_once_per_database(self):
+        self.assertIs(self.get_handle("Tenant1"), self.get_handle("Tenant1"))
+
+    def test_sessions_target_the_handle_database(self):
+        handle = self.get_handle("Tenant1")
+
+        with handle.open_session() as session:
+            self.assertEqual("Tenant1", session.database_name)
+
+    def test_close_releases_shared_store(self):
+        store = self.get_handle("Tenant1").store
+
+        self.server.close()
+
+        self.assertEqual({}, self.server.database_handles)
+        self.assertTrue(store.disposed)
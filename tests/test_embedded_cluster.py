@@ -0,0 +1,111 @@
+import os
+import socket
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+from ravendb_embedded.embedded_cluster import EmbeddedCluster, _find_free_port
+from ravendb_embedded.options import DatabaseOptions
+from ravendb_embedded.provide import ExternalServerProvider
+from tests.fake_server import FakeServer
+
+
+class CountingProvider(ExternalServerProvider):
+    def __init__(self, server_location: str):
+        super().__init__(server_location)
+        self.calls = 0
+
+    def provide(self, target_directory: str) -> None:
+        self.calls += 1
+        super().provide(target_directory)
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestEmbeddedCluster(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+        self.server_options.provider = CountingProvider(os.path.join(self._temp_dir.name, "ServerFiles"))
+        self.server_options.command_line_args += ["--Fake.Listen=true", "--Fake.Http=true"]
+        self.server_options.graceful_shutdown_timeout = self.server_options.graceful_shutdown_timeout / 100
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_nodes_join_one_cluster(self):
+        with EmbeddedCluster(3, self.server_options) as cluster:
+            cluster.start()
+
+            self.assertEqual(1, self.server_options.provider.calls)
+            self.assertEqual(3, len(set(cluster.urls)))
+            self.assertEqual([node.get_server_uri() for node in cluster.nodes], cluster.urls)
+            data_directories = {node._server_options.data_directory for node in cluster.nodes}
+            self.assertEqual(3, len(data_directories))
+
+            members = cluster.get_topology()["Topology"]["Members"]
+            self.assertEqual(dict(zip("ABC", cluster.urls)), members)
+            self.assertEqual(cluster.urls[0], cluster.leader_url)
+
+            options = DatabaseOptions.from_database_name("Orders")
+            options.skip_creating_database = True
+            store = cluster.get_document_store_from_options(options)
+            self.assertEqual(cluster.urls, store.urls)
+            self.assertIs(store, cluster.get_document_store("Orders"))
+
+    def test_kill_and_restart_node(self):
+        with EmbeddedCluster(2, self.server_options) as cluster:
+            cluster.start()
+            process = cluster.nodes[1].server_task.get_value()[1]
+
+            cluster.kill_node(1)
+            self.assertIsNotNone(process.poll())
+
+            cluster.restart_node(1)
+            url, restarted = cluster.nodes[1].server_task.get_value()
+            self.assertEqual(cluster.urls[1], url)
+            self.assertIsNone(restarted.poll())
+
+    def test_close_removes_own_directory(self):
+        cluster = EmbeddedCluster(1, self.server_options)
+        cluster.start()
+        directory = cluster._base_directory
+        cluster.close()
+
+        self.assertFalse(os.path.exists(directory))
+
+    def test_secured_servers_are_rejected(self):
+        self.server_options.secured("server.pfx")
+        with self.assertRaises(ValueError):
+            EmbeddedCluster(3, self.server_options)
+
+    def test_node_options_are_separate(self):
+        self.server_options.trace_file = os.path.join(self._temp_dir.name, "trace.json")
+        command_line_args = list(self.server_options.command_line_args)
+        with EmbeddedCluster(2, self.server_options) as cluster:
+            cluster.start()
+
+            trace_files = [node._server_options.trace_file for node in cluster.nodes]
+            self.assertEqual([os.path.join(self._temp_dir.name, f"trace-{tag}.json") for tag in "AB"], trace_files)
+            self.assertIsNot(cluster.nodes[0]._server_options.command_line_args, self.server_options.command_line_args)
+        self.assertEqual(command_line_args, self.server_options.command_line_args)
+
+    def test_taken_port_is_replaced(self):
+        with socket.socket() as taken:
+            taken.bind(("127.0.0.1", 0))
+            taken.listen(1)
+            ports = [taken.getsockname()[1], _find_free_port()]
+
+            with patch("ravendb_embedded.embedded_cluster._find_free_port", side_effect=ports):
+                with EmbeddedCluster(1, self.server_options) as cluster:
+                    cluster.start()
+
+                    self.assertEqual([f"http://127.0.0.1:{ports[1]}"], cluster.urls)
+                    self.assertEqual(cluster.urls[0], cluster.nodes[0].get_server_uri())
+
+    def test_idle_timeout_is_rejected(self):
+        self.server_options.idle_timeout = timedelta(minutes=1)
+        with self.assertRaises(ValueError):
+            EmbeddedCluster(3, self.server_options)
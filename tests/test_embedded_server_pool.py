@@ -0,0 +1,125 @@
+import sys
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server_pool import EmbeddedServerPool
+from ravendb_embedded.preflight import PreflightStepError
+from ravendb_embedded.provide import ProvideRavenDBServer
+from tests.fake_server import FakeServer
+
+
+class FailingProvider(ProvideRavenDBServer):
+    def provide(self, target_directory: str) -> None:
+        raise OSError("disk full")
+
+
+def wait_until(condition, timeout: float = 10) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestEmbeddedServerPool(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_pre_starts_servers_and_refills_ahead(self):
+        with EmbeddedServerPool(self.server_options, max_size=3, min_idle=2) as pool:
+            self.assertTrue(wait_until(lambda: pool.idle_count == 2))
+
+            server = pool.acquire()
+
+            self.assertEqual("http://127.0.0.1:8080", server.get_server_uri())
+            self.assertEqual(1, pool.in_use_count)
+            self.assertTrue(wait_until(lambda: pool.idle_count == 2))
+            self.assertEqual(3, pool.size)
+
+            pool.release(server)
+
+    def test_servers_get_isolated_locations(self):
+        with EmbeddedServerPool(self.server_options, max_size=2, min_idle=0) as pool:
+            first = pool.acquire()
+            second = pool.acquire()
+
+            first_process = first.server_task.get_value()[1]
+            second_process = second.server_task.get_value()[1]
+            self.assertNotEqual(first_process.args, second_process.args)
+
+            pool.release(first)
+            pool.release(second)
+
+    def test_servers_get_their_own_options(self):
+        self.server_options.secured("server.pfx")
+        with EmbeddedServerPool(self.server_options, max_size=2, min_idle=0) as pool:
+            first, _ = pool._create_options(0)
+            second, _ = pool._create_options(1)
+
+        first.command_line_args.append("--Fake.ExitCode=1")
+        first.environment_variables["RAVEN_TEST"] = "1"
+        first.security.client_pem_certificate_path = "client.pem"
+
+        for options in (second, self.server_options):
+            self.assertEqual([], options.command_line_args)
+            self.assertEqual({}, options.environment_variables)
+            self.assertIsNone(options.security.client_pem_certificate_path)
+        self.assertEqual("server.pfx", second.security.server_pfx_certificate_path)
+
+    def test_released_server_is_recycled_without_reset(self):
+        with EmbeddedServerPool(self.server_options, max_size=1, min_idle=0) as pool:
+            first = pool.acquire()
+            pool.release(first)
+
+            second = pool.acquire()
+
+            self.assertIsNot(first, second)
+            pool.release(second)
+
+    def test_reset_server_returns_it_to_the_pool(self):
+        reset = []
+        with EmbeddedServerPool(self.server_options, max_size=1, min_idle=0, reset_server=reset.append) as pool:
+            with pool.lease() as first:
+                pass
+            with pool.lease() as second:
+                pass
+
+            self.assertIs(first, second)
+            self.assertEqual([first, first], reset)
+
+    def test_acquire_times_out_when_pool_is_exhausted(self):
+        with EmbeddedServerPool(self.server_options, max_size=1, min_idle=0) as pool:
+            server = pool.acquire()
+
+            with self.assertRaises(TimeoutError):
+                pool.acquire(timedelta(milliseconds=100))
+
+            pool.release(server)
+
+    def test_idle_servers_are_evicted(self):
+        with EmbeddedServerPool(
+            self.server_options, max_size=3, min_idle=1, idle_timeout=timedelta(milliseconds=100)
+        ) as pool:
+            servers = [pool.acquire() for _ in range(3)]
+            for server in servers:
+                pool.release(server, recycle=False)
+
+            self.assertTrue(wait_until(lambda: pool.size == 1 and pool.idle_count == 1))
+
+    def test_start_failure_is_reported(self):
+        self.server_options.provider = FailingProvider()
+
+        with EmbeddedServerPool(self.server_options, max_size=1, min_idle=0) as pool:
+            with self.assertRaises(RuntimeError) as context:
+                pool.acquire(timedelta(seconds=10))
+
+            self.assertIsInstance(context.exception.__cause__, PreflightStepError)
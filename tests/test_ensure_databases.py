@@ -0,0 +1,78 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+from ravendb import CreateDatabaseOperation, GetDatabaseNamesOperation
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.options import DatabaseOptions
+
+
+class FakeServerOperations:
+    def __init__(self, existing):
+        self.existing = existing
+        self.created = []
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self._lock = threading.Lock()
+
+    def send(self, operation):
+        if isinstance(operation, GetDatabaseNamesOperation):
+            return list(self.existing)
+
+        if not isinstance(operation, CreateDatabaseOperation):
+            raise AssertionError(f"Unexpected operation {operation}")
+
+        with self._lock:
+            self.concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        time.sleep(0.05)
+        with self._lock:
+            self.concurrent -= 1
+            self.created.append(operation)
+
+
+class StubEmbeddedServer(EmbeddedServer):
+    def __init__(self, existing):
+        super().__init__()
+        self.server_operations = FakeServerOperations(existing)
+        self.initialized = []
+
+    def _get_shared_store(self):
+        return SimpleNamespace(maintenance=SimpleNamespace(server=self.server_operations))
+
+    def _initialize_document_store(self, database_name, options, create_database=True):
+        self.initialized.append((database_name, create_database))
+        return SimpleNamespace(database=database_name)
+
+
+class TestEnsureDatabases(TestCase):
+    def test_creates_only_missing_databases_concurrently(self):
+        server = StubEmbeddedServer(existing=["Tenant0", "tenant1"])
+        options_list = [DatabaseOptions.from_database_name(f"Tenant{i}") for i in range(10)]
+        options_list[9].skip_creating_database = True
+
+        stores = server.ensure_databases(options_list, max_parallelism=4)
+
+        self.assertEqual([f"Tenant{i}" for i in range(10)], list(stores))
+        self.assertEqual("Tenant3", stores["Tenant3"].database)
+        self.assertEqual(7, len(server.server_operations.created))
+        self.assertEqual(4, server.server_operations.max_concurrent)
+        # the stores never send a CreateDatabaseOperation of their own
+        self.assertTrue(all(not create for _, create in server.initialized))
+
+    def test_returns_registered_stores(self):
+        server = StubEmbeddedServer(existing=[])
+
+        stores = server.ensure_databases([DatabaseOptions.from_database_name("Test")])
+
+        self.assertIs(stores["Test"], server.get_document_store("Test"))
+        self.assertEqual(1, len(server.initialized))
+
+    def test_rejects_empty_database_name(self):
+        server = StubEmbeddedServer(existing=[])
+
+        with self.assertRaises(ValueError):
+            server.ensure_databases([DatabaseOptions.from_database_name(" ")])
+        self.assertEqual([], server.server_operations.created)
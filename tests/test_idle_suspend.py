@@ -0,0 +1,104 @@
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from tests.fake_server import FakeServer
+
+
+def wait_until(condition, timeout: float = 10) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestIdleSuspend(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+        self.server_options.command_line_args.append("--Fake.Listen=true")
+        self.server_options.idle_timeout = timedelta(milliseconds=200)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_idle_server_is_suspended_and_resumed_on_access(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            url, process = embedded.server_task.get_value()
+
+            self.assertTrue(wait_until(lambda: embedded.idle_metrics.suspend_count == 1))
+            self.assertEqual(0, process.wait(5))
+            self.assertFalse(embedded.server_task.created)
+
+            self.assertEqual(url, embedded.get_server_uri())
+
+            resumed_process = embedded.server_task.get_value()[1]
+            self.assertIsNone(resumed_process.poll())
+            self.assertEqual(1, embedded.idle_metrics.resume_count)
+            self.assertGreater(embedded.idle_metrics.last_resume_duration, timedelta(0))
+            self.assertEqual(embedded.idle_metrics.last_resume_duration, embedded.idle_metrics.average_resume_duration)
+
+    def test_requests_keep_server_running(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+
+            deadline = time.monotonic() + 0.6
+            while time.monotonic() < deadline:
+                embedded._before_request()
+                time.sleep(0.02)
+
+            self.assertEqual(0, embedded.idle_metrics.suspend_count)
+            self.assertTrue(embedded.server_task.created)
+
+    def test_request_resumes_suspended_server(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            self.assertTrue(wait_until(lambda: embedded.idle_metrics.suspend_count == 1))
+
+            embedded._before_request()
+
+            self.assertTrue(embedded.server_task.created)
+            self.assertIsNone(embedded.server_task.get_value()[1].poll())
+
+    def test_restart_and_request_while_suspended(self):
+        # both resume the server, a resume taking the locks in the opposite order of restart() deadlocked
+        self.server_options.command_line_args.append("--Fake.StartupDelay=0.2")
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            self.assertTrue(wait_until(lambda: embedded.idle_metrics.suspend_count == 1))
+
+            request = threading.Thread(target=embedded._before_request, daemon=True)
+
+            def restart_while_request_waits():
+                with embedded._lifecycle_lock:
+                    request.start()
+                    time.sleep(0.1)
+                    embedded.restart()
+
+            threads = [threading.Thread(target=restart_while_request_waits, daemon=True), request]
+            threads[0].start()
+            for thread in threads:
+                thread.join(10)
+
+            self.assertFalse(any(thread.is_alive() for thread in threads))
+            self.assertEqual(1, embedded.idle_metrics.resume_count)
+
+    def test_close_while_suspended(self):
+        embedded = EmbeddedServer()
+        embedded.start_server(self.server_options)
+        self.assertTrue(wait_until(lambda: embedded.idle_metrics.suspend_count == 1))
+
+        embedded.close()
+
+        self.assertIsNone(embedded.server_task)
+        time.sleep(0.3)
+        self.assertEqual(0, embedded.idle_metrics.resume_count)
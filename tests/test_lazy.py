@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer, Lazy
+from ravendb_embedded.options import DatabaseOptions
+
+
+class CountingEmbeddedServer(EmbeddedServer):
+    def __init__(self):
+        super().__init__()
+        self.initialized = []
+        self._initialized_lock = threading.Lock()
+
+    def _initialize_document_store(self, database_name, options, create_database=True):
+        with self._initialized_lock:
+            self.initialized.append(database_name)
+        time.sleep(0.05)
+        return object()
+
+
+class TestLazy(TestCase):
+    def test_value_is_created_once_under_contention(self):
+        calls = []
+        barrier = threading.Barrier(32)
+
+        def create():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        lazy = Lazy(create)
+
+        def get():
+            barrier.wait()
+            return lazy.get_value()
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            values = list(executor.map(lambda _: get(), range(32)))
+
+        self.assertEqual(1, len(calls))
+        self.assertTrue(all(value is values[0] for value in values))
+        self.assertTrue(lazy.created)
+
+    def test_failure_is_retried_by_default(self):
+        attempts = []
+
+        def create():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("first attempt fails")
+            return "value"
+
+        lazy = Lazy(create)
+
+        with self.assertRaises(RuntimeError):
+            lazy.get_value()
+        self.assertFalse(lazy.created)
+        self.assertEqual("value", lazy.get_value())
+        self.assertEqual(2, len(attempts))
+
+    def test_waiting_callers_share_a_failed_attempt(self):
+        attempts = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def create():
+            attempts.append(1)
+            started.set()
+            release.wait(5)
+            raise RuntimeError("broken")
+
+        lazy = Lazy(create)
+        errors = []
+
+        def get():
+            try:
+                lazy.get_value()
+            except RuntimeError as e:
+                errors.append(e)
+
+        first = threading.Thread(target=get)
+        first.start()
+        started.wait(5)
+        waiting = [threading.Thread(target=get) for _ in range(4)]
+        for thread in waiting:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in [first] + waiting:
+            thread.join(5)
+
+        self.assertEqual(1, len(attempts))
+        self.assertEqual(5, len(errors))
+
+        # a call which starts after the failed attempt retries
+        with self.assertRaises(RuntimeError):
+            lazy.get_value()
+        self.assertEqual(2, len(attempts))
+
+    def test_failure_can_be_cached(self):
+        attempts = []
+
+        def create():
+            attempts.append(1)
+            raise RuntimeError("broken")
+
+        lazy = Lazy(create, cache_failures=True)
+
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                lazy.get_value()
+        self.assertEqual(1, len(attempts))
+
+
+class TestDocumentStoreRegistry(TestCase):
+    def test_each_database_is_initialized_once_by_many_threads(self):
+        server = CountingEmbeddedServer()
+        databases = [f"db{i}" for i in range(8)]
+        requests = databases * 16
+        barrier = threading.Barrier(len(requests))
+
+        def get(database):
+            barrier.wait()
+            return database, server.get_document_store_from_options(DatabaseOptions.from_database_name(database))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            results = list(executor.map(get, requests))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(sorted(databases), sorted(server.initialized))
+        stores = {}
+        for database, store in results:
+            self.assertIs(stores.setdefault(database, store), store)
+        # different databases don't wait for each other
+        self.assertLess(elapsed, 0.05 * len(databases))
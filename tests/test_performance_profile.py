@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.performance_profile import PERFORMANCE_PROFILES, PerformanceProfile
+from ravendb_embedded.raven_server_runner import RavenServerRunner
+from tests.fake_server import FakeServer
+
+
+class TestPerformanceProfile(TestCase):
+    def test_presets(self):
+        for name in PERFORMANCE_PROFILES:
+            profile = PerformanceProfile.from_name(name)
+            self.assertEqual(name, profile.name)
+            self.assertTrue(all(key.startswith("DOTNET_") for key in profile.environment))
+
+        self.assertEqual("20000000", PerformanceProfile.low_memory().environment["DOTNET_GCHeapHardLimit"])
+        self.assertEqual("10", PerformanceProfile.throughput(16).environment["DOTNET_ThreadPool_ForceMinWorkerThreads"])
+
+    def test_unknown_profile_is_rejected(self):
+        options = ServerOptions().with_performance_profile("turbo")
+
+        with self.assertRaises(ValueError):
+            RavenServerRunner.validate_options(options)
+
+    def test_environment_overrides(self):
+        options = ServerOptions()
+        self.assertIsNone(RavenServerRunner.build_environment(options))
+
+        os.environ["RAVENDB_EMBEDDED_TEST_INHERITED"] = "1"
+        try:
+            options.with_performance_profile("throughput")
+            options.environment_variables = {"DOTNET_gcServer": "0", "RAVENDB_EMBEDDED_TEST_INHERITED": None}
+            environment = RavenServerRunner.build_environment(options)
+        finally:
+            del os.environ["RAVENDB_EMBEDDED_TEST_INHERITED"]
+
+        self.assertEqual("0", environment["DOTNET_gcServer"])
+        self.assertEqual("1", environment["DOTNET_gcConcurrent"])
+        self.assertNotIn("RAVENDB_EMBEDDED_TEST_INHERITED", environment)
+        self.assertEqual(os.environ.get("PATH"), environment.get("PATH"))
+
+    def test_configuration_keys_can_be_overridden(self):
+        options = ServerOptions().with_performance_profile("low_memory")
+
+        args = RavenServerRunner.build_command_line(options, "Raven.Server.dll", None, None)
+        self.assertIn("--Indexing.MaxNumberOfConcurrentlyRunningIndexes=1", args)
+
+        options.command_line_args = ["--Indexing.MaxNumberOfConcurrentlyRunningIndexes=4"]
+        args = RavenServerRunner.build_command_line(options, "Raven.Server.dll", None, None)
+        self.assertIn("--Indexing.MaxNumberOfConcurrentlyRunningIndexes=4", args)
+        self.assertNotIn("--Indexing.MaxNumberOfConcurrentlyRunningIndexes=1", args)
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestPerformanceProfileEnvironment(TestCase):
+    def test_server_process_gets_the_environment(self):
+        lines = []
+        with tempfile.TemporaryDirectory() as temp_dir, EmbeddedServer() as embedded:
+            server_options = FakeServer.configure(temp_dir).with_performance_profile("low_memory")
+            server_options.graceful_shutdown_timeout = server_options.graceful_shutdown_timeout / 100
+            server_options.environment_variables["DOTNET_GCConserveMemory"] = "3"
+            server_options.command_line_args = ["--Fake.PrintEnv=DOTNET_gcServer,DOTNET_GCConserveMemory"]
+            server_options.server_output_callback = lambda stream, line: lines.append(line)
+
+            embedded.start_server(server_options)
+
+        self.assertIn("env DOTNET_gcServer=0", lines)
+        self.assertIn("env DOTNET_GCConserveMemory=3", lines)
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+import uuid
+import zipfile
+from pathlib import Path
+from unittest import TestCase
+
+from ravendb_embedded.provide import ExtractFromPkgResourceServerProvider
+
+
+class TestExtractFromPkgResourceServerProvider(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.package = f"fake_server_package_{uuid.uuid4().hex}"
+        self.package_directory = os.path.join(self._temp_dir.name, self.package)
+        os.makedirs(self.package_directory)
+        Path(self.package_directory, "__init__.py").touch()
+        sys.path.insert(0, self._temp_dir.name)
+
+    def tearDown(self):
+        sys.path.remove(self._temp_dir.name)
+        sys.modules.pop(self.package, None)
+        self._temp_dir.cleanup()
+
+    def write_resource(self, size: int = 0) -> None:
+        archive = os.path.join(self.package_directory, ExtractFromPkgResourceServerProvider.RESOURCE_NAME)
+        with zipfile.ZipFile(archive, "w") as zipped:
+            zipped.writestr("Raven.Server.dll", b"server")
+            if size:
+                # incompressible payload, so the archive is as large as the data
+                zipped.writestr("runtimes/payload.bin", os.urandom(size))
+
+    def test_extracts_resource(self):
+        self.write_resource()
+        target = os.path.join(self._temp_dir.name, "target")
+
+        ExtractFromPkgResourceServerProvider(self.package).provide(target)
+
+        self.assertEqual(b"server", Path(target, "Raven.Server.dll").read_bytes())
+
+    def test_missing_resource(self):
+        with self.assertRaises(RuntimeError):
+            ExtractFromPkgResourceServerProvider(self.package).provide(os.path.join(self._temp_dir.name, "target"))
+
+    def test_archive_is_not_loaded_into_memory(self):
+        archive_size = 16 * 1024 * 1024
+        self.write_resource(archive_size)
+        provider = ExtractFromPkgResourceServerProvider(self.package)
+
+        tracemalloc.start()
+        try:
+            provider.provide(os.path.join(self._temp_dir.name, "target"))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(
+            archive_size, os.path.getsize(os.path.join(self._temp_dir.name, "target", "runtimes", "payload.bin"))
+        )
+        self.assertLess(peak, archive_size // 8)
@@ -0,0 +1,79 @@
+import tempfile
+import time
+from threading import Event
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.preflight import PreflightPipeline, PreflightStepError
+from ravendb_embedded.provide import ProvideRavenDBServer
+
+
+class FailingProvider(ProvideRavenDBServer):
+    def provide(self, target_directory: str) -> None:
+        raise OSError("disk full")
+
+
+class TestPreflightPipeline(TestCase):
+    def test_independent_steps_run_concurrently(self):
+        pipeline = PreflightPipeline()
+        pipeline.add_step("first", lambda: time.sleep(0.3) or 1)
+        pipeline.add_step("second", lambda: time.sleep(0.3) or 2)
+
+        start = time.perf_counter()
+        results = pipeline.run()
+
+        self.assertLess(time.perf_counter() - start, 0.55)
+        self.assertEqual({"first": 1, "second": 2}, results)
+
+    def test_step_starts_after_its_dependencies(self):
+        finished = []
+        pipeline = PreflightPipeline()
+        pipeline.add_step("clear", lambda: time.sleep(0.1) or finished.append("clear"))
+        pipeline.add_step("provide", lambda: finished.append("provide"), depends_on=["clear"])
+
+        pipeline.run()
+
+        self.assertEqual(["clear", "provide"], finished)
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            PreflightPipeline().add_step("provide", lambda: None, depends_on=["clear"])
+
+    def test_fails_fast_and_names_the_step(self):
+        slow_finished = Event()
+
+        def slow():
+            time.sleep(0.5)
+            slow_finished.set()
+
+        def fail():
+            raise ValueError("broken certificate")
+
+        pipeline = PreflightPipeline()
+        pipeline.add_step("slow", slow)
+        pipeline.add_step("certificate_thumbprint", fail)
+        pipeline.add_step("after_slow", lambda: self.fail("must not run"), depends_on=["slow"])
+
+        start = time.perf_counter()
+        with self.assertRaises(PreflightStepError) as context:
+            pipeline.run()
+
+        self.assertLess(time.perf_counter() - start, 5)
+        # the running step finished before the error was raised
+        self.assertTrue(slow_finished.is_set())
+        self.assertEqual("certificate_thumbprint", context.exception.step_name)
+        self.assertIn("broken certificate", str(context.exception))
+
+    def test_start_server_reports_failed_step(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            options = ServerOptions()
+            options.target_server_location = temp_dir
+            options.framework_version = None
+            options.provider = FailingProvider()
+
+            with self.assertRaises(PreflightStepError) as context:
+                EmbeddedServer().start_server(options)
+
+            self.assertEqual("provide", context.exception.step_name)
+            self.assertIn("Failed to spawn server files. disk full", str(context.exception))
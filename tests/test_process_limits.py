@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.process_limits import ProcessLimits
+from ravendb_embedded.raven_server_runner import RavenServerRunner
+from tests.fake_server import FakeServer
+
+IS_LINUX = sys.platform.startswith("linux")
+
+
+class TestProcessLimits(TestCase):
+    def test_not_set(self):
+        self.assertIsNone(ProcessLimits.from_options(ServerOptions()))
+
+    @unittest.skipUnless(IS_LINUX, "Linux only")
+    def test_invalid_values_are_rejected(self):
+        for kwargs in ({"cpu_affinity": []}, {"nice": 20}, {"io_priority": 8}, {"memory_limit_mb": 0}):
+            with self.assertRaises(ValueError, msg=kwargs):
+                RavenServerRunner.validate_options(ServerOptions().with_process_limits(**kwargs))
+
+    def test_runtime_is_sized_to_the_limits(self):
+        options = (
+            ServerOptions()
+            .with_performance_profile("low_memory")
+            .with_process_limits(cpu_affinity=[0, 1], memory_limit_mb=1024)
+        )
+
+        environment = RavenServerRunner.build_environment(options)
+
+        self.assertEqual("2", environment["DOTNET_PROCESSOR_COUNT"])
+        # the memory limit takes precedence over the profile's heap limit
+        self.assertEqual(format(768 * 1024 * 1024, "x"), environment["DOTNET_GCHeapHardLimit"])
+
+
+@unittest.skipUnless(IS_LINUX, "Linux only")
+class TestProcessLimitsOfServer(TestCase):
+    def test_limits_are_applied_to_the_server_process(self):
+        cpu = min(os.sched_getaffinity(0))
+        nice = min(19, os.getpriority(os.PRIO_PROCESS, 0) + 5)
+        lines = []
+        with tempfile.TemporaryDirectory() as temp_dir, EmbeddedServer() as embedded:
+            server_options = FakeServer.configure(temp_dir).with_process_limits(
+                cpu_affinity=[cpu], nice=nice, io_priority=7, memory_limit_mb=2048
+            )
+            server_options.graceful_shutdown_timeout = server_options.graceful_shutdown_timeout / 100
+            server_options.command_line_args = ["--Fake.PrintLimits=true", "--Fake.PrintEnv=DOTNET_PROCESSOR_COUNT"]
+            server_options.server_output_callback = lambda stream, line: lines.append(line)
+
+            embedded.start_server(server_options)
+            cgroup_path = embedded._process_limits.cgroup_path
+
+        self.assertIn(f"limits affinity={[cpu]}", lines)
+        self.assertIn(f"limits nice={nice}", lines)
+        self.assertIn("env DOTNET_PROCESSOR_COUNT=1", lines)
+        if cgroup_path is None:
+            self.assertIn(f"limits address_space={2048 * 1024 * 1024}", lines)
+        else:
+            self.assertTrue(any(line.endswith("/" + os.path.basename(cgroup_path)) for line in lines))
+            self.assertFalse(os.path.exists(cgroup_path))
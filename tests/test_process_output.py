@@ -0,0 +1,74 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+from threading import Event
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.process_output import ProcessOutputDrainer
+from tests.fake_server import FakeServer
+
+
+class TestProcessOutputDrainer(TestCase):
+    def test_keeps_only_the_last_lines_of_each_stream(self):
+        script = "import sys\nfor i in range(500):\n    print(i)\n    print(-i, file=sys.stderr)"
+        process = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        received = []
+        ended = []
+        drainer = ProcessOutputDrainer(process, max_lines=10, on_line=lambda stream, line: received.append(line))
+        drainer.add_listener(lambda stream, line: ended.append(stream) if line is None else None)
+        drainer.start()
+
+        process.wait()
+        drainer.join()
+
+        self.assertTrue(drainer.finished)
+        self.assertEqual([str(i) for i in range(490, 500)], drainer.stdout_lines)
+        self.assertEqual([str(-i) for i in range(490, 500)], drainer.stderr_lines)
+        self.assertEqual(1000, len(received))
+        self.assertCountEqual([ProcessOutputDrainer.STDOUT, ProcessOutputDrainer.STDERR], ended)
+
+    def test_failing_callback_does_not_stop_draining(self):
+        def callback(stream, line):
+            raise ValueError(line)
+
+        process = subprocess.Popen(
+            [sys.executable, "-c", "for i in range(100): print(i)"], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        drainer = ProcessOutputDrainer(process, max_lines=5, on_line=callback).start()
+
+        process.wait()
+        drainer.join()
+
+        self.assertEqual(["95", "96", "97", "98", "99"], drainer.stdout_lines)
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestServerOutputDraining(TestCase):
+    def test_chatty_server_keeps_running_after_startup(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            server_options = FakeServer.configure(temp_dir)
+            # far more than an OS pipe buffer holds on both streams
+            server_options.command_line_args = ["--Fake.ChattyLines=50000"]
+            server_options.server_output_buffer_size = 100
+            server_options.graceful_shutdown_timeout = timedelta(seconds=10)
+
+            last_line_seen = Event()
+            server_options.server_output_callback = lambda stream, line: (
+                last_line_seen.set() if line == "stderr line 49999" else None
+            )
+
+            embedded = EmbeddedServer()
+            embedded.start_server(server_options)
+
+            self.assertTrue(last_line_seen.wait(10))
+            process = embedded.server_task.get_value()[1]
+
+            embedded.close()
+
+            self.assertEqual(0, process.returncode)
+            self.assertEqual("stdout line 49999", embedded.server_output.stdout_lines[-1])
+            self.assertEqual(100, len(embedded.server_output.stderr_lines))
@@ -0,0 +1,117 @@
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import TestCase
+
+import requests
+from ravendb.documents.commands.crud import GetDocumentsCommand
+from ravendb.documents.conventions import DocumentConventions
+from ravendb.documents.session.event_args import (
+    BeforeRequestEventArgs,
+    FailedRequestEventArgs,
+    SucceedRequestEventArgs,
+)
+from ravendb.http.request_executor import RequestExecutor
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.request_metrics import LatencyHistogram, RequestMetrics
+from tests.fake_server import FakeServer
+
+URL = "http://127.0.0.1:8080/databases/Orders/docs?id=orders/1"
+
+
+def response(request_time: str = None) -> requests.Response:
+    result = requests.Response()
+    result.status_code = 200
+    if request_time is not None:
+        result.headers["Request-Time"] = request_time
+    return result
+
+
+class TestLatencyHistogram(TestCase):
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = LatencyHistogram()
+        for milliseconds in [0.1] * 90 + [40] * 9 + [30000]:
+            histogram.record(milliseconds)
+
+        self.assertEqual(100, histogram.count)
+        self.assertEqual(0.25, histogram.percentile(0.5))
+        self.assertEqual(50, histogram.percentile(0.99))
+        self.assertEqual(30000, histogram.percentile(1))
+        self.assertEqual(1, histogram.snapshot()["buckets"]["+Inf"])
+
+
+class TestRequestMetrics(TestCase):
+    def test_command_names(self):
+        self.assertEqual("GET docs", RequestMetrics.command_name("get", URL))
+        self.assertEqual(
+            "PUT admin/databases", RequestMetrics.command_name("PUT", "http://host/admin/databases?name=a")
+        )
+
+    def test_records_latency_server_time_and_errors(self):
+        metrics = RequestMetrics()
+
+        request = requests.Request("GET", URL)
+        metrics._on_before_request(BeforeRequestEventArgs("Orders", URL, request, 1))
+        metrics._on_succeed_request(SucceedRequestEventArgs("Orders", URL, response("3"), request, 1))
+
+        failed = requests.Request("GET", URL)
+        metrics._on_before_request(BeforeRequestEventArgs("Orders", URL, failed, 1))
+        metrics._on_failed_request(FailedRequestEventArgs("Orders", URL, ConnectionError(), failed, None))
+
+        stats = metrics.snapshot()["Orders"]["GET docs"]
+        self.assertEqual(2, stats["requests"])
+        self.assertEqual(1, stats["errors"])
+        self.assertEqual(0.5, stats["error_rate"])
+        self.assertEqual(1, stats["client"]["count"])
+        self.assertEqual(3, stats["server"]["mean_ms"])
+
+    def test_unmatched_completion_is_ignored(self):
+        metrics = RequestMetrics()
+        request = requests.Request("GET", URL)
+        metrics._on_before_request(BeforeRequestEventArgs("Orders", URL, request, 1))
+
+        other_thread = threading.Thread(
+            target=metrics._on_succeed_request,
+            args=(SucceedRequestEventArgs("Orders", URL, response(), request, 1),),
+        )
+        other_thread.start()
+        other_thread.join()
+        metrics._on_succeed_request(SucceedRequestEventArgs("Orders", URL, response(), requests.Request(), 1))
+
+        self.assertEqual({}, metrics.snapshot())
+
+    def test_embedded_server_stats(self):
+        stats = EmbeddedServer().stats()
+
+        self.assertEqual({}, stats["requests"])
+        self.assertEqual(0, stats["idle"]["suspend_count"])
+        self.assertIsNone(stats["resources"])
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestRequestMetricsWithServer(TestCase):
+    def test_counts_failed_requests(self):
+        with tempfile.TemporaryDirectory() as temp_dir, EmbeddedServer() as embedded:
+            server_options = FakeServer.configure(temp_dir)
+            server_options.command_line_args += ["--Fake.Listen=true", "--Fake.Http=true"]
+            embedded.start_server(server_options)
+
+            metrics = RequestMetrics()
+            request_executor = RequestExecutor.create_for_single_node_without_configuration_updates(
+                embedded.get_server_uri(), "Failing", DocumentConventions()
+            )
+            metrics.attach(request_executor)
+            try:
+                for _ in range(2):
+                    with self.assertRaises(Exception):
+                        request_executor.execute_command(GetDocumentsCommand.from_single_id("orders/1"))
+            finally:
+                request_executor.close()
+
+            stats = metrics.snapshot()["Failing"]["GET docs"]
+            self.assertEqual(2, stats["requests"])
+            self.assertEqual(2, stats["errors"])
+            self.assertEqual(0, stats["client"]["count"])
+            self.assertEqual({}, metrics._pending)
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.resource_sampler import ResourceHistory, ResourceSample, ResourceSampler, read_process_sample
+from tests.fake_server import FakeServer
+
+HAS_PROC = os.path.isdir("/proc/self")
+
+
+def sample(index: int) -> ResourceSample:
+    return ResourceSample(index, index * 1024, index / 10, index, index, index, index)
+
+
+class TestResourceHistory(TestCase):
+    def test_keeps_the_newest_samples_in_order(self):
+        history = ResourceHistory(3)
+        self.assertIsNone(history.latest())
+
+        for i in range(5):
+            history.append(sample(i))
+
+        self.assertEqual(3, len(history))
+        self.assertEqual([2, 3, 4], [s.threads for s in history.samples()])
+        self.assertEqual(4 * 1024, history.latest().rss_bytes)
+
+
+@unittest.skipUnless(HAS_PROC, "requires /proc")
+class TestResourceSampler(TestCase):
+    def test_reads_own_process(self):
+        current = read_process_sample(os.getpid())
+
+        self.assertGreater(current.rss_bytes, 0)
+        self.assertGreaterEqual(current.threads, 1)
+        self.assertGreater(current.open_fds, 0)
+
+    def test_prometheus_text(self):
+        sampler = ResourceSampler(os.getpid, timedelta(seconds=1))
+        self.assertEqual("", sampler.to_prometheus())
+
+        sampler.sample()
+        text = sampler.to_prometheus(labels={"instance": 'a"b'})
+
+        self.assertIn("# TYPE ravendb_embedded_server_resident_memory_bytes gauge", text)
+        self.assertIn("# TYPE ravendb_embedded_server_cpu_seconds_total counter", text)
+        self.assertIn(f'ravendb_embedded_server_threads{{instance="a\\"b",pid="{os.getpid()}"}} ', text)
+
+    def test_gone_process_is_skipped(self):
+        sampler = ResourceSampler(lambda: None, timedelta(seconds=1))
+
+        self.assertIsNone(sampler.sample())
+        self.assertEqual(0, len(sampler.history))
+
+
+@unittest.skipIf(sys.platform == "win32" or not HAS_PROC, "fake server requires a POSIX shebang and /proc")
+class TestEmbeddedServerResourceSampler(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+        self.server_options.graceful_shutdown_timeout = self.server_options.graceful_shutdown_timeout / 100
+        self.server_options.resource_sampling_interval = timedelta(milliseconds=20)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_samples_the_server_process(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            deadline = time.monotonic() + 5
+            while len(embedded.resource_sampler.history) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertGreaterEqual(len(embedded.resource_sampler.history), 2)
+            self.assertEqual(embedded.server_task.get_value()[1].pid, embedded.resource_sampler.pid)
+
+        sampled = len(embedded.resource_sampler.history)
+        time.sleep(0.1)
+        self.assertLessEqual(len(embedded.resource_sampler.history), sampled + 1)
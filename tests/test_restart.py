@@ -0,0 +1,110 @@
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.exceptions import ServerStartupError
+from tests.fake_server import FakeServer
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestRestart(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+        self.server_options.command_line_args.append("--Fake.Listen=true")
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_restart_keeps_the_url(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            url, process = embedded.server_task.get_value()
+            self.assertFalse(url.endswith(":0"))
+
+            embedded.restart()
+            restarted_url, restarted_process = embedded.server_task.get_value()
+
+            self.assertEqual(url, restarted_url)
+            self.assertEqual(0, process.returncode)
+            self.assertIsNone(restarted_process.poll())
+            self.assertIn(f"--ServerUrl={url}", restarted_process.args)
+
+            embedded.restart()
+            self.assertEqual(url, embedded.get_server_uri())
+
+    def test_requests_wait_while_restarting(self):
+        self.server_options.command_line_args.append("--Fake.StartupDelay=0.3")
+
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+
+            restart = threading.Thread(target=embedded.restart)
+            restart.start()
+            while embedded._available.is_set() and restart.is_alive():
+                time.sleep(0.001)
+
+            embedded._before_request()
+
+            self.assertIsNone(embedded.server_task.get_value()[1].poll())
+            restart.join()
+
+    def test_failed_restart_says_the_server_is_stopped(self):
+        crash_marker = Path(self._temp_dir.name, "crash")
+        self.server_options.command_line_args.append(f"--Fake.CrashIfExists={crash_marker}")
+
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            url = embedded.get_server_uri()
+
+            crash_marker.touch()
+            with self.assertRaises(ServerStartupError) as context:
+                embedded.restart()
+            self.assertIn("stays stopped until restart() succeeds", str(context.exception))
+            self.assertEqual(134, context.exception.exit_code)
+
+            crash_marker.unlink()
+            embedded.restart()
+            self.assertEqual(url, embedded.get_server_uri())
+            self.assertIsNone(embedded.server_task.get_value()[1].poll())
+
+    def test_one_exit_handler_shuts_down_the_current_process(self):
+        with patch("ravendb_embedded.embedded_server.atexit.register") as register, EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            embedded.restart()
+            embedded.restart()
+
+            register.assert_called_once()
+            register.call_args[0][0]()
+            self.assertIsNotNone(embedded.server_task.get_value()[1].poll())
+
+    def test_rejected_second_start_keeps_the_running_server(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            url = embedded.get_server_uri()
+
+            other_options = FakeServer.configure(str(Path(self._temp_dir.name, "other")))
+            with self.assertRaises(RuntimeError):
+                embedded.start_server(other_options)
+
+            embedded.restart()
+            self.assertEqual(url, embedded.get_server_uri())
+            self.assertIs(self.server_options, embedded._server_options)
+
+    def test_restart_requires_started_server(self):
+        with self.assertRaises(RuntimeError):
+            EmbeddedServer().restart()
+
+    def test_daemon_server_cant_be_restarted(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options.with_daemon_mode(timedelta(0)))
+
+            with self.assertRaises(RuntimeError):
+                embedded.restart()
@@ -1,5 +1,13 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
 from unittest import TestCase
+from unittest.mock import patch
 
+from ravendb_embedded.file_utils import CACHE_DIRECTORY_ENVIRONMENT_VARIABLE
 from ravendb_embedded.options import ServerOptions
 from ravendb_embedded.runtime_framework_version_matcher import (
     RuntimeFrameworkVersionMatcher,
@@ -112,6 +120,46 @@ class TestRuntimeFrameworkVersionMatcher(TestCase):
             str(context.exception),
         )
 
+    @unittest.skipIf(sys.platform == "win32", "fake dotnet executable requires POSIX permissions")
+    def test_discovers_runtimes_without_spawning_dotnet(self):
+        with tempfile.TemporaryDirectory() as temp_dir, patch.dict(
+            os.environ, {CACHE_DIRECTORY_ENVIRONMENT_VARIABLE: os.path.join(temp_dir, "cache")}
+        ):
+            RuntimeFrameworkVersionMatcher.clear_cache()
+            dotnet_root = os.path.join(temp_dir, "dotnet")
+            shared = os.path.join(dotnet_root, "shared", "Microsoft.NETCore.App")
+
+            def install_runtime(version: str) -> None:
+                os.makedirs(os.path.join(shared, version))
+                Path(shared, version, "Microsoft.NETCore.App.deps.json").touch()
+
+            install_runtime("7.0.15")
+            install_runtime("8.0.1")
+            os.makedirs(os.path.join(shared, "7.0.99"))  # leftover without runtime files
+
+            dotnet = os.path.join(dotnet_root, "dotnet")
+            Path(dotnet).touch()
+            os.chmod(dotnet, os.stat(dotnet).st_mode | stat.S_IEXEC)
+
+            options = ServerOptions()
+            options.dot_net_path = dotnet
+            options.framework_version = "7.0.x"
+
+            with patch("subprocess.Popen", side_effect=AssertionError("dotnet --info must not be spawned")):
+                self.assertEqual("7.0.15", RuntimeFrameworkVersionMatcher.match(options))
+
+                install_runtime("7.0.20")
+                os.utime(shared, ns=(os.stat(shared).st_mtime_ns + 10**9,) * 2)
+                self.assertEqual("7.0.20", RuntimeFrameworkVersionMatcher.match(options))
+
+                # a fresh process reads the result from the on-disk cache
+                RuntimeFrameworkVersionMatcher.clear_cache()
+                with patch.object(RuntimeFrameworkVersionMatcher, "scan_shared_runtimes") as scan:
+                    self.assertEqual("7.0.20", RuntimeFrameworkVersionMatcher.match(options))
+                    scan.assert_not_called()
+
+            RuntimeFrameworkVersionMatcher.clear_cache()
+
     def get_runtimes(self):
         result = [
             RuntimeFrameworkVersion("2.1.3"),
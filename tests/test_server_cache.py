@@ -0,0 +1,123 @@
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from threading import Thread
+from unittest import TestCase
+
+from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.provide import CachedServerProvider, CopyServerProvider, ExtractFromZipServerProvider
+
+
+class CountingCopyServerProvider(CopyServerProvider):
+    def __init__(self, server_files: str):
+        super().__init__(server_files)
+        self.provide_count = 0
+
+    def provide(self, target_directory: str) -> None:
+        self.provide_count += 1
+        super().provide(target_directory)
+
+
+class TestServerCache(TestCase):
+    @staticmethod
+    def create_server_files(directory: str) -> str:
+        server_files = os.path.join(directory, "ServerFiles")
+        os.makedirs(os.path.join(server_files, "runtimes", "linux-x64"))
+        Path(server_files, "Raven.Server.dll").write_bytes(b"server")
+        Path(server_files, "runtimes", "linux-x64", "librvnpal.so").write_bytes(b"pal")
+        return server_files
+
+    def test_extracts_once_and_materializes_every_target(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            inner = CountingCopyServerProvider(self.create_server_files(temp_dir))
+            provider = CachedServerProvider(inner, os.path.join(temp_dir, "cache"))
+
+            for name in ("first", "second", "third"):
+                target = os.path.join(temp_dir, name)
+                provider.provide(target)
+
+                self.assertEqual(b"server", Path(target, "Raven.Server.dll").read_bytes())
+                self.assertEqual(b"pal", Path(target, "runtimes", "linux-x64", "librvnpal.so").read_bytes())
+
+            self.assertEqual(1, inner.provide_count)
+
+            # a fresh provider (e.g. another process) finds the entry through the fingerprint
+            inner = CountingCopyServerProvider(inner.server_files)
+            CachedServerProvider(inner, os.path.join(temp_dir, "cache")).provide(os.path.join(temp_dir, "fourth"))
+            self.assertEqual(0, inner.provide_count)
+
+    def test_changed_source_gets_new_entry(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            server_files = self.create_server_files(temp_dir)
+            provider = CachedServerProvider(CopyServerProvider(server_files), os.path.join(temp_dir, "cache"))
+            provider.provide(os.path.join(temp_dir, "first"))
+
+            Path(server_files, "Raven.Server.dll").write_bytes(b"upgraded server")
+            provider.provide(os.path.join(temp_dir, "second"))
+
+            self.assertEqual(b"server", Path(temp_dir, "first", "Raven.Server.dll").read_bytes())
+            self.assertEqual(b"upgraded server", Path(temp_dir, "second", "Raven.Server.dll").read_bytes())
+
+    def test_uses_hardlinks_when_allowed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_directory = os.path.join(temp_dir, "cache")
+            provider = CachedServerProvider(CopyServerProvider(self.create_server_files(temp_dir)), cache_directory)
+
+            first, second = os.path.join(temp_dir, "first"), os.path.join(temp_dir, "second")
+            provider.provide(first)
+            provider.provide(second)
+
+            first_stat = os.stat(os.path.join(first, "Raven.Server.dll"))
+            second_stat = os.stat(os.path.join(second, "Raven.Server.dll"))
+            # either a hardlink or a reflink/copy, depending on the filesystem
+            if first_stat.st_ino == second_stat.st_ino:
+                self.assertGreaterEqual(first_stat.st_nlink, 3)
+
+    def test_concurrent_provide_populates_cache_once(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            inner = CountingCopyServerProvider(self.create_server_files(temp_dir))
+            errors = []
+
+            def provide(index: int) -> None:
+                try:
+                    # separate instances, like separate processes would have
+                    provider = CachedServerProvider(inner, os.path.join(temp_dir, "cache"))
+                    provider.provide(os.path.join(temp_dir, f"target-{index}"))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [Thread(target=provide, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual([], errors)
+            self.assertEqual(1, inner.provide_count)
+            for i in range(8):
+                self.assertTrue(os.path.exists(os.path.join(temp_dir, f"target-{i}", "Raven.Server.dll")))
+
+    def test_zip_source_is_addressed_by_content(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "server.zip")
+            with zipfile.ZipFile(archive, "w") as zipped:
+                zipped.writestr("Raven.Server.dll", b"server")
+
+            cache_directory = os.path.join(temp_dir, "cache")
+            provider = CachedServerProvider(ExtractFromZipServerProvider(archive), cache_directory)
+            provider.provide(os.path.join(temp_dir, "target"))
+
+            self.assertTrue(os.path.isdir(os.path.join(cache_directory, provider.get_content_key())))
+            self.assertEqual(b"server", Path(temp_dir, "target", "Raven.Server.dll").read_bytes())
+
+    def test_with_server_cache_wraps_current_provider(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            options = ServerOptions()
+            inner = CopyServerProvider(self.create_server_files(temp_dir))
+            options.provider = inner
+
+            options.with_server_cache(os.path.join(temp_dir, "cache"))
+
+            self.assertIsInstance(options.provider, CachedServerProvider)
+            self.assertIs(inner, options.provider.inner_provider)
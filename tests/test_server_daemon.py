@@ -0,0 +1,110 @@
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.server_daemon import ServerDaemon, is_process_alive
+from tests.fake_server import FakeServer
+
+
+def wait_until(condition, timeout: float = 10) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestServerDaemon(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+        FakeServer.create(self.temp_dir)
+
+    def tearDown(self):
+        discovery = ServerDaemon(self.options().data_directory, "").discovery_path
+        if os.path.exists(discovery):
+            with open(discovery) as f:
+                pid = json.load(f)["pid"]
+            if is_process_alive(pid):
+                os.kill(pid, signal.SIGTERM)
+        self._temp_dir.cleanup()
+
+    def options(self, idle_timeout: timedelta = timedelta(0)):
+        server_options = FakeServer.configure(self.temp_dir)
+        server_options.command_line_args.append("--Fake.Listen=true")
+        return server_options.with_daemon_mode(idle_timeout)
+
+    def test_second_server_attaches_and_last_one_stops_it(self):
+        first = EmbeddedServer()
+        first.start_server(self.options())
+        pid = first.daemon.pid
+        self.assertTrue(first.daemon.spawned)
+
+        second = EmbeddedServer()
+        start = time.perf_counter()
+        second.start_server(self.options())
+        attach_duration = time.perf_counter() - start
+
+        self.assertFalse(second.daemon.spawned)
+        self.assertEqual(first.get_server_uri(), second.get_server_uri())
+        self.assertEqual(pid, second.daemon.pid)
+        self.assertLess(attach_duration, 0.5)
+
+        first.close()
+        self.assertTrue(is_process_alive(pid))
+
+        second.close()
+        self.assertTrue(wait_until(lambda: not is_process_alive(pid)))
+        self.assertFalse(os.path.exists(os.path.join(self.options().data_directory, ServerDaemon.DISCOVERY_FILE_NAME)))
+
+    def test_server_survives_idle_timeout_then_stops(self):
+        first = EmbeddedServer()
+        first.start_server(self.options(timedelta(seconds=1)))
+        pid = first.daemon.pid
+        first.close()
+
+        second = EmbeddedServer()
+        second.start_server(self.options(timedelta(seconds=1)))
+        self.assertEqual(pid, second.daemon.pid)
+        time.sleep(1.5)
+        # attaching cancelled the idle shutdown of the first detach
+        self.assertTrue(is_process_alive(pid))
+        second.close()
+
+        self.assertTrue(wait_until(lambda: not is_process_alive(pid)))
+
+    def test_different_options_are_rejected(self):
+        first = EmbeddedServer()
+        first.start_server(self.options())
+        try:
+            other_options = self.options()
+            other_options.command_line_args.append("--Fake.Other=true")
+
+            with self.assertRaises(RuntimeError):
+                EmbeddedServer().start_server(other_options)
+        finally:
+            first.close()
+
+    def test_stale_discovery_file_is_replaced(self):
+        first = EmbeddedServer()
+        first.start_server(self.options())
+        pid = first.daemon.pid
+        os.kill(pid, signal.SIGKILL)
+        self.assertTrue(wait_until(lambda: not is_process_alive(pid)))
+
+        second = EmbeddedServer()
+        second.start_server(self.options())
+
+        self.assertTrue(second.daemon.spawned)
+        self.assertNotEqual(pid, second.daemon.pid)
+        second.close()
+        first.close()
@@ -0,0 +1,23 @@
+import sys
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from tests.fake_server import FakeServer
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestStartup(TestCase):
+    def test_start_server_returns_as_soon_as_server_is_available(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            server_options = FakeServer.configure(temp_dir)
+
+            with EmbeddedServer() as embedded:
+                start = time.perf_counter()
+                embedded.start_server(server_options)
+                elapsed = time.perf_counter() - start
+
+                self.assertEqual("http://127.0.0.1:8080", embedded.get_server_uri())
+                self.assertLess(elapsed, 0.9)
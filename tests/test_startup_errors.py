@@ -0,0 +1,98 @@
+import asyncio
+import sys
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from ravendb_embedded.async_embedded_server import AsyncEmbeddedServer
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.exceptions import (
+    DotNetRuntimeNotFoundError,
+    ServerCertificateError,
+    ServerDataDirectoryLockedError,
+    ServerPortInUseError,
+    ServerStartupError,
+    match_fatal_startup_message,
+)
+from tests.fake_server import FakeServer
+
+
+class TestFatalStartupMessages(TestCase):
+    def test_known_messages_are_classified(self):
+        self.assertIs(
+            ServerPortInUseError,
+            match_fatal_startup_message("System.IO.IOException: Failed to bind to address http://127.0.0.1:8080"),
+        )
+        self.assertIs(
+            ServerCertificateError,
+            match_fatal_startup_message("Unable to load the server certificate from /tmp/server.pfx"),
+        )
+        self.assertIs(
+            ServerDataDirectoryLockedError,
+            match_fatal_startup_message(
+                "The process cannot access the file because it is being used by another process"
+            ),
+        )
+        self.assertIs(
+            DotNetRuntimeNotFoundError,
+            match_fatal_startup_message("The framework 'Microsoft.NETCore.App', version '7.0.15' (x64) was not found."),
+        )
+        self.assertIsNone(match_fatal_startup_message("Server available on: http://127.0.0.1:8080"))
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestStartupErrors(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def assert_fails_fast(self, expected_type):
+        start = time.perf_counter()
+        with EmbeddedServer() as embedded:
+            with self.assertRaises(expected_type) as context:
+                embedded.start_server(self.server_options)
+        self.assertLess(time.perf_counter() - start, 5)
+        return context.exception
+
+    def test_fatal_message_fails_without_waiting_for_exit(self):
+        self.server_options.command_line_args.append("--Fake.Error=Failed to bind to address http://127.0.0.1:8080")
+
+        error = self.assert_fails_fast(ServerPortInUseError)
+
+        self.assertEqual("Failed to bind to address http://127.0.0.1:8080", error.fatal_line)
+        self.assertIsNone(error.exit_code)
+        self.assertIn("Failed to bind to address", str(error))
+
+    def test_process_exit_fails_immediately(self):
+        self.server_options.command_line_args.append("--Fake.ExitCode=3")
+
+        error = self.assert_fails_fast(ServerStartupError)
+
+        self.assertEqual(3, error.exit_code)
+        self.assertIn("Unable to start the RavenDB Server", str(error))
+
+    def test_unknown_error_keeps_output(self):
+        self.server_options.command_line_args.extend(["--Fake.Error=Something odd happened", "--Fake.ExitCode=1"])
+
+        error = self.assert_fails_fast(ServerStartupError)
+
+        self.assertIs(ServerStartupError, type(error))
+        self.assertIn("Something odd happened", error.error_output)
+        self.assertIsInstance(error, RuntimeError)
+
+    def test_async_server_detects_fatal_message(self):
+        self.server_options.command_line_args.append(
+            "--Fake.Error=It was not possible to find any compatible framework version"
+        )
+
+        async def scenario():
+            with self.assertRaises(DotNetRuntimeNotFoundError):
+                await AsyncEmbeddedServer().start_server(self.server_options)
+
+        start = time.perf_counter()
+        asyncio.run(scenario())
+        self.assertLess(time.perf_counter() - start, 5)
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.startup_report import StartupReport
+from tests.fake_server import FakeServer
+
+
+class TestStartupReport(TestCase):
+    def test_phase_records_details_and_errors(self):
+        seen = []
+        report = StartupReport([seen.append, lambda phase: 1 / 0])
+
+        with report.phase("first", step=1) as details:
+            details["result"] = "ok"
+        with self.assertRaises(ValueError):
+            with report.phase("second"):
+                raise ValueError("boom")
+
+        self.assertEqual(["first", "second"], [phase.name for phase in seen])
+        self.assertEqual({"step": 1, "result": "ok"}, report.get("first").details)
+        self.assertIn("boom", report.get("second").details["error"])
+        self.assertIsNone(report.get("missing"))
+
+    def test_keeps_the_last_phases(self):
+        report = StartupReport(max_phases=3)
+        for i in range(5):
+            report.add(f"phase {i}", report.origin)
+
+        self.assertEqual(["phase 2", "phase 3", "phase 4"], [phase.name for phase in report.phases])
+
+    def test_chrome_trace(self):
+        report = StartupReport()
+        report.add("spawn", report.origin, report.origin + 0.25, pid=42)
+
+        events = report.to_chrome_trace()["traceEvents"]
+
+        self.assertEqual(1, len(events))
+        self.assertEqual("X", events[0]["ph"])
+        self.assertEqual(250_000, events[0]["dur"])
+        self.assertEqual({"pid": "42"}, events[0]["args"])
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestEmbeddedServerStartupReport(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+        self.server_options.graceful_shutdown_timeout = self.server_options.graceful_shutdown_timeout / 100
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_startup_and_shutdown_phases_are_recorded(self):
+        seen = []
+        self.server_options.phase_hooks.append(lambda phase: seen.append(phase.name))
+        self.server_options.trace_file = os.path.join(self._temp_dir.name, "trace", "startup.json")
+
+        embedded = EmbeddedServer()
+        embedded.start_server(self.server_options)
+        report = embedded.startup_report
+        embedded.close()
+
+        for name in ("provide", "spawn", "first_output_line", "start_server"):
+            self.assertIsNotNone(report.get(name), name)
+        self.assertEqual("http://127.0.0.1:8080", report.get("online").details["url"])
+        self.assertLessEqual(report.get("first_output_line").end, report.get("online").end)
+        self.assertIn(report.get("shutdown").details["mode"], ("graceful", "forced"))
+        self.assertEqual(seen, [phase.name for phase in report.phases])
+
+        with open(self.server_options.trace_file) as f:
+            trace = json.load(f)
+        self.assertIn("shutdown", [event["name"] for event in trace["traceEvents"]])
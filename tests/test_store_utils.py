@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+from ravendb_embedded.store_utils import create_document_store, is_database_exists_error
+
+
+class TestStoreUtils(TestCase):
+    def test_database_exists_errors(self):
+        self.assertTrue(is_database_exists_error(RuntimeError("Database 'Test' already exists!")))
+        self.assertTrue(is_database_exists_error(RuntimeError("ConcurrencyException: conflict")))
+        self.assertFalse(is_database_exists_error(RuntimeError("Connection refused")))
+        # exceptions without a message, or with a non-string one
+        self.assertFalse(is_database_exists_error(RuntimeError()))
+        self.assertFalse(is_database_exists_error(OSError(111, "Connection refused")))
+
+    def test_create_document_store(self):
+        store = create_document_store("http://127.0.0.1:8080", "Test", None, "trust.pem")
+        self.assertEqual(["http://127.0.0.1:8080"], store.urls)
+        self.assertEqual("Test", store.database)
+        self.assertEqual("trust.pem", store.trust_store_path)
+        self.assertIsNone(store.certificate_pem_path)
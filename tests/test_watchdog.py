@@ -0,0 +1,185 @@
+import datetime
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import warnings
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from unittest import TestCase
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import pkcs12
+from cryptography.x509.oid import NameOID
+
+from ravendb_embedded.embedded_server import EmbeddedServer
+from ravendb_embedded.options import ServerOptions
+from ravendb_embedded.watchdog import ServerWatchdog, WatchdogEvent, WatchdogOptions
+from tests.fake_server import FakeServer
+
+
+@unittest.skipIf(sys.platform == "win32", "fake server requires a POSIX shebang")
+class TestWatchdog(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.crash_marker = Path(self._temp_dir.name, "crash")
+        self.hang_marker = Path(self._temp_dir.name, "hang")
+        self.server_options = FakeServer.configure(self._temp_dir.name)
+        self.server_options.graceful_shutdown_timeout = timedelta(milliseconds=200)
+        self.server_options.command_line_args += [
+            "--Fake.Listen=true",
+            "--Fake.Http=true",
+            f"--Fake.CrashIfExists={self.crash_marker}",
+            f"--Fake.HangIfExists={self.hang_marker}",
+        ]
+
+        self.events = []
+        watchdog_options = WatchdogOptions()
+        watchdog_options.check_interval = timedelta(milliseconds=20)
+        watchdog_options.health_check_timeout = timedelta(milliseconds=200)
+        watchdog_options.initial_backoff = timedelta(milliseconds=10)
+        watchdog_options.max_restarts = 3
+        watchdog_options.listeners.append(lambda event: self.events.append(event.kind))
+        self.server_options.with_watchdog(watchdog_options)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def wait_for(self, kind: str, timeout: float = 10) -> None:
+        deadline = time.monotonic() + timeout
+        while kind not in self.events and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn(kind, self.events)
+
+    def test_killed_server_is_restarted_on_the_same_url(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            url, process = embedded.server_task.get_value()
+
+            process.kill()
+            self.wait_for(WatchdogEvent.RESTARTED)
+
+            restarted_url, restarted_process = embedded.server_task.get_value()
+            self.assertEqual(url, restarted_url)
+            self.assertIsNone(restarted_process.poll())
+            self.assertEqual(
+                [WatchdogEvent.PROCESS_EXITED, WatchdogEvent.RESTARTING, WatchdogEvent.RESTARTED], self.events
+            )
+
+    def test_hung_server_is_restarted(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            process = embedded.server_task.get_value()[1]
+
+            self.hang_marker.touch()
+            self.wait_for(WatchdogEvent.UNHEALTHY)
+            os.remove(self.hang_marker)
+            self.wait_for(WatchdogEvent.RESTARTED)
+
+            self.assertIsNotNone(process.poll())
+            self.assertNotIn(WatchdogEvent.PROCESS_EXITED, self.events)
+
+    def test_hung_server_which_ignores_shutdown_is_killed(self):
+        self.server_options.command_line_args.append("--Fake.HangIgnoresShutdown=true")
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+            process = embedded.server_task.get_value()[1]
+
+            self.hang_marker.touch()
+            self.wait_for(WatchdogEvent.UNHEALTHY)
+            os.remove(self.hang_marker)
+            self.wait_for(WatchdogEvent.RESTARTED)
+
+            self.assertEqual(-9, process.poll())
+
+    def test_gives_up_on_crash_loop(self):
+        with EmbeddedServer() as embedded:
+            embedded.start_server(self.server_options)
+
+            self.crash_marker.touch()
+            embedded.server_task.get_value()[1].kill()
+            self.wait_for(WatchdogEvent.GAVE_UP)
+
+            self.assertTrue(embedded.watchdog.gave_up)
+            self.assertEqual(3, self.events.count(WatchdogEvent.RESTART_FAILED))
+            self.assertNotIn(WatchdogEvent.RESTARTED, self.events)
+
+
+def write_self_signed_certificate(directory: str, name: str) -> str:
+    # writes <name>.pem (certificate and key, for the https server) and <name>.pfx, returns the pfx path
+    key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    with open(os.path.join(directory, f"{name}.pem"), "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+            )
+        )
+    pfx_path = os.path.join(directory, f"{name}.pfx")
+    with open(pfx_path, "wb") as f:
+        f.write(pkcs12.serialize_key_and_certificates(None, key, certificate, None, serialization.NoEncryption()))
+    return pfx_path
+
+
+class AliveHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestWatchdogHealthCheckOverTls(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.server_pfx = write_self_signed_certificate(self._temp_dir.name, "server")
+        self.other_pfx = write_self_signed_certificate(self._temp_dir.name, "other")
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(self._temp_dir.name, "server.pem"))
+        self.https_server = HTTPServer(("127.0.0.1", 0), AliveHandler)
+        self.https_server.socket = context.wrap_socket(self.https_server.socket, server_side=True)
+        threading.Thread(target=self.https_server.serve_forever, daemon=True).start()
+        self.url = f"https://127.0.0.1:{self.https_server.server_address[1]}"
+
+    def tearDown(self):
+        self.https_server.shutdown()
+        self.https_server.server_close()
+        self._temp_dir.cleanup()
+
+    def health_check(self, pfx_path: str) -> bool:
+        embedded = EmbeddedServer()
+        embedded._server_options = ServerOptions().secured(pfx_path)
+        watchdog = ServerWatchdog(embedded, WatchdogOptions())
+        watchdog._session = watchdog._create_session()
+        with watchdog._session:
+            return watchdog._is_healthy(self.url)
+
+    def test_server_certificate_is_pinned_without_warnings(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertTrue(self.health_check(self.server_pfx))
+        self.assertEqual([], [str(warning.message) for warning in caught])
+
+    def test_other_certificate_fails_the_health_check(self):
+        self.assertFalse(self.health_check(self.other_pfx))
@@ -0,0 +1,106 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from ravendb_embedded.zip_extractor import ParallelZipExtractor
+
+
+class TestParallelZipExtractor(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.archive = os.path.join(self._temp_dir.name, "server.zip")
+        self.out = os.path.join(self._temp_dir.name, "out")
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def create_archive(self, file_count: int = 50) -> None:
+        with zipfile.ZipFile(self.archive, "w", zipfile.ZIP_DEFLATED) as zipped:
+            zipped.writestr("runtimes/", b"")
+            for i in range(file_count):
+                zipped.writestr(f"lib/{i % 5}/file-{i}.dll", f"content {i}".encode() * (i + 1))
+
+            executable = zipfile.ZipInfo("Raven.Server")
+            executable.create_system = 3
+            executable.external_attr = (stat.S_IFREG | 0o755) << 16
+            zipped.writestr(executable, b"#!/bin/sh")
+
+    def test_extracts_all_members(self):
+        self.create_archive()
+
+        ParallelZipExtractor(max_workers=4).extract(self.archive, self.out)
+
+        with zipfile.ZipFile(self.archive) as zipped:
+            for member in zipped.infolist():
+                path = Path(self.out, member.filename)
+                if member.is_dir():
+                    self.assertTrue(path.is_dir())
+                else:
+                    self.assertEqual(zipped.read(member), path.read_bytes())
+
+    @unittest.skipIf(sys.platform == "win32", "POSIX permissions")
+    def test_preserves_executable_bit(self):
+        self.create_archive()
+
+        ParallelZipExtractor(max_workers=4).extract(self.archive, self.out)
+
+        self.assertEqual(0o755, stat.S_IMODE(os.stat(os.path.join(self.out, "Raven.Server")).st_mode))
+
+    def test_extracts_from_file_object(self):
+        self.create_archive()
+
+        with open(self.archive, "rb") as f:
+            ParallelZipExtractor(max_workers=4).extract(BytesIO(f.read()), self.out)
+
+        self.assertEqual(b"content 3" * 4, Path(self.out, "lib", "3", "file-3.dll").read_bytes())
+
+    def test_skips_members_which_already_match(self):
+        self.create_archive()
+        ParallelZipExtractor(max_workers=4).extract(self.archive, self.out)
+
+        changed = Path(self.out, "lib", "1", "file-1.dll")
+        changed.write_bytes(b"changed!" + b"x" * (len("content 1") * 2 - 8))
+
+        opened = []
+        original_open = zipfile.ZipFile.open
+
+        def tracking_open(zipped, member, *args, **kwargs):
+            opened.append(member.filename)
+            return original_open(zipped, member, *args, **kwargs)
+
+        with patch.object(zipfile.ZipFile, "open", tracking_open):
+            ParallelZipExtractor(max_workers=4).extract(self.archive, self.out)
+
+        self.assertEqual(["lib/1/file-1.dll"], opened)
+        self.assertEqual(b"content 1" * 2, changed.read_bytes())
+
+    def test_detects_corrupted_member(self):
+        with zipfile.ZipFile(self.archive, "w", zipfile.ZIP_STORED) as zipped:
+            zipped.writestr("Raven.Server.dll", b"A" * 1000)
+
+        data = bytearray(Path(self.archive).read_bytes())
+        data[data.index(b"A" * 1000) + 500] = ord("B")
+        Path(self.archive).write_bytes(bytes(data))
+
+        with self.assertRaises(zipfile.BadZipFile):
+            ParallelZipExtractor().extract(self.archive, self.out)
+
+        self.assertFalse(os.path.exists(os.path.join(self.out, "Raven.Server.dll")))
+
+    def test_members_cannot_escape_output_directory(self):
+        with zipfile.ZipFile(self.archive, "w") as zipped:
+            zipped.writestr("../../evil.txt", b"evil")
+            zipped.writestr("/absolute.txt", b"absolute")
+
+        ParallelZipExtractor().extract(self.archive, self.out)
+
+        self.assertEqual(b"evil", Path(self.out, "evil.txt").read_bytes())
+        self.assertEqual(b"absolute", Path(self.out, "absolute.txt").read_bytes())
+        self.assertFalse(os.path.exists(os.path.join(self._temp_dir.name, "..", "evil.txt")))